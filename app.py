@@ -1,9 +1,15 @@
 import streamlit as st
 import pandas as pd
 
-from utils.features import load_schedule_file, add_base_features
-from utils.risk import add_risk_scores
-from utils.fairness import compute_fairness_table, compute_fairness_stats
+from utils.features import load_schedule_file
+from utils.preferences import load_preference_file
+from utils.excel_ingest import list_sheets, roster_sheets
+from utils.artifacts import set_input, clear_input, has_input, get_artifact, session_memory
+from utils.shared_store import get_store
+from utils.jobs import score_roster
+from utils.job_view import BACKGROUND_MIN_ROWS, background_artifact
+from utils.table_view import paged_table
+from utils.profiling import run_page
 
 
 st.set_page_config(
@@ -17,10 +23,95 @@ st.set_page_config(
 # 세션 상태 초기화
 # ======================================
 def init_state():
-    st.session_state.setdefault("schedule_df", None)
-    st.session_state.setdefault("fairness_summary", None)
-    st.session_state.setdefault("fairness_stats", None)
-    st.session_state.setdefault("nurse_list", [])
+    st.session_state.setdefault("upload_id", None)
+
+
+def select_sheets(uploaded):
+    """
+    XLSX 시트가 2개 이상이면 읽을 시트를 고르게 한다 (기본: 필수 컬럼이 있는 시트 전체).
+    CSV나 시트 1개짜리 엑셀은 None (기존처럼 첫 시트만 읽음).
+    """
+    if not uploaded.name.lower().endswith(".xlsx"):
+        return None
+    cached = st.session_state.get("sheet_list")
+    if cached is None or cached[0] != uploaded.file_id:
+        try:
+            cached = (uploaded.file_id, list_sheets(uploaded.getvalue()))
+        except Exception:
+            # 워크북을 열 수 없으면 기존 방식으로 읽다가 오류를 보여 준다
+            cached = (uploaded.file_id, [])
+        st.session_state["sheet_list"] = cached
+    sheets = cached[1]
+    if len(sheets) < 2:
+        return None
+    names = [s["sheet"] for s in sheets]
+    skipped = [s["sheet"] for s in sheets if s["missing"]]
+    if skipped:
+        st.caption(f"필수 컬럼이 없어 기본 선택에서 뺀 시트: {', '.join(skipped)}")
+    chosen = st.multiselect("읽을 시트 (선택한 시트를 합쳐 분석)", names, default=roster_sheets(sheets))
+    if not chosen:
+        st.warning("시트를 하나 이상 선택해 주세요.")
+    return chosen
+
+
+def carryover_section(scored: pd.DataFrame, history_file):
+    """
+    누적 상태 파일이 있으면 이번 근무표를 이전 기간 뒤에 이어 붙여 경계 피처를 보정해 보여 주고,
+    없으면 다음 기간에 쓸 누적 상태 파일을 내려받을 수 있게 한다.
+    """
+    st.subheader("이전 기간과 이어 본 분석")
+    if history_file is None:
+        st.caption(
+            "다음 근무표를 이어서 분석하려면 이 근무표의 누적 상태 파일을 내려받아 두세요. "
+            "다음에 사이드바 '2. 이전 기간 누적 상태'에 올리면 월 경계를 넘는 위험이 함께 계산됩니다."
+        )
+        if st.toggle("누적 상태 파일 만들기", value=False):
+            st.download_button(
+                "누적 상태 파일 내려받기",
+                data=get_artifact("history_state"),
+                file_name="roster_history.json",
+                mime="application/json",
+            )
+        return
+
+    try:
+        result = get_artifact("carryover")
+    except ValueError as e:
+        st.error(f"누적 상태를 이어 붙일 수 없습니다: {e}")
+        return
+
+    rows = result["rows"]
+    key = ["nurse_id", "date"]
+    merged = rows[key + ["nurse_name", "shift_code", "consecutive_working_days", "consecutive_night_shifts",
+                         "overall_risk_score"]].merge(
+        scored[key + ["overall_risk_score"]].rename(columns={"overall_risk_score": "standalone_risk_score"}),
+        on=key,
+        how="left",
+    )
+    changed = merged[merged["overall_risk_score"] != merged["standalone_risk_score"]]
+
+    m1, m2, m3 = st.columns(3)
+    m1.metric("누적 기간 수", f"{int(result['fairness']['periods'].max()):,}" if len(result["fairness"]) else "0")
+    m2.metric("경계 보정으로 위험도가 바뀐 행", f"{len(changed):,}")
+    m3.metric("이어 본 위험도 합", f"{int(rows['overall_risk_score'].sum()):,}",
+              delta=f"{int(rows['overall_risk_score'].sum() - scored['overall_risk_score'].sum()):+,}",
+              delta_color="inverse")
+
+    if changed.empty:
+        st.success("이전 기간과 이어 보아도 위험도가 달라지는 행이 없습니다.")
+    else:
+        st.markdown("**이전 기간과 이어져서 위험도가 달라진 행** (standalone = 이번 근무표만 분석)")
+        paged_table(changed.sort_values(key), key="carryover_changed", page_size=20)
+
+    st.markdown("**간호사별 누적 근무 부담 (전체 기간)**")
+    paged_table(result["fairness"], key="carryover_fairness", page_size=20)
+
+    st.download_button(
+        "갱신된 누적 상태 파일 내려받기",
+        data=result["state"],
+        file_name="roster_history.json",
+        mime="application/json",
+    )
 
 
 # ======================================
@@ -52,55 +143,109 @@ def main():
             type=["csv", "xlsx"],
         )
 
+        # 시트가 여러 개인 엑셀(월별/병동별 시트)은 고른 시트를 병렬로 읽어 합친다
+        sheets = select_sheets(uploaded) if uploaded is not None else None
+        upload_key = None
         if uploaded is not None:
+            upload_key = uploaded.file_id if sheets is None else f"{uploaded.file_id}:{'|'.join(sheets)}"
+
+        # 같은 파일이면 rerun마다 다시 파싱하지 않는다
+        if upload_key is not None and upload_key != st.session_state["upload_id"] and sheets != []:
             try:
-                raw = load_schedule_file(uploaded)
-                base = add_base_features(raw)
-                full = add_risk_scores(base)
+                raw = load_schedule_file(uploaded, sheets=sheets)
+                set_input("raw_schedule", raw, key=upload_key)
 
-                # 저장
-                st.session_state["schedule_df"] = full
-                st.session_state["nurse_list"] = sorted(full["nurse_name"].dropna().unique().tolist())
+                # 피처/위험도는 미리보기에 바로 필요하므로 여기서 계산,
+                # 공정성 등 나머지 산출물은 각 페이지에서 처음 요청할 때 계산된다.
+                # 큰 근무표는 백그라운드 작업으로 돌려 화면(과 다른 사용자)을 막지 않는다.
+                if len(raw) < BACKGROUND_MIN_ROWS:
+                    full = get_artifact("risk_scores")
+                    st.success(f"스케줄 로딩 및 피처 생성 완료 (총 {len(full)}행).")
+                st.session_state["upload_id"] = upload_key
 
-                # 공정성 계산
-                summary = compute_fairness_table(full)
-                stats = compute_fairness_stats(summary)
-                st.session_state["fairness_summary"] = summary
-                st.session_state["fairness_stats"] = stats
+            except Exception as e:
+                st.error(f"파일 처리 중 오류가 발생했습니다: {e}")
 
-                st.success(f"스케줄 로딩 및 피처 생성 완료 (총 {len(full)}행).")
+        # 이전 기간(지난달 등) 누적 상태: 월 경계를 넘는 연속 근무/야간, quick return을 이어서 본다
+        st.header("2. 이전 기간 누적 상태 (선택)")
+        history_file = st.file_uploader(
+            "누적 상태 파일 (roster_history.json)",
+            type=["json"],
+            help="이전 근무표 분석 화면에서 내려받은 파일입니다. 이번 근무표는 그 뒤 날짜의 근무만 있어야 합니다.",
+        )
+        if history_file is not None:
+            set_input("roster_history", history_file.getvalue(), key=history_file.file_id)
 
+        # 희망 근무/휴무 신청: 공정성 지표의 선호 반영율(pref_match_ratio) 계산에 쓴다
+        st.header("3. 희망 근무/휴무 신청 (선택)")
+        pref_files = st.file_uploader(
+            "CSV 또는 XLSX 파일 (필수 컬럼: nurse_id, date, requested_shift / 선택: priority)",
+            type=["csv", "xlsx"],
+            accept_multiple_files=True,
+            help="여러 파일을 올리면 합쳐서 반영합니다. 같은 간호사·날짜 신청은 나중 파일이 우선합니다.",
+        )
+        if pref_files:
+            try:
+                requests = pd.concat([load_preference_file(f) for f in pref_files], ignore_index=True)
+                set_input("preference_requests", requests, key="|".join(f.file_id for f in pref_files))
             except Exception as e:
-                st.error(f"파일 처리 중 오류가 발생했습니다: {e}")
+                st.error(f"희망 신청 파일 처리 중 오류가 발생했습니다: {e}")
+        else:
+            # 파일을 모두 뺐으면 이전 신청이 공정성 지표에 남지 않도록 지운다
+            clear_input("preference_requests")
+
+        # 같은 근무표를 올린 세션끼리는 분석 결과를 한 벌만 공유한다
+        if has_input("raw_schedule"):
+            mem = session_memory()
+            store = get_store().stats()
+            st.caption(
+                f"메모리: 이 세션 {(mem['shared_bytes'] + mem['private_bytes']) / 1e6:.1f}MB "
+                f"(공유 {mem['shared_bytes'] / 1e6:.1f}MB) · "
+                f"서버 공유 캐시 {store['total_bytes'] / 1e6:.1f}MB / 세션 {store['sessions']}개"
+            )
 
     # --------------------------------------
     # 업로드 안 했을 때 메시지
     # --------------------------------------
-    df = st.session_state.get("schedule_df")
-
-    if df is None:
+    if not has_input("raw_schedule"):
         st.info("좌측에서 스케줄 파일을 업로드하면 전체 기능이 활성화됩니다.")
         return
 
+    raw = get_artifact("raw_schedule")
+    if len(raw) >= BACKGROUND_MIN_ROWS and not background_artifact(
+        "risk_scores", score_roster, raw, label="근무표 분석"
+    ):
+        return
+
     # --------------------------------------
     # 업로드된 표 출력
     # --------------------------------------
-    st.subheader("업로드된 스케줄 및 피처 (상위 50행 미리보기)")
-    st.dataframe(df.head(50))
+    df = get_artifact("risk_scores")
+    st.subheader("업로드된 스케줄 및 피처")
+    paged_table(df, key="schedule_preview", page_size=50)
+
+    # --------------------------------------
+    # 이전 기간과 이어 본 분석
+    # --------------------------------------
+    carryover_section(df, history_file)
 
     # --------------------------------------
     # 공정성 요약 출력
     # --------------------------------------
     st.subheader("간단 공정성 요약")
-    fairness_summary = st.session_state["fairness_summary"]
-    fairness_stats = st.session_state["fairness_stats"]
+    if not st.toggle("공정성 요약 계산/표시", value=False):
+        st.caption("공정성 지표는 필요할 때만 계산합니다. (공정성 대시보드와 결과 공유)")
+        return
+
+    fairness_summary = get_artifact("fairness_table")
+    fairness_stats = get_artifact("fairness_stats")
 
     if fairness_summary is not None and len(fairness_summary) > 0:
         col1, col2 = st.columns(2)
 
         with col1:
             st.markdown("**간호사별 요약 테이블**")
-            st.dataframe(fairness_summary)
+            paged_table(fairness_summary, key="fairness_summary", page_size=20)
 
         with col2:
             st.markdown("**병동 전체 공정성 지표**")
@@ -114,4 +259,4 @@ def main():
 # 진입점
 # ======================================
 if __name__ == "__main__":
-    main()
+    run_page(main)
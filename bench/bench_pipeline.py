@@ -0,0 +1,242 @@
+"""
+분석 파이프라인 벤치마크.
+
+가상 근무표(utils.synthetic)로 10 ~ 5,000명 규모를 만들어
+utils.features / utils.risk / utils.fairness / 챗봇 analyze_schedule 단계별
+실행 시간과 peak memory를 측정하고, 저장된 baseline 대비 회귀 여부를 판정한다.
+
+사용 예:
+    python bench/bench_pipeline.py                       # 측정 + 스케일링 리포트
+    python bench/bench_pipeline.py --check               # baseline 대비 회귀 시 exit 1
+    python bench/bench_pipeline.py --save-baseline       # 현재 결과를 baseline으로 저장
+    python bench/bench_pipeline.py --sizes 10 100 --days 31
+"""
+import argparse
+import gc
+import importlib.util
+import io
+import json
+import math
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from utils import coverage, fatigue, features, fairness, optimizer, preferences, risk  # noqa: E402
+from utils.codebook import get_codebook  # noqa: E402
+from utils.synthetic import generate_preferences, generate_roster  # noqa: E402
+
+BASELINE_FILE = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_SIZES = [10, 100, 500, 1000, 5000]
+
+# 회귀 판정: baseline * TOLERANCE + MIN_SLACK 초과 시 실패
+TOLERANCE = 1.5
+MIN_SLACK_SEC = 0.05
+
+
+def load_page_module(filename: str):
+    """pages/*.py 는 숫자로 시작해 import 불가 → 파일 경로로 로드 (main()은 실행되지 않음)."""
+    path = ROOT / "pages" / filename
+    spec = importlib.util.spec_from_file_location(f"page_{path.stem.lower()}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class _Upload(io.BytesIO):
+    """Streamlit UploadedFile 흉내 (.name 속성만 필요)."""
+
+    def __init__(self, data: bytes, name: str):
+        super().__init__(data)
+        self.name = name
+
+
+def build_stages():
+    """
+    (stage 이름, 입력을 받아 출력을 돌려주는 함수) 목록.
+    각 stage는 앞 stage의 출력을 입력으로 받는다.
+    """
+    chatbot = load_page_module("1_Chatbot.py")
+
+    def with_shift_type(df):
+        df = df.copy()
+        df["shift_type"] = get_codebook().shift_type(df["shift_code"])
+        df["token"] = get_codebook().token(df["shift_code"])
+        return df
+
+    return [
+        ("features.load_schedule_file", lambda ctx: features.load_schedule_file(_Upload(ctx["csv"], "bench.csv"))),
+        ("features._compute_consecutive_features", lambda ctx: features._compute_consecutive_features(with_shift_type(ctx["raw"]))),
+        ("features._compute_staffing_features", lambda ctx: features._compute_staffing_features(with_shift_type(ctx["raw"]))),
+        ("fatigue.shift_alertness", lambda ctx: fatigue.shift_alertness(ctx["consec"])),
+        ("features._compute_quick_return_flags", lambda ctx: features._compute_quick_return_flags(ctx["consec"].copy())),
+        ("features.add_base_features", lambda ctx: features.add_base_features(ctx["raw"])),
+        ("risk.add_risk_scores", lambda ctx: risk.add_risk_scores(ctx["base"])),
+        ("coverage.coverage_table", lambda ctx: coverage.coverage_table(ctx["base"])),
+        ("preferences.PreferenceIndex", lambda ctx: preferences.PreferenceIndex(ctx["requests"])),
+        ("preferences.match", lambda ctx: ctx["pref_index"].match(ctx["full"])),
+        ("fairness.compute_fairness_table", lambda ctx: fairness.compute_fairness_table(ctx["full"], ctx["pref_index"])),
+        ("fairness.compute_fairness_stats", lambda ctx: fairness.compute_fairness_stats(ctx["fair"])),
+        ("chatbot.analyze_schedule", lambda ctx: chatbot.analyze_schedule(ctx["source"])),
+        ("optimizer.propose_swaps", lambda ctx: optimizer.propose_swaps(ctx["raw"], max_candidates=100_000)),
+    ]
+
+
+# stage 출력 → 다음 stage들이 참조하는 컨텍스트 키
+_OUTPUT_KEY = {
+    "features.load_schedule_file": "raw",
+    "features._compute_consecutive_features": "consec",
+    "features.add_base_features": "base",
+    "risk.add_risk_scores": "full",
+    "preferences.PreferenceIndex": "pref_index",
+    "fairness.compute_fairness_table": "fair",
+}
+
+
+def _timed(fn, ctx, repeat: int):
+    best = math.inf
+    out = None
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        out = fn(ctx)
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def _peak_memory(fn, ctx) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn(ctx)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def run_size(n_nurses: int, n_days: int, stages, measure_memory: bool = True) -> dict:
+    source = generate_roster(n_nurses=n_nurses, n_days=n_days, seed=n_nurses)
+    ctx = {
+        "source": source,
+        "csv": source.to_csv(index=False).encode("utf-8"),
+        "requests": generate_preferences(source, seed=n_nurses),
+    }
+
+    # 작은 입력은 측정 노이즈가 크므로 여러 번 돌려 최솟값 사용
+    repeat = 5 if n_nurses <= 100 else (2 if n_nurses <= 1000 else 1)
+
+    result = {}
+    for name, fn in stages:
+        seconds, out = _timed(fn, ctx, repeat)
+        peak = _peak_memory(fn, ctx) if measure_memory else None
+        if name in _OUTPUT_KEY:
+            ctx[_OUTPUT_KEY[name]] = out
+        result[name] = {"seconds": seconds, "peak_bytes": peak}
+    result["_rows"] = len(source)
+    return result
+
+
+def scaling_exponent(sizes, seconds) -> float:
+    """log-log 최소제곱 기울기 (1.0 ≈ 선형, 2.0 ≈ 제곱)."""
+    pts = [(math.log(n), math.log(max(s, 1e-6))) for n, s in zip(sizes, seconds)]
+    if len(pts) < 2:
+        return float("nan")
+    mx = sum(p[0] for p in pts) / len(pts)
+    my = sum(p[1] for p in pts) / len(pts)
+    num = sum((x - mx) * (y - my) for x, y in pts)
+    den = sum((x - mx) ** 2 for x, _ in pts)
+    return num / den if den else float("nan")
+
+
+def print_report(results: dict, stage_names) -> None:
+    sizes = sorted(results, key=int)
+    header = f"{'stage':42s}" + "".join(f"{s + ' RN':>12s}" for s in sizes) + f"{'slope':>8s}"
+    print("\n[실행 시간 (초)]")
+    print(header)
+    for name in stage_names:
+        secs = [results[s][name]["seconds"] for s in sizes]
+        slope = scaling_exponent([int(s) for s in sizes], secs)
+        print(f"{name:42s}" + "".join(f"{v:12.4f}" for v in secs) + f"{slope:8.2f}")
+
+    print("\n[Peak memory (MB)]")
+    print(f"{'stage':42s}" + "".join(f"{s + ' RN':>12s}" for s in sizes))
+    for name in stage_names:
+        peaks = [results[s][name]["peak_bytes"] for s in sizes]
+        cells = "".join(f"{p / 1e6:12.1f}" if p is not None else f"{'-':>12s}" for p in peaks)
+        print(f"{name:42s}" + cells)
+
+
+def check_regressions(results: dict, baseline: dict) -> list:
+    failures = []
+    for size, stages in results.items():
+        base_stages = baseline.get("results", {}).get(size)
+        if not base_stages:
+            continue
+        for name, cur in stages.items():
+            if name.startswith("_"):
+                continue
+            if name not in base_stages:
+                # 새로 추가한 stage는 --save-baseline 으로 기준값을 남겨야 회귀 검사 대상이 된다
+                failures.append(f"{name} @ {size} RN: baseline 없음 (--save-baseline 필요)")
+                continue
+            limit = base_stages[name]["seconds"] * TOLERANCE + MIN_SLACK_SEC
+            if cur["seconds"] > limit:
+                failures.append(
+                    f"{name} @ {size} RN: {cur['seconds']:.4f}s > 허용치 {limit:.4f}s "
+                    f"(baseline {base_stages[name]['seconds']:.4f}s)"
+                )
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--days", type=int, default=31)
+    parser.add_argument("--check", action="store_true", help="baseline 대비 회귀 시 exit 1")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--no-memory", action="store_true", help="peak memory 측정 생략 (빠름)")
+    parser.add_argument("--json", type=str, default=None, help="결과를 JSON 파일로 저장")
+    args = parser.parse_args(argv)
+
+    stages = build_stages()
+    stage_names = [name for name, _ in stages]
+
+    results = {}
+    for n in args.sizes:
+        print(f"... {n} RN x {args.days}일 측정 중", file=sys.stderr)
+        results[str(n)] = run_size(n, args.days, stages, measure_memory=not args.no_memory)
+
+    print_report(results, stage_names)
+
+    payload = {"days": args.days, "results": results}
+    if args.json:
+        Path(args.json).write_text(json.dumps(payload, indent=2), encoding="utf-8")
+
+    if args.save_baseline:
+        BASELINE_FILE.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        print(f"\nbaseline 저장: {BASELINE_FILE}")
+
+    if args.check:
+        if not BASELINE_FILE.exists():
+            print("\nbaseline 파일이 없습니다. --save-baseline 으로 먼저 생성하세요.")
+            return 1
+        baseline = json.loads(BASELINE_FILE.read_text(encoding="utf-8"))
+        if baseline.get("days") != args.days:
+            print(f"\n경고: baseline은 {baseline.get('days')}일 기준입니다.")
+        failures = check_regressions(results, baseline)
+        if failures:
+            print("\n성능 회귀 감지:")
+            for f in failures:
+                print(f"  - {f}")
+            return 1
+        print("\n성능 회귀 없음.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
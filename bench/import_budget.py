@@ -0,0 +1,166 @@
+"""
+콜드 스타트 import 시간 예산 검사 (python -X importtime 기반).
+
+app.py 와 pages/*.py 의 최상위 import 문만 새 인터프리터에서 실행해
+streamlit/pandas/numpy(어차피 필요한 바닥 비용)를 뺀 페이지별 추가 import 시간을 잰다.
+- 저장된 baseline 대비 느려지면 실패 (bench_pipeline.py 와 같은 허용치 규칙)
+- LAZY_MODULES(무거운 SDK/선택 모듈)가 import 시점에 로드되면 실패
+
+lazy import 규칙: 일부 기능(업로드 형식, 선택 입력, 차트, 백그라운드 작업, 프로파일링 등)에서만 쓰는
+무거운 모듈은 모듈 최상단이 아니라 그것을 쓰는 함수 안에서 import 한다. 페이지 첫 로딩 시간에는
+모든 페이지가 쓰는 모듈만 들어가게 하기 위해서다. 함수 안 import는 이 규칙을 따른 것이므로 따로 주석을 달지 않는다.
+
+사용 예:
+    python bench/import_budget.py                        # 측정 + 리포트
+    python bench/import_budget.py --check                # baseline 대비 회귀 / lazy 위반 시 exit 1
+    python bench/import_budget.py --save-baseline        # 현재 결과를 baseline으로 저장
+    python bench/import_budget.py --targets pages/1_Chatbot.py --top 10
+"""
+import argparse
+import ast
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+BASELINE_FILE = Path(__file__).resolve().parent / "import_baseline.json"
+
+# 모든 페이지가 쓰는 바닥 비용 (먼저 import 해 두고 측정에서 뺀다)
+FLOOR_MODULES = ["streamlit", "pandas", "numpy"]
+
+# 첫 사용 시점에만 import 해야 하는 모듈 (최상위 패키지 이름)
+LAZY_MODULES = ["requests", "supabase", "huggingface_hub", "openpyxl", "altair", "yaml"]
+
+# 회귀 판정: baseline * TOLERANCE + MIN_SLACK 초과 시 실패
+TOLERANCE = 1.5
+MIN_SLACK_MS = 20.0
+
+
+def default_targets():
+    return ["app.py"] + sorted(str(p.relative_to(ROOT)) for p in (ROOT / "pages").glob("*.py"))
+
+
+def import_source(path: Path) -> str:
+    """파일의 최상위 import 문만 뽑는다 (페이지 본문/main()은 실행하지 않음)."""
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    nodes = [n for n in tree.body if isinstance(n, (ast.Import, ast.ImportFrom))]
+    return "\n".join(ast.unparse(n) for n in nodes) or "pass"
+
+
+def parse_importtime(stderr: str):
+    """
+    -X importtime 출력 → [(모듈 이름, 깊이, cumulative us)].
+    깊이 0 = 최상위에서 직접 import 된 모듈.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # "import time:  self [us] | cumulative | [이름 앞 공백 2칸 = 깊이 1]name"
+        _, cum, name = line.split("|")
+        stripped = name.lstrip()
+        depth = (len(name) - len(stripped) - 1) // 2
+        rows.append((stripped.strip(), depth, int(cum)))
+    return rows
+
+
+def measure(target: str) -> dict:
+    """target의 import를 새 인터프리터에서 한 번 실행해 추가 import 시간(ms)과 로드된 lazy 모듈을 돌려준다."""
+    code = "\n".join(
+        [
+            "import " + ", ".join(FLOOR_MODULES),
+            "import sys",
+            f"sys.path.insert(0, {str(ROOT)!r})",
+            import_source(ROOT / target),
+            f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))",
+        ]
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        cwd=str(ROOT),
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{target} import 실패:\n{proc.stderr[-2000:]}")
+
+    rows = parse_importtime(proc.stderr)
+    # 바닥 모듈 import가 끝난 뒤의 최상위 항목만 페이지 몫으로 센다
+    last_floor = max(i for i, (name, depth, _) in enumerate(rows) if depth == 0 and name in FLOOR_MODULES)
+    own = [(name, cum) for name, depth, cum in rows[last_floor + 1:] if depth == 0]
+    return {
+        "ms": sum(cum for _, cum in own) / 1000,
+        "top": sorted(own, key=lambda r: -r[1]),
+        "lazy_loaded": [m for m in proc.stdout.strip().split(",") if m],
+    }
+
+
+def run(targets, repeat: int) -> dict:
+    # 디스크 캐시/노이즈 영향을 줄이기 위해 여러 번 돌려 최솟값 사용
+    results = {}
+    for target in targets:
+        runs = [measure(target) for _ in range(repeat)]
+        best = min(runs, key=lambda r: r["ms"])
+        results[target] = best
+    return results
+
+
+def print_report(results: dict, top: int) -> None:
+    print(f"\n[추가 import 시간 (ms, {' + '.join(FLOOR_MODULES)} 제외)]")
+    for target, r in results.items():
+        lazy = f"  ← import 시점 로드: {', '.join(r['lazy_loaded'])}" if r["lazy_loaded"] else ""
+        print(f"{target:36s}{r['ms']:10.1f}{lazy}")
+        for name, cum in r["top"][:top]:
+            print(f"    {name:32s}{cum / 1000:10.1f}")
+
+
+def check(results: dict, baseline: dict) -> list:
+    failures = []
+    for target, r in results.items():
+        for mod in r["lazy_loaded"]:
+            failures.append(f"{target}: {mod} 이(가) import 시점에 로드됨 (첫 사용 시 import 하세요)")
+        base = baseline.get("results", {}).get(target)
+        if base is None:
+            if baseline:
+                failures.append(f"{target}: baseline 없음 (새 페이지는 --save-baseline 필요)")
+            continue
+        limit = base["ms"] * TOLERANCE + MIN_SLACK_MS
+        if r["ms"] > limit:
+            failures.append(f"{target}: {r['ms']:.1f}ms > 허용치 {limit:.1f}ms (baseline {base['ms']:.1f}ms)")
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--targets", nargs="+", default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=3, help="대상별로 보여 줄 느린 import 개수")
+    parser.add_argument("--check", action="store_true", help="baseline 대비 회귀 / lazy 위반 시 exit 1")
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = run(args.targets or default_targets(), args.repeat)
+    print_report(results, args.top)
+
+    if args.save_baseline:
+        payload = {"results": {t: {"ms": round(r["ms"], 1)} for t, r in results.items()}}
+        BASELINE_FILE.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        print(f"\nbaseline 저장: {BASELINE_FILE}")
+
+    if args.check:
+        baseline = json.loads(BASELINE_FILE.read_text(encoding="utf-8")) if BASELINE_FILE.exists() else {}
+        if not baseline:
+            print("\nbaseline 파일이 없어 lazy import 규칙만 검사합니다. --save-baseline 으로 생성하세요.")
+        failures = check(results, baseline)
+        if failures:
+            print("\nimport 예산 초과:")
+            for f in failures:
+                print(f"  - {f}")
+            return 1
+        print("\nimport 예산 이내.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
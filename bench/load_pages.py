@@ -0,0 +1,260 @@
+"""
+페이지 rerun 지연시간 / 동시 접속 부하 측정 (streamlit.testing.v1.AppTest 기반).
+
+가상 근무표를 session_state에 올린 상태로 app.py 와 pages/*.py 를 실행하고,
+selectbox 변경 같은 위젯 조작을 흉내 내면서 rerun 한 번당 걸린 시간을 잰다.
+N개의 세션을 스레드로 동시에 돌려 페이지별 p50/p95/p99 지연시간을 리포트한다.
+
+사용 예:
+    python bench/load_pages.py                          # 30명 x 31일, 동시 세션 4개
+    python bench/load_pages.py --nurses 500 --sessions 16 --reruns 20
+    python bench/load_pages.py --pages pages/2_Risk_Dashboard.py --json out.json
+"""
+import argparse
+import datetime as dt
+import json
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pandas as pd  # noqa: E402
+from streamlit import logger as st_logger  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from utils.artifacts import STATE_KEY, set_input, get_artifact  # noqa: E402
+from utils.synthetic import generate_roster  # noqa: E402
+from bench.bench_pipeline import load_page_module  # noqa: E402
+
+DEFAULT_PAGES = [
+    "app.py",
+    "pages/1_Chatbot.py",
+    "pages/2_Risk_Dashboard.py",
+    "pages/3_Fairness_Dashboard.py",
+    "pages/4_Daily_Report.py",
+    "pages/5_AI_Analytics.py",
+]
+
+
+# ------------------------------------------------
+# 세션 상태 준비 (업로드 직후 상태 재현)
+# ------------------------------------------------
+def build_session_state(n_nurses: int, n_days: int) -> dict:
+    """
+    app.py 업로드 처리와 챗봇 페이지 분석이 끝난 직후의 session_state 내용을 만든다.
+    AppTest는 file_uploader를 조작할 수 없으므로 산출물 캐시를 미리 채워 주입한다.
+    """
+    source = generate_roster(n_nurses=n_nurses, n_days=n_days, seed=7)
+
+    raw = source.copy()
+    raw["date"] = pd.to_datetime(raw["date"]).dt.date
+
+    # 챗봇 페이지를 로드해야 chatbot_summary 산출물이 등록된다
+    load_page_module("1_Chatbot.py")
+
+    state: dict = {}
+    set_input("raw_schedule", raw, key="bench", state=state)
+    set_input("chatbot_raw", source, key="bench", state=state)
+    for name in [
+        "risk_scores",
+        "nurse_list",
+        "fairness_table",
+        "fairness_stats",
+        "risk_rollups",
+        "nurse_risk",
+        "chatbot_summary",
+    ]:
+        get_artifact(name, state=state)
+
+    return {
+        STATE_KEY: state[STATE_KEY],
+        "upload_id": "bench",
+        "chatbot_upload_id": "bench",
+    }
+
+
+def seed_session(at: AppTest, state: dict) -> None:
+    for key, value in state.items():
+        at.session_state[key] = value
+
+
+# ------------------------------------------------
+# 페이지별 위젯 조작 시나리오
+# ------------------------------------------------
+def _cycle_selectbox(at: AppTest, step: int, index: int = 0) -> bool:
+    """index번째 selectbox의 선택지를 step에 따라 돌려가며 바꾼다."""
+    if len(at.selectbox) <= index:
+        return False
+    box = at.selectbox[index]
+    options = list(box.options)
+    if not options:
+        return False
+    box.select(options[step % len(options)])
+    return True
+
+
+def _shift_date_input(at: AppTest, step: int) -> bool:
+    if len(at.date_input) == 0:
+        return False
+    widget = at.date_input[0]
+    current = widget.value
+    lo = widget.min
+    if current is None or lo is None:
+        return False
+    target = current - dt.timedelta(days=1)
+    widget.set_value(target if target >= lo else widget.max)
+    return True
+
+
+def interact(at: AppTest, page: str, step: int) -> None:
+    """
+    rerun 직전에 페이지에 맞는 위젯 조작을 적용한다.
+    조작할 위젯이 없으면 단순 rerun.
+    """
+    name = Path(page).name
+    if name == "4_Daily_Report.py":
+        # 짝수 스텝: 간호사 변경, 홀수 스텝: 날짜 변경
+        if step % 2 == 0:
+            _cycle_selectbox(at, step // 2)
+        else:
+            _shift_date_input(at, step)
+    elif name in {"2_Risk_Dashboard.py", "3_Fairness_Dashboard.py"}:
+        _cycle_selectbox(at, step)
+
+
+# ------------------------------------------------
+# 실행
+# ------------------------------------------------
+def run_session(page: str, state: dict, reruns: int, timeout: float, out: list, errors: list, flaky: list) -> None:
+    """
+    세션 하나를 시뮬레이션한다.
+    - errors: 페이지 스크립트 예외와 timeout을 포함한 실행 실패 (실패로 집계, 종료 코드 1)
+      timeout이 난 rerun도 걸린 시간을 out에 남겨 p95/p99/max에 반영한다.
+    - flaky: 여러 AppTest를 스레드로 동시에 돌릴 때 AppTest 내부 상태 경합으로 가끔 나는 KeyError.
+      앱 문제가 아니므로 해당 세션만 중단하고 따로 집계한다.
+    """
+    kind = "initial"
+    t0 = time.perf_counter()
+    try:
+        at = AppTest.from_file(str(ROOT / page), default_timeout=timeout)
+        seed_session(at, state)
+
+        t0 = time.perf_counter()
+        at.run()
+        out.append((kind, time.perf_counter() - t0))
+        if at.exception:
+            errors.append(f"{page}: {at.exception[0].message}")
+            return
+
+        kind = "rerun"
+        for step in range(reruns):
+            interact(at, page, step)
+            t0 = time.perf_counter()
+            at.run()
+            out.append((kind, time.perf_counter() - t0))
+            if at.exception:
+                errors.append(f"{page}: {at.exception[0].message}")
+                return
+    except KeyError as e:
+        flaky.append(f"{page}: {e!r}")
+    except Exception as e:  # timeout(RuntimeError) 포함: 실패로 집계하고 부하 측정은 계속 진행
+        out.append((kind, time.perf_counter() - t0))
+        errors.append(f"{page}: {e!r}")
+
+
+def percentile(values, q: float) -> float:
+    if not values:
+        return float("nan")
+    if len(values) == 1:
+        return values[0]
+    # statistics.quantiles: n=100 → 1~99 백분위 경계
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return cuts[int(q) - 1]
+
+
+def load_test_page(page: str, state: dict, sessions: int, reruns: int, timeout: float) -> dict:
+    samples: list = []
+    errors: list = []
+    flaky: list = []
+    threads = [
+        threading.Thread(target=run_session, args=(page, state, reruns, timeout, samples, errors, flaky))
+        for _ in range(sessions)
+    ]
+    wall0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - wall0
+
+    rerun_ms = [s * 1000 for kind, s in samples if kind == "rerun"]
+    initial_ms = [s * 1000 for kind, s in samples if kind == "initial"]
+    return {
+        "page": page,
+        "sessions": sessions,
+        "reruns": len(rerun_ms),
+        "initial_p50_ms": percentile(initial_ms, 50),
+        "p50_ms": percentile(rerun_ms, 50),
+        "p95_ms": percentile(rerun_ms, 95),
+        "p99_ms": percentile(rerun_ms, 99),
+        "max_ms": max(rerun_ms) if rerun_ms else float("nan"),
+        "throughput_rps": len(samples) / wall if wall > 0 else float("nan"),
+        "errors": errors,
+        "harness_errors": flaky,
+    }
+
+
+def print_report(rows: list) -> None:
+    print(
+        f"\n{'page':34s}{'sess':>6s}{'reruns':>8s}{'init p50':>10s}"
+        f"{'p50':>9s}{'p95':>9s}{'p99':>9s}{'max':>9s}{'rerun/s':>9s}"
+    )
+    for r in rows:
+        print(
+            f"{r['page']:34s}{r['sessions']:6d}{r['reruns']:8d}{r['initial_p50_ms']:10.1f}"
+            f"{r['p50_ms']:9.1f}{r['p95_ms']:9.1f}{r['p99_ms']:9.1f}{r['max_ms']:9.1f}"
+            f"{r['throughput_rps']:9.1f}"
+        )
+    for r in rows:
+        for e in r["errors"][:3]:
+            print(f"  ! {e}")
+        if r["harness_errors"]:
+            print(f"  ~ {r['page']}: AppTest 내부 경합(KeyError)으로 중단된 세션 {len(r['harness_errors'])}개 (집계 제외)")
+    print("(단위: ms)")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nurses", type=int, default=30)
+    parser.add_argument("--days", type=int, default=31)
+    parser.add_argument("--sessions", type=int, default=4, help="동시 세션 수")
+    parser.add_argument("--reruns", type=int, default=10, help="세션당 rerun 횟수")
+    parser.add_argument("--timeout", type=float, default=60.0, help="rerun 1회 timeout (초)")
+    parser.add_argument("--pages", nargs="+", default=DEFAULT_PAGES)
+    parser.add_argument("--json", type=str, default=None)
+    args = parser.parse_args(argv)
+
+    # 스레드에서 AppTest를 돌릴 때 나오는 "missing ScriptRunContext" 경고 억제
+    st_logger.set_log_level("error")
+
+    print(f"... 세션 상태 준비 ({args.nurses} RN x {args.days}일)", file=sys.stderr)
+    state = build_session_state(args.nurses, args.days)
+
+    rows = []
+    for page in args.pages:
+        print(f"... {page} ({args.sessions} 세션 x {args.reruns} rerun)", file=sys.stderr)
+        rows.append(load_test_page(page, state, args.sessions, args.reruns, args.timeout))
+
+    print_report(rows)
+    if args.json:
+        Path(args.json).write_text(json.dumps(rows, indent=2, ensure_ascii=False), encoding="utf-8")
+    return 1 if any(r["errors"] for r in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,21 @@
 import streamlit as st
 import pandas as pd
 
-from utils.risk import risk_level
+from utils.risk import add_risk_scores, risk_level
 from utils.features import (
+    add_base_features,
     compute_longest_work_streak,
     compute_longest_night_streak,
 )
-from utils.risk import add_risk_scores
+from utils.artifacts import artifact_version, has_input, get_artifact
+from utils.trend import downsample
+from utils.profiling import run_page
+
+# 추이 차트 점 개수 상한 (기간 길이와 무관하게 차트 비용 고정)
+MAX_CHART_POINTS = 400
+
+GRANULARITY_LABELS = {"일별": "daily", "주별": "weekly", "월별": "monthly"}
+METRIC_LABELS = {"평균": "mean", "최대": "max", "p90": "p90"}
 
 
 def describe_nurse_risk(df, nurse_name):
@@ -40,36 +49,122 @@ def describe_nurse_risk(df, nurse_name):
     return "\n".join(lines)
 
 
+def optimize_section(scored: pd.DataFrame) -> None:
+    """
+    맞교환 + 근무코드 변경 국소 탐색(utils.optimizer.optimize_roster)으로 개선안을 만들고,
+    채택된 이동과 개선 전후 위험점수(피로도 포함 overall 기준)를 보여 준다.
+    """
+    st.caption(
+        "환자안전 위험점수와 공정성(야간/OFF/주말근무 편차)을 함께 낮추는 근무표를 찾습니다. "
+        "근무코드 변경은 해당 근무 인원이 기준 인원 밑으로 내려가지 않을 때만 시도합니다."
+    )
+    c1, c2 = st.columns(2)
+    time_limit = c1.slider("탐색 시간 제한 (초)", min_value=1, max_value=30, value=5)
+    fairness_weight = c2.slider("공정성 가중치", min_value=0.0, max_value=5.0, value=0.5, step=0.1)
+
+    version = artifact_version("raw_schedule")
+    if st.button("개선안 찾기"):
+        from utils.optimizer import optimize_roster
+
+        bar = st.progress(0.0, text="탐색 중...")
+        iterations = 5000
+        rows, moves = optimize_roster(
+            get_artifact("raw_schedule"),
+            iterations=iterations,
+            fairness_weight=fairness_weight,
+            time_limit=float(time_limit),
+            progress=lambda it, best: bar.progress(min(it / iterations, 1.0), text=f"{it}회 · 목적값 {best:.1f}"),
+        )
+        bar.progress(1.0, text=f"완료: 채택된 이동 {len(moves)}개")
+        st.session_state["optimized_roster"] = (version, rows, moves)
+
+    result = st.session_state.get("optimized_roster")
+    if result is None or result[0] != version:
+        return
+    _, rows, moves = result
+
+    improved = add_risk_scores(add_base_features(rows))
+    m1, m2, m3 = st.columns(3)
+    for col, label, column in [
+        (m1, "환자안전 위험점수 합", "patient_safety_risk"),
+        (m2, "피로도 점수 합", "fatigue_risk"),
+        (m3, "전체 위험점수 합", "overall_risk_score"),
+    ]:
+        before, after = int(scored[column].sum()), int(improved[column].sum())
+        col.metric(label, f"{after:,}", delta=f"{after - before:+,}", delta_color="inverse")
+
+    changed = rows["shift_code"].ne(get_artifact("raw_schedule")["shift_code"].to_numpy())
+    st.markdown(f"**바뀐 칸 {int(changed.sum()):,}개** (채택된 이동 기록)")
+    st.dataframe(moves, hide_index=True)
+    st.download_button(
+        "개선안 CSV 다운로드",
+        rows.to_csv(index=False).encode("utf-8-sig"),
+        file_name="roster_optimized.csv",
+        mime="text/csv",
+    )
+
+
 def main():
     st.title("환자안전 · 위험도 대시보드")
 
-    df = st.session_state.get("schedule_df")
-    if df is None:
+    if not has_input("raw_schedule"):
         st.error("먼저 스케줄을 업로드하세요.")
         st.stop()
 
-    st.subheader("1) 날짜별 위험도 추이 (평균 overall risk)")
-    daily = (
-        df.groupby("date")
-        .agg(avg_risk=("overall_risk_score", "mean"))
-        .reset_index()
-    )
-    st.line_chart(daily.set_index("date")["avg_risk"])
+    df = get_artifact("risk_scores")
+
+    st.subheader("1) 날짜별 위험도 추이 (overall risk)")
+    rollups = get_artifact("risk_rollups")
+
+    c1, c2 = st.columns(2)
+    granularity = c1.radio("집계 단위", list(GRANULARITY_LABELS), horizontal=True)
+    metrics = c2.multiselect("지표", list(METRIC_LABELS), default=["평균"])
+
+    if metrics:
+        trend = rollups[GRANULARITY_LABELS[granularity]]
+        cols = [METRIC_LABELS[m] for m in metrics]
+        shown = downsample(trend, cols[0], MAX_CHART_POINTS)
+        st.line_chart(shown[cols].rename(columns={v: k for k, v in METRIC_LABELS.items()}))
+        if len(shown) < len(trend):
+            st.caption(f"{len(trend):,}개 구간 중 {len(shown):,}개 점으로 표시 (LTTB 다운샘플링)")
 
     st.subheader("2) 부서 내 위험도 분포 (RN별 평균 위험도)")
-    by_nurse = (
-        df.groupby("nurse_name")["overall_risk_score"]
-        .mean()
-        .sort_values(ascending=False)
-        .reset_index()
-        .rename(columns={"overall_risk_score": "mean_risk"})
-    )
+    by_nurse = get_artifact("nurse_risk")
     st.dataframe(by_nurse)
 
+    # 기간 누적합 인덱스로 선택 기간만 다시 요약 (행 재집계 없이 간호사당 O(1))
+    index = get_artifact("window_index")
+    period = st.date_input(
+        "코드북 요약 기간",
+        value=(index.start, index.end),
+        min_value=index.start,
+        max_value=index.end,
+    )
+    if isinstance(period, (tuple, list)) and len(period) == 2:
+        st.caption(f"{period[0]} ~ {period[1]} 코드북 기준 간호사별 위험도")
+        st.dataframe(index.summary(*period), hide_index=True)
+
     selected = st.selectbox("상세 분석할 간호사 선택", by_nurse["nurse_name"])
     st.subheader("3) 선택된 간호사 상세 위험도 분석")
     st.markdown(describe_nurse_risk(df, selected))
 
+    st.subheader("4) 근무 교환 제안 (환자안전 위험점수 감소)")
+    st.caption(
+        "같은 날 두 간호사의 근무를 맞바꿨을 때 환자안전 위험점수(patient_safety_risk)가 줄어드는 후보입니다. "
+        "safety_risk_delta에는 피로도 점수가 들어가지 않으므로 전체 위험점수(overall) 변화와 다를 수 있습니다. "
+        "맞교환이라 날짜별 근무 인원은 그대로 유지됩니다. "
+        "fairness_delta는 야간/OFF/주말근무 일수 표준편차 합의 변화(음수일수록 공정)입니다."
+    )
+    if st.toggle("교환 제안 계산/표시", value=False):
+        proposals = get_artifact("swap_proposals")
+        if proposals.empty:
+            st.info("위험도를 낮추는 맞교환 후보가 없습니다.")
+        else:
+            st.dataframe(proposals, hide_index=True)
+
+    st.subheader("5) 자동 개선안 (국소 탐색)")
+    optimize_section(df)
+
 
 if __name__ == "__main__":
-    main()
+    run_page(main)
@@ -1,7 +1,10 @@
 import streamlit as st
 import pandas as pd
 
-from utils.fairness import compute_fairness_table, compute_fairness_stats
+from utils.artifacts import has_input, get_artifact
+from utils.preferences import nurse_match_ratios, priority_match_ratios
+from utils.table_view import paged_table
+from utils.profiling import run_page
 
 
 # ------------------------------------------------
@@ -10,16 +13,14 @@ from utils.fairness import compute_fairness_table, compute_fairness_stats
 def main():
     st.title("공정성 대시보드 (Fairness Dashboard)")
 
-    df = st.session_state.get("schedule_df", None)
-
-    if df is None:
+    if not has_input("raw_schedule"):
         st.info("먼저 스케줄 파일을 업로드해주세요.")
         return
 
     # ------------------------------------------------
-    # 1) 공정성 테이블 생성
+    # 1) 공정성 테이블 (업로드당 한 번 계산, 메인 페이지와 공유)
     # ------------------------------------------------
-    fair = compute_fairness_table(df)
+    fair = get_artifact("fairness_table")
 
     REQUIRED_COLS = [
         "nurse_name",
@@ -72,6 +73,10 @@ def main():
             "Preferred Shift 반영율",
             f"{row['pref_match_ratio'] * 100:.1f}%"
         )
+        if int(row.get("pref_requests", 0)) > 0:
+            st.caption(f"희망 근무/휴무 신청 {int(row['pref_requests'])}건 기준")
+        else:
+            st.caption("희망 신청 없음 (기본값 50%)")
 
         st.markdown("**OFF / NIGHT / Interval**")
         st.write(
@@ -92,22 +97,71 @@ def main():
     # ------------------------------------------------
     st.subheader("4) 병동 전체 공정성 통계")
 
-    stats_raw = compute_fairness_stats(fair)
-
+    stats_raw = get_artifact("fairness_stats")
 
     stats = {
         "fairness_score_std": stats_raw.get("fairness_score_std", 0.0),
         "avg_pref_match_ratio": stats_raw.get("avg_pref_match_ratio", 0.0),
         "total_night_std": stats_raw.get("total_night_std", 0.0),
         "total_off_std": stats_raw.get("total_off_std", 0.0),
+        "weekend_std": stats_raw.get("weekend_std", 0.0),
     }
 
-    colA, colB, colC, colD = st.columns(4)
+    colA, colB, colC, colD, colE = st.columns(5)
 
     colA.metric("Fairness Score STD", f"{stats['fairness_score_std']:.3f}")
     colB.metric("평균 선호 반영율", f"{stats['avg_pref_match_ratio'] * 100:.1f}%")
     colC.metric("Night 횟수 STD", f"{stats['total_night_std']:.2f}")
     colD.metric("OFF 일수 STD", f"{stats['total_off_std']:.2f}")
+    colE.metric("주말 근무 STD", f"{stats['weekend_std']:.2f}")
+
+    # ------------------------------------------------
+    # 6) 불평등 지표 + 부트스트랩 신뢰구간
+    # ------------------------------------------------
+    st.subheader("5) 야간 · 주말 · OFF 부담 불평등 (95% 부트스트랩 신뢰구간)")
+    st.caption(
+        "Gini는 0에 가까울수록, Jain 지수는 1에 가까울수록 고르게 나뉜 것입니다. "
+        "max/min은 가장 많은 간호사와 가장 적은 간호사의 비율(최솟값이 0이면 inf)입니다. "
+        "병동 Gini의 신뢰구간 하한이 병원 전체 Gini보다 높으면 '병원 대비 불균등'으로 표시합니다."
+    )
+    ineq = get_artifact("fairness_inequality")
+    burden_labels = {"night": "야간", "weekend": "주말 근무", "off": "OFF"}
+    shown = ineq.assign(burden=ineq["burden"].map(burden_labels))
+    st.dataframe(
+        shown.rename(columns={"above_hospital": "병원 대비 불균등"}),
+        use_container_width=True,
+        hide_index=True,
+    )
+    flagged = shown[shown["above_hospital"]]
+    if not flagged.empty:
+        st.warning(
+            "병원 전체보다 통계적으로 불균등한 병동: "
+            + ", ".join(f"{r.ward}({r.burden})" for r in flagged.itertuples())
+        )
+
+    # ------------------------------------------------
+    # 7) 희망 근무/휴무 신청 반영 (신청표를 올린 경우)
+    # ------------------------------------------------
+    matched = get_artifact("preference_match")
+    if matched is not None:
+        st.subheader("6) 희망 근무/휴무 신청 반영")
+        if matched.empty:
+            st.info("근무표 기간 안에 해당하는 희망 신청이 없습니다.")
+        else:
+            st.caption(
+                "근무 희망(D/E/N)은 같은 근무 구분, 휴무 희망은 OFF로 배정되면 반영된 것으로 봅니다. "
+                "우선순위 1이 가장 높습니다."
+            )
+            st.dataframe(
+                priority_match_ratios(matched).rename(columns={"priority": "우선순위"}),
+                use_container_width=True,
+                hide_index=True,
+            )
+            paged_table(
+                nurse_match_ratios(matched).sort_values("pref_match_ratio", kind="stable"),
+                key="pref_by_nurse",
+                page_size=20,
+            )
 
     st.caption(
         "※ 공정성 분석은 연구용이며, 인사평가·징계 근거로 직접 사용해서는 안 됩니다."
@@ -118,4 +172,4 @@ def main():
 # STREAMLIT ENTRY POINT
 # ------------------------------------------------
 if __name__ == "__main__":
-    main()
+    run_page(main)
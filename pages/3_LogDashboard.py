@@ -1,13 +1,21 @@
 import streamlit as st
 import pandas as pd
 
-st.title("AI 분석 기록 대시보드")
+from utils.profiling import run_page
 
-logs = st.session_state.get("analysis_logs", [])
 
-if not logs:
-    st.info("아직 분석 로그가 없습니다.")
-    st.stop()
+def main():
+    st.title("AI 분석 기록 대시보드")
 
-df = pd.DataFrame(logs)
-st.dataframe(df, height=600)
+    logs = st.session_state.get("analysis_logs", [])
+
+    if not logs:
+        st.info("아직 분석 로그가 없습니다.")
+        return
+
+    df = pd.DataFrame(logs)
+    st.dataframe(df, height=600)
+
+
+if __name__ == "__main__":
+    run_page(main)
@@ -1,8 +1,24 @@
 import streamlit as st
 import pandas as pd
-import datetime as dt
 
 from utils.risk import risk_level
+from utils.artifacts import has_input, get_artifact
+from utils.table_view import paged_table
+from utils.profiling import run_page
+
+# 전후 7일 컨텍스트에서 브라우저로 보낼 컬럼
+CONTEXT_COLUMNS = [
+    "date",
+    "shift_code",
+    "shift_type",
+    "consecutive_working_days",
+    "consecutive_night_shifts",
+    "staffing_diff",
+    "ED_quick_return",
+    "N_quick_return",
+    "fatigue_alertness",
+    "overall_risk_score",
+]
 
 
 def generate_daily_summary(row: pd.Series) -> str:
@@ -29,6 +45,13 @@ def generate_daily_summary(row: pd.Series) -> str:
     if cn >= 2:
         lines.append(f"{cn}일 연속 야간 근무가 이어지고 있습니다.")
 
+    fatigue = int(row.get("fatigue_risk", 0) or 0)
+    if fatigue > 0:
+        lines.append(
+            f"근무 중 예상 최저 각성도가 {row['fatigue_alertness']:.1f}로, "
+            f"일주기/수면 부족에 따른 피로 위험 {fatigue}점이 포함되어 있습니다."
+        )
+
     if row.get("weekend_flag"):
         lines.append("주말 근무에 해당합니다.")
 
@@ -38,41 +61,33 @@ def generate_daily_summary(row: pd.Series) -> str:
 def main():
     st.title("일별 스케줄 리포트")
 
-    df = st.session_state.get("schedule_df")
-    if df is None:
+    if not has_input("raw_schedule"):
         st.warning("메인 페이지에서 먼저 스케줄 파일을 업로드해 주세요.")
         return
 
-    nurse_list = st.session_state.get("nurse_list") or sorted(df["nurse_name"].dropna().unique().tolist())
+    index = get_artifact("roster_index")
+    nurse_list = get_artifact("nurse_list")
     nurse_name = st.selectbox("간호사 선택", options=nurse_list)
 
     # 날짜 선택 (데이터 범위 기반)
-    nurse_df = df[df["nurse_name"] == nurse_name]
-    if nurse_df.empty:
+    min_date, max_date = index.date_range(nurse_name)
+    if min_date is None:
         st.info("선택한 간호사의 스케줄이 없습니다.")
         return
 
-    min_date = nurse_df["date"].min()
-    max_date = nurse_df["date"].max()
-
     date = st.date_input("날짜 선택", value=max_date, min_value=min_date, max_value=max_date)
 
-    day_row = nurse_df[nurse_df["date"] == date]
-    if day_row.empty:
+    summary = index.summary(nurse_name, date, render=generate_daily_summary)
+    if summary is None:
         st.info("해당 날짜에 스케줄이 없습니다.")
         return
 
-    row = day_row.iloc[0]
-
     st.subheader("1. 요약 해설")
-    st.markdown(generate_daily_summary(row))
+    st.markdown(summary)
 
     st.subheader("2. 전후 7일 스케줄 컨텍스트")
-    start = date - dt.timedelta(days=7)
-    end = date + dt.timedelta(days=7)
-    ctx = nurse_df[(nurse_df["date"] >= start) & (nurse_df["date"] <= end)].sort_values("date")
-    st.dataframe(ctx)
-
+    ctx = index.context(nurse_name, date, days=7)
+    paged_table(ctx, key="daily_context", page_size=15, columns=CONTEXT_COLUMNS, searchable=False)
 
 if __name__ == "__main__":
-    main()
+    run_page(main)
@@ -1,27 +1,77 @@
 import streamlit as st
+import pandas as pd
+
 from utils.analysis_log import fetch_logs
+from utils.llm_meter import latency_summary, llm_calls, token_usage
+from utils.table_view import paged_table
+from utils.profiling import run_page
 
-st.title("AI 분석 기록 대시보드")
+# 지표 계산에 읽는 최근 로그 수
+LOG_LIMIT = 5000
 
-logs = fetch_logs()
+USAGE_FREQ = {"일별": "D", "시간별": "h", "주별": "W"}
 
-if not logs:
-    st.info("아직 기록된 분석 로그가 없습니다.")
-    st.stop()
 
-# 표로 표시하기 위해 데이터프레임 변환
-import pandas as pd
-df_logs = pd.DataFrame(logs)
+def llm_metrics(logs):
+    """LLM 호출 기록(utils.llm_meter)의 모델별 지연 · 처리량 · 토큰 사용량."""
+    st.subheader("LLM 호출 지표 (모델별)")
+    calls = llm_calls(logs)
+    if calls.empty:
+        st.caption("아직 기록된 LLM 호출이 없습니다. 챗봇 질문부터 호출마다 지연과 토큰 수가 기록됩니다.")
+        return
+
+    ok = calls["status"].eq(200)
+    total_tokens = int(calls["prompt_tokens"].fillna(0).sum() + calls["completion_tokens"].fillna(0).sum())
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("호출 수", f"{len(calls):,}", delta=f"오류 {int((~ok).sum())}건", delta_color="off")
+    m2.metric("전체 지연 p50", f"{calls.loc[ok, 'total_ms'].quantile(0.5) / 1000:.2f}s" if ok.any() else "-")
+    m3.metric("전체 지연 p95", f"{calls.loc[ok, 'total_ms'].quantile(0.95) / 1000:.2f}s" if ok.any() else "-")
+    m4.metric("토큰 합계", f"{total_tokens:,}")
+
+    st.dataframe(latency_summary(calls), use_container_width=True, hide_index=True)
+    if calls["token_source"].eq("estimate").any():
+        st.caption("응답에 usage가 없는 호출의 토큰 수는 로컬 추정값입니다 (token_source = estimate).")
+
+    freq = USAGE_FREQ[st.radio("토큰 사용량 집계 단위", list(USAGE_FREQ), horizontal=True)]
+    st.bar_chart(token_usage(calls, freq), use_container_width=True)
+
+    with st.expander("호출 기록 (최신순)"):
+        paged_table(calls[::-1].reset_index(drop=True), key="llm_calls", page_size=20)
+
+
+def main():
+    st.title("AI 분석 기록 대시보드")
+
+    logs = fetch_logs(limit=LOG_LIMIT)
+
+    if not logs:
+        st.info("아직 기록된 분석 로그가 없습니다.")
+        return
+
+    llm_metrics(logs)
+
+    # 표로 표시하기 위해 데이터프레임 변환 (최신순)
+    df_logs = pd.DataFrame(logs)[::-1].reset_index(drop=True)
+
+    st.subheader("AI 응답 로그 (최신순)")
+    visible = paged_table(
+        df_logs,
+        key="ai_logs",
+        page_size=20,
+        columns=["timestamp", "query", "response"],
+        use_container_width=True,
+    )
+
+    # 현재 페이지에 보이는 로그만 상세 보기
+    st.subheader("상세 로그 열람")
 
-st.subheader("AI 응답 로그 (최신순)")
-st.dataframe(df_logs[::-1], use_container_width=True)
+    for row in visible.to_dict("records"):
+        with st.expander(f"[{row['timestamp']}] 질의 내용 보기"):
+            st.write("질문:")
+            st.code(row["query"])
+            st.write("응답:")
+            st.write(row["response"])
 
-# 각 로그 상세 보기
-st.subheader("상세 로그 열람")
 
-for i, row in enumerate(df_logs[::-1].to_dict("records"), start=1):
-    with st.expander(f"[{row['timestamp']}] 질의 내용 보기"):
-        st.write("질문:")
-        st.code(row["query"])
-        st.write("응답:")
-        st.write(row["response"])
+if __name__ == "__main__":
+    run_page(main)
@@ -0,0 +1,153 @@
+import datetime as dt
+
+import streamlit as st
+import pandas as pd
+
+from utils.artifacts import set_input, has_input, get_artifact
+from utils.generator import baselines_from_codebook, generate_schedule, limits_from_codebook
+from utils.table_view import paged_table
+from utils.profiling import run_page
+
+
+def read_table(uploaded) -> pd.DataFrame:
+    if uploaded.name.lower().endswith(".csv"):
+        return pd.read_csv(uploaded)
+    return pd.read_excel(uploaded)
+
+
+def nurses_from_current_roster() -> pd.DataFrame:
+    """메인 페이지에 업로드한 근무표의 간호사 목록 (is_novice 포함)."""
+    raw = get_artifact("raw_schedule")
+    cols = [c for c in ["nurse_id", "nurse_name", "is_novice", "ward"] if c in raw.columns]
+    return raw[cols].drop_duplicates("nurse_id").reset_index(drop=True)
+
+
+def next_month_start(today: dt.date) -> dt.date:
+    first = today.replace(day=1)
+    return (first + dt.timedelta(days=32)).replace(day=1)
+
+
+def main():
+    st.title("근무표 초안 자동 생성")
+    st.caption(
+        "간호사 목록과 근무별 기준 인원, 코드북 제약(연속 근무/야간, 휴무·야간 일수, "
+        "ND/NE 등 Critical quick return 금지)을 지키는 근무표 초안을 만듭니다."
+    )
+
+    # --------------------------------------
+    # 1. 간호사 목록
+    # --------------------------------------
+    st.subheader("1. 간호사 목록")
+    source = st.radio(
+        "간호사 목록 가져오기",
+        ["업로드한 근무표의 간호사", "간호사 목록 파일 업로드"],
+        horizontal=True,
+    )
+    nurses = None
+    if source == "업로드한 근무표의 간호사":
+        if has_input("raw_schedule"):
+            nurses = nurses_from_current_roster()
+        else:
+            st.info("메인 페이지에서 근무표를 업로드하거나, 간호사 목록 파일을 올려 주세요.")
+    else:
+        f = st.file_uploader("간호사 목록 (필수 컬럼: nurse_id, nurse_name / 선택: is_novice, ward)", type=["csv", "xlsx"])
+        if f is not None:
+            nurses = read_table(f)
+
+    if nurses is None or nurses.empty:
+        return
+    n_novice = int(nurses["is_novice"].fillna(False).astype(bool).sum()) if "is_novice" in nurses else 0
+    st.write(f"간호사 {len(nurses)}명 (신규 {n_novice}명)")
+
+    # --------------------------------------
+    # 2. 기간 · 기준 인원 · 제약
+    # --------------------------------------
+    st.subheader("2. 기간 · 기준 인원 · 제약")
+    c1, c2, c3 = st.columns(3)
+    start = c1.date_input("시작일", value=next_month_start(dt.date.today()))
+    n_days = c2.number_input("일수", min_value=7, max_value=62, value=31, step=1)
+    time_limit = c3.slider("생성 시간 제한 (초)", min_value=1, max_value=60, value=5)
+
+    defaults = baselines_from_codebook()
+    cols = st.columns(len(defaults))
+    baselines = {
+        code: int(col.number_input(f"{code} 기준 인원", min_value=0, max_value=100, value=v, step=1))
+        for col, (code, v) in zip(cols, defaults.items())
+    }
+
+    limits = limits_from_codebook(n_days=int(n_days))
+    with st.expander("코드북 제약 (필요 시 조정)"):
+        l1, l2, l3, l4 = st.columns(4)
+        limits["max_consecutive_work"] = l1.number_input("최대 연속 근무", 1, 14, limits["max_consecutive_work"])
+        limits["max_consecutive_nights"] = l2.number_input("최대 연속 야간", 1, 14, limits["max_consecutive_nights"])
+        limits["max_night_days"] = l3.number_input("최대 야간 일수", 0, int(n_days), limits["max_night_days"])
+        limits["min_off_days"] = l4.number_input("최소 휴무 일수", 0, int(n_days), limits["min_off_days"])
+        st.caption("금지 패턴: " + ", ".join(p["sequence"] for p in limits["forbidden_patterns"]))
+
+    req_file = st.file_uploader(
+        "근무 요청 (선택, 컬럼: nurse_id, date, shift_code, priority)", type=["csv", "xlsx"], key="draft_requests"
+    )
+    requests = read_table(req_file) if req_file is not None else None
+
+    # --------------------------------------
+    # 3. 생성
+    # --------------------------------------
+    if st.button("근무표 초안 생성", type="primary"):
+        bar = st.progress(0.0, text="생성 준비 중...")
+        try:
+            roster, report = generate_schedule(
+                nurses,
+                start,
+                n_days=int(n_days),
+                baselines=baselines,
+                limits=limits,
+                requests=requests,
+                time_limit=float(time_limit),
+                progress=lambda frac, msg: bar.progress(frac, text=msg),
+            )
+        except ValueError as e:
+            st.error(f"생성할 수 없습니다: {e}")
+            return
+        bar.progress(1.0, text=f"완료: {report['restarts']}회 시도, {report['elapsed_sec']}초")
+        st.session_state["draft_roster"] = roster
+        st.session_state["draft_report"] = report
+
+    roster = st.session_state.get("draft_roster")
+    report = st.session_state.get("draft_report")
+    if roster is None:
+        return
+
+    st.subheader("3. 생성 결과")
+    m1, m2, m3 = st.columns(3)
+    m1.metric("총 위험점수", report["total_risk"])
+    m2.metric("기준 인원 부족 (명·근무)", int(report["shortfall"]["shortfall"].sum()))
+    m3.metric("반영 못 한 요청", f"{len(report['unmet_requests'])} / {report['requests_total']}")
+
+    # 동명이인이 있을 수 있으므로 nurse_id로 펼치고 이름은 표시용 컬럼으로 붙인다
+    wide = roster.pivot(index="nurse_id", columns="date", values="shift_code")
+    wide.columns = [d.strftime("%m-%d") for d in wide.columns]
+    names = roster.drop_duplicates("nurse_id").set_index("nurse_id")["nurse_name"]
+    wide.insert(0, "nurse_name", names.reindex(wide.index))
+    st.dataframe(wide, use_container_width=True)
+
+    if not report["shortfall"].empty:
+        st.warning("기준 인원을 채우지 못한 근무가 있습니다.")
+        paged_table(report["shortfall"], key="draft_shortfall", page_size=20, searchable=False)
+    if not report["unmet_requests"].empty:
+        st.markdown("**반영하지 못한 요청**")
+        st.dataframe(report["unmet_requests"], hide_index=True)
+
+    c1, c2 = st.columns(2)
+    c1.download_button(
+        "CSV 다운로드",
+        roster.to_csv(index=False).encode("utf-8-sig"),
+        file_name=f"roster_draft_{start}.csv",
+        mime="text/csv",
+    )
+    if c2.button("이 초안을 분석 대상으로 설정"):
+        set_input("raw_schedule", roster, key=f"draft:{start}:{report['objective']}")
+        st.success("대시보드/리포트 페이지에서 초안을 분석할 수 있습니다.")
+
+
+if __name__ == "__main__":
+    run_page(main)
@@ -0,0 +1,79 @@
+import streamlit as st
+
+from utils.artifacts import set_input
+from utils.compare import ALL_WARDS, RANK_BY, compare_rosters, period_mismatch
+from utils.features import load_schedule_file
+from utils.profiling import run_page
+
+# 비교표에서 강조할 지표 (낮을수록 좋음)
+HIGHLIGHT_COLUMNS = ["total_risk", "critical_nurses", "quick_returns", "understaffed_shifts", "fairness_score_std"]
+
+
+def main():
+    st.title("후보 근무표 비교")
+    st.caption(
+        "같은 기간의 후보 근무표 여러 개를 한 번에 올리면, 피처 · 위험도 · 공정성 · 코드북 요약을 "
+        "병렬 작업 프로세스에서 계산해 병동 단위 지표로 순위를 매깁니다."
+    )
+
+    uploads = st.file_uploader(
+        "후보 근무표 파일들 (CSV 또는 XLSX, 여러 개 선택)",
+        type=["csv", "xlsx"],
+        accept_multiple_files=True,
+    )
+    if not uploads:
+        st.info("비교할 근무표 파일을 2개 이상 올려 주세요.")
+        return
+
+    st.write(f"{len(uploads)}개 파일 선택됨 · 순위 기준: " + " → ".join(RANK_BY))
+
+    # 같은 파일 묶음이면 rerun마다 다시 평가하지 않는다
+    signature = tuple(sorted(f.file_id for f in uploads))
+    if st.button("비교 실행", type="primary"):
+        bar = st.progress(0.0, text="평가 시작...")
+        files = [(f.name, f.getvalue()) for f in uploads]
+        table, errors = compare_rosters(
+            files,
+            progress=lambda done, total, name: bar.progress(done / total, text=f"{done}/{total} 완료 ({name})"),
+        )
+        st.session_state["compare_result"] = (signature, table, errors)
+
+    result = st.session_state.get("compare_result")
+    if result is None or result[0] != signature:
+        return
+    _, table, errors = result
+
+    for name, msg in errors.items():
+        st.error(f"{name}: {msg}")
+    if table.empty:
+        return
+    if period_mismatch(table):
+        st.warning("후보 근무표의 기간(시작일/종료일)이 서로 다릅니다. 같은 달 근무표인지 확인해 주세요.")
+
+    wards = table["ward"].unique().tolist()
+    ward = st.selectbox("병동", wards, index=wards.index(ALL_WARDS)) if len(wards) > 1 else ALL_WARDS
+    view = table[table["ward"] == ward].drop(columns="ward")
+
+    st.subheader("1. 순위표")
+    st.dataframe(
+        view.style.highlight_min(subset=HIGHLIGHT_COLUMNS, color="#d4f4dd"),
+        hide_index=True,
+        use_container_width=True,
+    )
+    best = view.iloc[0]
+    st.success(f"1위: {best['roster']} (총 위험점수 {best['total_risk']}, Critical 간호사 {best['critical_nurses']}명)")
+
+    st.subheader("2. 지표별 비교")
+    metric = st.selectbox("지표", HIGHLIGHT_COLUMNS)
+    st.bar_chart(view.set_index("roster")[metric])
+
+    st.subheader("3. 분석 대상으로 설정")
+    choice = st.selectbox("근무표", view["roster"].tolist())
+    if st.button("선택한 근무표를 분석 대상으로 설정"):
+        upload = next(f for f in uploads if f.name == choice)
+        set_input("raw_schedule", load_schedule_file(upload), key=upload.file_id)
+        st.success(f"{choice}을(를) 대시보드/리포트에서 분석할 수 있습니다.")
+
+
+if __name__ == "__main__":
+    run_page(main)
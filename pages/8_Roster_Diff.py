@@ -0,0 +1,107 @@
+import streamlit as st
+
+from utils.artifacts import artifact_version, set_input, has_input, get_artifact
+from utils.diff import diff_rosters
+from utils.features import load_schedule_file
+from utils.table_view import paged_table
+from utils.profiling import run_page
+
+CHANGE_LABELS = {"changed": "변경", "added": "추가", "removed": "삭제"}
+
+
+def main():
+    st.title("근무표 수정본 비교")
+    st.caption(
+        "현재 분석 중인 근무표와 수정본을 (간호사, 날짜) 단위로 맞춰 바뀐 칸을 찾고, "
+        "바뀐 간호사 · 날짜만 다시 계산해 위험점수 · 인원 · 공정성 변화를 보여 줍니다."
+    )
+
+    if not has_input("raw_schedule"):
+        st.info("메인 페이지에서 기준 근무표를 먼저 업로드해 주세요.")
+        return
+
+    upload = st.file_uploader("수정본 근무표 (CSV 또는 XLSX)", type=["csv", "xlsx"])
+    if upload is None:
+        return
+
+    # 같은 기준/수정본(과 희망 신청)이면 rerun마다 다시 비교하지 않는다 (버전 = 내용 해시)
+    signature = (upload.file_id, artifact_version("raw_schedule"), artifact_version("preference_index"))
+    result = st.session_state.get("diff_result")
+    if result is None or result[0] != signature:
+        try:
+            new = load_schedule_file(upload)
+        except Exception as e:
+            st.error(f"수정본을 읽을 수 없습니다: {e}")
+            return
+        diff = diff_rosters(
+            get_artifact("raw_schedule"),
+            new,
+            old_scored=get_artifact("risk_scores"),
+            old_fairness=get_artifact("fairness_table"),
+            preferences=get_artifact("preference_index"),
+        )
+        st.session_state["diff_result"] = (signature, diff, new)
+    _, diff, new = st.session_state["diff_result"]
+
+    changes = diff["changes"]
+    if changes.empty:
+        st.success("두 근무표가 같습니다.")
+        return
+
+    # --------------------------------------
+    # 1. 요약
+    # --------------------------------------
+    old_risk, new_risk = diff["total_risk"]
+    touched = diff["touched"]
+    m1, m2, m3 = st.columns(3)
+    m1.metric("바뀐 칸", len(changes))
+    m2.metric("총 위험점수", new_risk, delta=new_risk - old_risk, delta_color="inverse")
+    m3.metric("다시 계산한 행", f"{touched['rescored_rows']} / {touched['total_rows']}")
+    st.caption(f"바뀐 간호사 {touched['nurses']}명 · 바뀐 날짜 {touched['dates']}일")
+
+    # --------------------------------------
+    # 2. 바뀐 칸
+    # --------------------------------------
+    st.subheader("1. 바뀐 칸")
+    view = changes.assign(change=changes["change"].map(CHANGE_LABELS))
+    paged_table(view, key="diff_changes", page_size=20)
+
+    # --------------------------------------
+    # 3. 위험점수 변화
+    # --------------------------------------
+    st.subheader("2. 위험점수 변화")
+    c1, c2 = st.columns(2)
+    with c1:
+        st.markdown("**간호사별**")
+        st.dataframe(diff["nurse_delta"], hide_index=True, use_container_width=True)
+    with c2:
+        st.markdown("**날짜별**")
+        day = diff["day_delta"]
+        if not day.empty:
+            st.bar_chart(day.set_index("date")["risk_delta"])
+
+    # --------------------------------------
+    # 4. 인원 변화
+    # --------------------------------------
+    st.subheader("3. 근무별 인원 (staffing_diff: 기준 - 배치, 양수면 부족)")
+    if diff["staffing_delta"].empty:
+        st.write("인원 변화가 없습니다.")
+    else:
+        st.dataframe(diff["staffing_delta"], hide_index=True, use_container_width=True)
+
+    # --------------------------------------
+    # 5. 공정성 변화
+    # --------------------------------------
+    st.subheader("4. 공정성 변화")
+    st.dataframe(diff["fairness_stats"], use_container_width=True)
+    if not diff["fairness_delta"].empty:
+        st.dataframe(diff["fairness_delta"], hide_index=True, use_container_width=True)
+
+    if st.button("수정본을 분석 대상으로 설정"):
+        set_input("raw_schedule", new, key=upload.file_id)
+        st.session_state.pop("diff_result", None)
+        st.success(f"{upload.name}을(를) 대시보드/리포트에서 분석할 수 있습니다.")
+
+
+if __name__ == "__main__":
+    run_page(main)
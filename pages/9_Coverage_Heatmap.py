@@ -0,0 +1,116 @@
+import streamlit as st
+import pandas as pd
+
+from utils.artifacts import has_input, get_artifact
+from utils.coverage import SHIFTS, apply_baselines, default_baselines, risky_runs
+from utils.table_view import paged_table
+from utils.profiling import run_page
+
+METRIC_LABELS = {
+    "부족 인원 (기준 - 실제)": "deficit",
+    "신규 간호사 비율": "novice_ratio",
+    "근무 인원": "staff",
+}
+SHIFT_LABELS = {"DAY": "Day", "EVENING": "Evening", "NIGHT": "Night"}
+
+# 병동 전체 개요 히트맵에 그릴 병동 수 상한 (부족 칸이 많은 순)
+MAX_OVERVIEW_WARDS = 60
+
+
+def heatmap(data: pd.DataFrame, x: str, y: str, color: str, y_sort, title: str, tooltip):
+    import altair as alt
+
+    return (
+        alt.Chart(data, title=title)
+        .mark_rect()
+        .encode(
+            x=alt.X(f"{x}:O", title=None, axis=alt.Axis(labelAngle=-90)),
+            y=alt.Y(f"{y}:N", title=None, sort=y_sort),
+            color=alt.Color(f"{color}:Q", scale=alt.Scale(scheme="orangered"), title=None),
+            tooltip=tooltip,
+        )
+        .properties(height=alt.Step(18))
+    )
+
+
+def main():
+    st.title("근무 커버리지 · 숙련도 구성 히트맵")
+    st.caption(
+        "날짜 × 근무(Day/Evening/Night)별 근무 인원과 신규 간호사(is_novice) 비율을 기준 인원과 비교합니다. "
+        "인원이 부족하면서 신규 비율이 높은 근무가 연속되는 구간을 따로 보여 줍니다."
+    )
+
+    if not has_input("raw_schedule"):
+        st.info("메인 페이지에서 근무표를 먼저 업로드해 주세요.")
+        return
+
+    counts = get_artifact("coverage_counts")
+    if counts.empty:
+        st.info("근무 행이 없습니다.")
+        return
+
+    # --------------------------------------
+    # 기준 인원 / 신규 비율 기준
+    # --------------------------------------
+    defaults = default_baselines()
+    cols = st.columns(len(SHIFTS) + 1)
+    baselines = {
+        s: int(c.number_input(f"{SHIFT_LABELS[s]} 기준 인원", min_value=0, value=defaults[s], step=1))
+        for s, c in zip(SHIFTS, cols)
+    }
+    novice_limit = cols[-1].slider("신규 비율 기준", min_value=0.1, max_value=1.0, value=0.5, step=0.05)
+
+    coverage = apply_baselines(counts, baselines, novice_limit)
+    runs = risky_runs(coverage)
+
+    m1, m2, m3 = st.columns(3)
+    m1.metric("인원 부족 근무", f"{int(coverage['understaffed'].sum()):,} / {len(coverage):,}")
+    m2.metric("부족 + 신규 비율 높음", f"{int(coverage['flagged'].sum()):,}")
+    m3.metric("연속 위험 구간", f"{len(runs):,}")
+
+    # --------------------------------------
+    # 1. 병동 개요 (병동이 여럿일 때)
+    # --------------------------------------
+    wards = coverage["ward"].unique().tolist()
+    if len(wards) > 1:
+        st.subheader("1) 병동 × 날짜 위험 근무 수")
+        daily = coverage.groupby(["ward", "date"], sort=False)["flagged"].sum().reset_index()
+        worst = (
+            daily.groupby("ward")["flagged"].sum().sort_values(ascending=False).head(MAX_OVERVIEW_WARDS).index
+        )
+        shown = daily[daily["ward"].isin(worst)].assign(date=lambda d: d["date"].astype(str))
+        st.altair_chart(
+            heatmap(shown, "date", "ward", "flagged", list(worst), "인원 부족 + 신규 비율 높음 근무 수",
+                    ["ward", "date", "flagged"]),
+            use_container_width=True,
+        )
+        if len(wards) > MAX_OVERVIEW_WARDS:
+            st.caption(f"{len(wards):,}개 병동 중 위험 근무가 많은 {MAX_OVERVIEW_WARDS}개 병동만 표시")
+
+    # --------------------------------------
+    # 2. 병동 하나의 날짜 × 근무 히트맵
+    # --------------------------------------
+    st.subheader("2) 날짜 × 근무 히트맵")
+    c1, c2 = st.columns(2)
+    ward = c1.selectbox("병동", wards) if len(wards) > 1 else wards[0]
+    metric = METRIC_LABELS[c2.radio("지표", list(METRIC_LABELS), horizontal=True)]
+
+    sub = coverage[coverage["ward"] == ward].assign(date=lambda d: d["date"].astype(str))
+    st.altair_chart(
+        heatmap(sub, "date", "shift", metric, SHIFTS, f"{ward} · {metric}",
+                ["date", "shift", "staff", "novice", "novice_ratio", "baseline", "deficit"]),
+        use_container_width=True,
+    )
+
+    # --------------------------------------
+    # 3. 연속 위험 구간
+    # --------------------------------------
+    st.subheader("3) 인원 부족 + 신규 비율 높은 근무가 이어지는 구간")
+    if runs.empty:
+        st.success("2개 근무 이상 이어지는 위험 구간이 없습니다.")
+    else:
+        paged_table(runs, key="coverage_runs", page_size=20)
+
+
+if __name__ == "__main__":
+    run_page(main)
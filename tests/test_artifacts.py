@@ -0,0 +1,19 @@
+# tests/test_artifacts.py
+from utils.artifacts import clear_input, get_artifact, has_input, set_input
+from utils.features import prepare_schedule
+from utils.synthetic import generate_preferences, generate_roster
+
+
+def test_clear_input_drops_optional_preferences():
+    """희망 신청 파일을 빼면 공정성 표가 신청 없이 다시 계산된다."""
+    state = {}
+    source = generate_roster(n_nurses=5, n_days=14, seed=0)
+    set_input("raw_schedule", prepare_schedule(source), key="roster", state=state)
+    set_input("preference_requests", generate_preferences(source, seed=0), key="prefs", state=state)
+    assert get_artifact("fairness_table", state=state)["pref_requests"].sum() > 0
+
+    assert clear_input("preference_requests", state=state)
+    assert not has_input("preference_requests", state=state)
+    assert get_artifact("fairness_table", state=state)["pref_requests"].sum() == 0
+    # 이미 지운 입력은 False
+    assert not clear_input("preference_requests", state=state)
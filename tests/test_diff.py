@@ -0,0 +1,41 @@
+# tests/test_diff.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.diff import KEY, changed_cells, rescore_incremental
+from utils.features import add_base_features, prepare_schedule
+from utils.risk import add_risk_scores
+from utils.synthetic import generate_roster
+
+
+def _score(rows: pd.DataFrame) -> pd.DataFrame:
+    return add_risk_scores(add_base_features(rows))
+
+
+def _edit(old: pd.DataFrame, seed: int, n_changes: int = 25, n_removed: int = 3) -> pd.DataFrame:
+    """임의 칸의 근무코드를 바꾸고 몇 행은 지운 새 버전."""
+    rng = np.random.default_rng(seed)
+    new = old.copy()
+    codes = np.array(["D", "E", "N", "OFF"], dtype=object)
+    cells = rng.choice(len(new), n_changes, replace=False)
+    new.loc[new.index[cells], "shift_code"] = codes[rng.integers(0, len(codes), n_changes)]
+    return new.drop(index=new.index[rng.choice(len(new), n_removed, replace=False)]).reset_index(drop=True)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_rescore_incremental_matches_full_rescore(seed):
+    old = prepare_schedule(generate_roster(n_nurses=15, n_days=31, seed=seed))
+    new = _edit(old, seed)
+    changes = changed_cells(old, new)
+    assert not changes.empty
+
+    got = rescore_incremental(_score(old), new, changes)
+    want = _score(new).sort_values(KEY, kind="stable").reset_index(drop=True)
+    pd.testing.assert_frame_equal(got[want.columns], want)
+
+
+def test_rescore_incremental_without_changes_returns_old_scores():
+    old = prepare_schedule(generate_roster(n_nurses=5, n_days=14, seed=0))
+    scored = _score(old)
+    assert rescore_incremental(scored, old, changed_cells(old, old)) is scored
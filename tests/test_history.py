@@ -0,0 +1,61 @@
+# tests/test_history.py
+import pandas as pd
+import pytest
+
+from utils.features import add_base_features, prepare_schedule
+from utils.history import RosterHistory
+from utils.risk import add_risk_scores
+from utils.synthetic import generate_roster
+
+KEY = ["nurse_id", "date"]
+
+
+def _months(seed: int):
+    """약 4개월 근무표 → (전체, 월별 조각 목록)."""
+    full = prepare_schedule(generate_roster(n_nurses=12, n_days=120, seed=seed))
+    month = pd.to_datetime(full["date"]).dt.to_period("M")
+    return full, [full[month == m].reset_index(drop=True) for m in sorted(month.unique())]
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+@pytest.mark.parametrize("round_trip", [False, True])
+def test_monthly_append_matches_full_recompute(seed, round_trip):
+    full, months = _months(seed)
+    assert len(months) >= 4
+
+    history = RosterHistory()
+    parts = []
+    for part in months:
+        parts.append(history.append(part))
+        if round_trip:
+            # 월마다 상태 파일로 저장했다가 다시 읽어도 결과가 같아야 한다
+            history = RosterHistory.from_bytes(history.to_bytes())
+
+    got = pd.concat(parts, ignore_index=True).sort_values(KEY, kind="stable").reset_index(drop=True)
+    want = add_risk_scores(add_base_features(full)).sort_values(KEY, kind="stable").reset_index(drop=True)
+    pd.testing.assert_frame_equal(got[want.columns], want, check_dtype=False)
+    assert history.periods == len(months)
+    assert history.last_date == max(full["date"])
+
+
+def test_append_rejects_overlapping_dates():
+    _, months = _months(0)
+    history = RosterHistory()
+    history.append(months[0])
+    with pytest.raises(ValueError):
+        history.append(months[0].tail(5))
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"not json",
+        b'{"version": 2}',
+        b'{"version": 1}',
+        b'{"version": 1, "tail": [], "nurses": {}}',
+        b'{"version": 1, "tail": {"columns": [], "data": []}, "nurses": {"columns": [], "data": []}}',
+    ],
+)
+def test_from_bytes_rejects_malformed_state(data):
+    with pytest.raises(ValueError):
+        RosterHistory.from_bytes(data)
@@ -0,0 +1,62 @@
+# tests/test_optimizer.py
+import numpy as np
+import pytest
+
+from utils.features import add_base_features, prepare_schedule
+from utils.optimizer import RosterState, optimize_roster
+from utils.risk import add_risk_scores
+from utils.synthetic import generate_roster
+
+
+def _full_risk(rows) -> int:
+    """처음부터 다시 계산한 patient_safety_risk 합 (RosterState.total_risk와 같은 기준)."""
+    return int(add_risk_scores(add_base_features(rows))["patient_safety_risk"].sum())
+
+
+@pytest.fixture(params=[0, 1, 2])
+def rows(request):
+    return prepare_schedule(generate_roster(n_nurses=10, n_days=35, seed=request.param))
+
+
+def test_total_risk_matches_full_rescore(rows):
+    assert RosterState(rows).total_risk() == _full_risk(rows)
+
+
+def test_swap_deltas_match_full_rescore(rows):
+    state = RosterState(rows)
+    base = _full_risk(rows)
+    days, a, b = state.sample_swaps(np.random.default_rng(0), 40)
+    risk, _ = state.swap_deltas(days, a, b)
+    assert len(days) > 0
+
+    for i in range(len(days)):
+        moved = RosterState(rows)
+        moved.apply_swap(int(days[i]), int(a[i]), int(b[i]))
+        assert _full_risk(moved.to_frame(rows)) - base == risk[i]
+        assert moved.total_risk() - state.total_risk() == risk[i]
+
+
+def test_change_deltas_match_full_rescore(rows):
+    state = RosterState(rows)
+    base = _full_risk(rows)
+    days, nurses, codes = state.sample_changes(np.random.default_rng(0), 60)
+    # 같은 코드로 바꾸는 후보는 change_deltas가 불가능(feasible=False)으로 걸러 낸다
+    real = state.grid[nurses, state.back + days] != codes
+    days, nurses, codes = days[real], nurses[real], codes[real]
+    risk, _, _ = state.change_deltas(days, nurses, codes)
+    assert len(days) > 0
+
+    for i in range(len(days)):
+        moved = RosterState(rows)
+        moved.apply_change(int(days[i]), int(nurses[i]), int(codes[i]))
+        assert _full_risk(moved.to_frame(rows)) - base == risk[i]
+
+
+def test_optimize_roster_returns_best_logged_roster(rows):
+    """돌려준 근무표의 위험도 = 시작값과 이동 기록 목적값 중 최솟값 (공정성 가중치 0)."""
+    start = _full_risk(rows)
+    best, moves = optimize_roster(rows, iterations=300, batch=128, fairness_weight=0.0, seed=0)
+    assert not moves.empty
+    assert (moves["safety_risk_delta"].cumsum() + start).tolist() == moves["objective"].tolist()
+    assert _full_risk(best) == min(start, int(moves["objective"].min()))
+    assert best[["nurse_id", "date"]].equals(rows[["nurse_id", "date"]])
@@ -0,0 +1,41 @@
+# tests/test_roster_index.py
+import datetime as dt
+
+import pandas as pd
+import pytest
+
+from utils.features import add_base_features, prepare_schedule
+from utils.risk import add_risk_scores, summarize_codebook
+from utils.roster_index import WindowIndex
+from utils.synthetic import generate_roster
+
+
+def _by_nurse(df: pd.DataFrame) -> pd.DataFrame:
+    return df.sort_values("nurse_id", kind="stable").reset_index(drop=True)
+
+
+@pytest.fixture(scope="module", params=[0, 1])
+def scored(request):
+    return add_risk_scores(add_base_features(prepare_schedule(generate_roster(n_nurses=40, n_days=45, seed=request.param))))
+
+
+def test_full_period_summary_matches_summarize_codebook(scored):
+    got = WindowIndex(scored).summary()
+    want = summarize_codebook(scored)
+    assert list(got.columns) == list(want.columns)
+    pd.testing.assert_frame_equal(_by_nurse(got), _by_nurse(want))
+
+
+def test_window_sums_match_row_filter(scored):
+    index = WindowIndex(scored)
+    start, end = dt.date(2025, 1, 8), dt.date(2025, 1, 21)
+    rows = scored[(scored["date"] >= start) & (scored["date"] <= end)]
+
+    win = index.window(start, end)
+    g = rows.groupby("nurse_id")
+    assert (win["days"].reindex(g.size().index) == g.size()).all()
+    assert (win["night_days"].reindex(g.size().index) == g["shift_type"].apply(lambda s: (s == "NIGHT").sum())).all()
+    assert (
+        win["risk_score"].reindex(g.size().index) == g["overall_risk_score"].sum().round().astype(int)
+    ).all()
+    assert (win["max_consecutive_working_days"].reindex(g.size().index) == g["consecutive_working_days"].max()).all()
@@ -0,0 +1,19 @@
+# tests/test_shared_store.py
+import pandas as pd
+
+from utils.shared_store import read_only_view
+
+
+def test_read_only_view_keeps_shared_frames_intact():
+    """세션이 받은 사본(안쪽 DataFrame 포함)을 바꿔도 공유 원본은 그대로다."""
+    frame = pd.DataFrame({"a": [1, 2, 3]})
+    shared = {"rows": frame, "parts": [frame]}
+
+    view = read_only_view(shared)
+    view["rows"].loc[0, "a"] = 99
+    view["parts"][0]["b"] = 0
+    view["extra"] = 1
+
+    assert frame["a"].tolist() == [1, 2, 3]
+    assert list(frame.columns) == ["a"]
+    assert set(shared) == {"rows", "parts"}
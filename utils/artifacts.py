@@ -0,0 +1,350 @@
+# utils/artifacts.py
+import hashlib
+import os
+import weakref
+from typing import Any, Callable, Dict, MutableMapping, Optional, Sequence, Tuple
+
+import pandas as pd
+import streamlit as st
+
+from utils.features import add_base_features
+from utils.risk import add_risk_scores, nurse_risk_summary, summarize_codebook
+from utils.fairness import compute_fairness_table, compute_fairness_stats
+from utils.fairness_stats import fairness_inequality
+from utils.preferences import PreferenceIndex
+from utils.coverage import coverage_counts
+from utils.roster_index import RosterIndex, WindowIndex
+from utils.trend import compute_risk_rollups
+from utils.shared_store import estimate_nbytes, fingerprint, get_store, read_only_view
+
+# session_state 안에서 파생 산출물 캐시를 보관하는 키
+STATE_KEY = "_artifacts"
+
+# 세션 하나가 참조할 수 있는 산출물 총량 (MB)
+SESSION_BUDGET_MB = float(os.getenv("SESSION_BUDGET_MB", "512"))
+
+# 이름 → (의존 산출물 목록, 계산 함수)
+_REGISTRY: Dict[str, Tuple[Tuple[str, ...], Callable[..., Any]]] = {}
+
+# 올리지 않아도 되는 입력 (없으면 의존 산출물에 None이 전달된다)
+_OPTIONAL_INPUTS = set()
+
+
+# -------------------------------
+# REGISTRATION
+# -------------------------------
+def artifact(name: str, deps: Sequence[str]):
+    """
+    파생 산출물 등록 데코레이터.
+
+        @artifact("fairness_table", deps=["risk_scores"])
+        def _fairness_table(scored):
+            return compute_fairness_table(scored)
+
+    계산 함수는 deps 순서대로 상위 산출물 값을 인자로 받는다.
+    같은 이름으로 다시 등록하면 덮어쓴다 (페이지 rerun 시 재등록 허용).
+    """
+
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        _REGISTRY[name] = (tuple(deps), fn)
+        return fn
+
+    return decorator
+
+
+def optional_input(name: str) -> None:
+    """
+    없어도 되는 입력(희망 신청표 등)을 등록한다.
+    set_input 전에는 버전이 고정값이고 값은 None이라, 그 입력에 의존하는 산출물도 그대로 계산된다.
+    """
+    _OPTIONAL_INPUTS.add(name)
+
+
+# -------------------------------
+# STATE
+# -------------------------------
+class _SessionCache(dict):
+    """
+    세션 하나의 산출물 캐시 {이름: {"value", "version", ...}}.
+    값 자체는 공유 저장소(utils.shared_store)에 버전(내용 해시)으로 한 벌만 있고,
+    여기에는 그 값의 읽기 전용 view만 둔다. 세션이 사라지면(GC) 참조가 해제된다.
+    """
+
+    def __init__(self):
+        super().__init__()
+        store = get_store()
+        self.holder = store.new_holder()
+        self.tick = 0
+        weakref.finalize(self, store.release_all, self.holder)
+
+
+def _cache(state: Optional[MutableMapping] = None) -> _SessionCache:
+    if state is None:
+        state = st.session_state
+    if not isinstance(state.get(STATE_KEY), _SessionCache):
+        state[STATE_KEY] = _SessionCache()
+    return state[STATE_KEY]
+
+
+def _store_entry(cache: _SessionCache, name: str, version: str, shared: Any, **extra) -> Any:
+    """공유 값 참조를 세션 캐시에 기록하고, 이전 버전 참조는 해제한다."""
+    old = cache.get(name)
+    if old is not None and old["version"] != version:
+        get_store().release(old["version"], cache.holder)
+    cache.tick += 1
+    value = read_only_view(shared)
+    cache[name] = {"value": value, "version": version, "used": cache.tick, **extra}
+    return value
+
+
+def set_input(name: str, value: Any, key: Optional[str] = None, state: Optional[MutableMapping] = None) -> bool:
+    """
+    최상위 입력(업로드된 근무표 등)을 등록한다.
+    key(업로드 식별자 등)가 이전과 같으면 아무것도 하지 않고 False를 반환한다.
+    key가 바뀌면 이 입력에 의존하는 산출물은 다음 조회 때 다시 계산된다.
+
+    버전은 항상 내용 해시라서, 다른 세션이 같은 근무표를 올렸다면
+    입력과 파생 산출물 모두 공유 저장소의 같은 값을 참조한다.
+    """
+    cache = _cache(state)
+    entry = cache.get(name)
+    if key is not None and entry is not None and entry.get("key") == key:
+        return False
+    version = fingerprint(value)
+    if entry is not None and entry["version"] == version:
+        entry["key"] = key
+        return False
+    shared = get_store().intern(version, value, holder=cache.holder)
+    _store_entry(cache, name, version, shared, key=key)
+    return True
+
+
+def clear_input(name: str, state: Optional[MutableMapping] = None) -> bool:
+    """
+    입력을 지운다 (사용자가 업로드한 파일을 뺀 경우 등). 공유 저장소 참조도 해제한다.
+    선택 입력이면 등록 전과 같은 상태(값 None)로 돌아가 의존 산출물이 다시 계산된다.
+    지울 입력이 없었으면 False를 반환한다.
+    """
+    cache = _cache(state)
+    entry = cache.pop(name, None)
+    if entry is None:
+        return False
+    get_store().release(entry["version"], cache.holder)
+    return True
+
+
+def has_input(name: str, state: Optional[MutableMapping] = None) -> bool:
+    return name in _cache(state)
+
+
+def clear_artifacts(state: Optional[MutableMapping] = None) -> None:
+    cache = _cache(state)
+    get_store().release_all(cache.holder)
+    cache.clear()
+
+
+def session_memory(state: Optional[MutableMapping] = None) -> Dict[str, int]:
+    """
+    세션 메모리 현황 (bytes).
+    shared: 다른 세션과 같이 참조하는 산출물, private: 이 세션만 참조하는 산출물,
+    other: 산출물 캐시 밖 session_state 값 (비교 결과, 초안 등)
+    """
+    if state is None:
+        state = st.session_state
+    cache = _cache(state)
+    held = get_store().held_bytes(cache.holder)
+    other = sum(estimate_nbytes(v) for k, v in state.items() if k != STATE_KEY)
+    return {**held, "other_bytes": int(other), "artifacts": len(cache)}
+
+
+def _enforce_session_budget(cache: _SessionCache, keep: str) -> None:
+    """
+    세션이 참조하는 산출물이 SESSION_BUDGET_MB를 넘으면 오래 안 쓴 파생 산출물부터 참조를 놓는다.
+    (입력은 유지. 놓은 산출물은 다음 조회 때 공유 저장소에서 다시 받거나 다시 계산된다)
+    """
+    store = get_store()
+    held = store.held_bytes(cache.holder)
+    excess = held["shared_bytes"] + held["private_bytes"] - SESSION_BUDGET_MB * 1e6
+    if excess <= 0:
+        return
+    derived = sorted((e["used"], n) for n, e in cache.items() if n in _REGISTRY and n != keep)
+    for _, n in derived:
+        before = sum(store.held_bytes(cache.holder).values())
+        store.release(cache.pop(n)["version"], cache.holder)
+        excess -= before - sum(store.held_bytes(cache.holder).values())
+        if excess <= 0:
+            break
+
+
+# -------------------------------
+# LOOKUP
+# -------------------------------
+def _version(name: str, cache: _SessionCache) -> str:
+    """값을 계산하지 않고 버전만 구한다 (입력 내용 해시에서 의존 관계를 따라 결정된다)."""
+    if name not in _REGISTRY:
+        entry = cache.get(name)
+        if entry is None and name in _OPTIONAL_INPUTS:
+            return f"absent:{name}"
+        if entry is None:
+            raise KeyError(f"산출물/입력이 없습니다: {name}")
+        return entry["version"]
+    deps, _ = _REGISTRY[name]
+    return hashlib.sha1("|".join([name] + [_version(d, cache) for d in deps]).encode("utf-8")).hexdigest()
+
+
+def _resolve(name: str, cache: _SessionCache) -> Any:
+    if name in _OPTIONAL_INPUTS and name not in cache:
+        return None
+    version = _version(name, cache)
+    entry = cache.get(name)
+    if entry is not None and entry["version"] == version:
+        cache.tick += 1
+        entry["used"] = cache.tick
+        return entry["value"]
+
+    # 다른 세션이 같은 버전을 이미 계산했으면 그 값을 그대로 참조한다.
+    # 상위 산출물은 여기서 실제로 계산해야 할 때만 조회한다.
+    deps, fn = _REGISTRY[name]
+    shared = get_store().get_or_create(
+        version, lambda: fn(*[_resolve(d, cache) for d in deps]), holder=cache.holder
+    )
+    return _store_entry(cache, name, version, shared)
+
+
+def get_artifact(name: str, state: Optional[MutableMapping] = None) -> Any:
+    """
+    산출물을 조회한다. 처음 요청될 때 계산해서 저장하고,
+    상위 입력의 버전이 바뀐 경우에만 다시 계산한다.
+    """
+    cache = _cache(state)
+    value = _resolve(name, cache)
+    _enforce_session_budget(cache, keep=name)
+    return value
+
+
+def artifact_version(name: str, state: Optional[MutableMapping] = None) -> str:
+    """현재 입력 기준 산출물 버전 (값은 계산하지 않음)."""
+    return _version(name, _cache(state))
+
+
+def artifact_ready(name: str, state: Optional[MutableMapping] = None) -> bool:
+    """계산 없이 바로 얻을 수 있는지 (이 세션 캐시나 공유 저장소에 현재 버전이 있는지)."""
+    cache = _cache(state)
+    version = _version(name, cache)
+    entry = cache.get(name)
+    return (entry is not None and entry["version"] == version) or get_store().contains(version)
+
+
+def provide_artifact(name: str, value: Any, state: Optional[MutableMapping] = None) -> None:
+    """
+    다른 곳(백그라운드 작업 등)에서 계산한 산출물을 현재 입력 버전의 값으로 등록한다.
+    value는 등록 함수가 같은 입력으로 돌려줄 값과 같아야 한다.
+    """
+    cache = _cache(state)
+    version = _version(name, cache)
+    shared = get_store().intern(version, value, holder=cache.holder)
+    _store_entry(cache, name, version, shared)
+
+
+# -------------------------------
+# BUILT-IN ARTIFACTS
+# -------------------------------
+# raw_schedule: app.py 업로드 → load_schedule_file 결과 (입력)
+@artifact("features", deps=["raw_schedule"])
+def _features(raw: pd.DataFrame) -> pd.DataFrame:
+    return add_base_features(raw)
+
+
+@artifact("risk_scores", deps=["features"])
+def _risk_scores(base: pd.DataFrame) -> pd.DataFrame:
+    return add_risk_scores(base)
+
+
+@artifact("codebook_summary", deps=["features"])
+def _codebook_summary(base: pd.DataFrame) -> pd.DataFrame:
+    return summarize_codebook(base)
+
+
+@artifact("nurse_list", deps=["raw_schedule"])
+def _nurse_list(raw: pd.DataFrame) -> list:
+    return sorted(raw["nurse_name"].dropna().unique().tolist())
+
+
+# preference_requests: app.py 업로드 → 희망 근무/휴무 신청표 원본 (입력, 선택)
+optional_input("preference_requests")
+
+
+@artifact("preference_index", deps=["preference_requests"])
+def _preference_index(requests: Optional[pd.DataFrame]) -> Optional[PreferenceIndex]:
+    return None if requests is None else PreferenceIndex(requests)
+
+
+@artifact("preference_match", deps=["risk_scores", "preference_index"])
+def _preference_match(scored: pd.DataFrame, index: Optional[PreferenceIndex]) -> Optional[pd.DataFrame]:
+    return None if index is None else index.match(scored)
+
+
+@artifact("fairness_table", deps=["risk_scores", "preference_index"])
+def _fairness_table(scored: pd.DataFrame, preferences: Optional[PreferenceIndex]) -> pd.DataFrame:
+    return compute_fairness_table(scored, preferences)
+
+
+@artifact("fairness_stats", deps=["fairness_table"])
+def _fairness_stats(fair: pd.DataFrame) -> dict:
+    return compute_fairness_stats(fair)
+
+
+@artifact("fairness_inequality", deps=["fairness_table"])
+def _fairness_inequality(fair: pd.DataFrame) -> pd.DataFrame:
+    return fairness_inequality(fair)
+
+
+@artifact("risk_rollups", deps=["risk_scores"])
+def _risk_rollups(scored: pd.DataFrame) -> dict:
+    return compute_risk_rollups(scored)
+
+
+@artifact("nurse_risk", deps=["risk_scores"])
+def _nurse_risk(scored: pd.DataFrame) -> pd.DataFrame:
+    return nurse_risk_summary(scored)
+
+
+@artifact("roster_index", deps=["risk_scores"])
+def _roster_index(scored: pd.DataFrame) -> RosterIndex:
+    return RosterIndex(scored)
+
+
+@artifact("window_index", deps=["risk_scores"])
+def _window_index(scored: pd.DataFrame) -> WindowIndex:
+    return WindowIndex(scored)
+
+
+@artifact("coverage_counts", deps=["features"])
+def _coverage_counts(base: pd.DataFrame) -> pd.DataFrame:
+    return coverage_counts(base)
+
+
+@artifact("swap_proposals", deps=["raw_schedule"])
+def _swap_proposals(raw: pd.DataFrame) -> pd.DataFrame:
+    from utils.optimizer import propose_swaps
+
+    return propose_swaps(raw, top_k=50)
+
+
+# roster_history: app.py 업로드 → 이전 기간 누적 상태 파일 bytes (입력, 선택)
+@artifact("carryover", deps=["raw_schedule", "roster_history"])
+def _carryover(raw: pd.DataFrame, state: bytes) -> dict:
+    from utils.history import RosterHistory
+
+    history = RosterHistory.from_bytes(state)
+    rows = history.append(raw)
+    return {"rows": rows, "fairness": history.cumulative_fairness(), "state": history.to_bytes()}
+
+
+@artifact("history_state", deps=["raw_schedule"])
+def _history_state(raw: pd.DataFrame) -> bytes:
+    from utils.history import RosterHistory
+
+    history = RosterHistory()
+    history.append(raw)
+    return history.to_bytes()
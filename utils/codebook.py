@@ -0,0 +1,296 @@
+# utils/codebook.py
+import copy
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# =========================================================
+# 1. 기본 코드북 (근무표_코딩.xlsx 기준)
+#    - codes: 표준 근무코드별 분류/토큰/근무시간/기준 인원 + 표기 변형(aliases)
+#    - unknown: 코드북에 없는 코드의 분류/토큰 (토큰 X = 패턴에 걸리지 않는 근무일)
+#    - ignore: 분석에서 제외하는 코드
+#    - thresholds: 지표별 위험 등급 구간 [min, max)  (None = 제한 없음)
+#    - quick_returns: 간호사 단위 quick return 패턴 (토큰 문자열)
+# =========================================================
+DEFAULT_CODEBOOK: Dict[str, Any] = {
+    "codes": {
+        "D": {"shift_type": "DAY", "token": "D", "start": 7.0, "end": 15.0, "staffing_baseline": 6,
+              "aliases": ["DAY", "DL", "교외", "검진", "보예"]},
+        "9D": {"shift_type": "DAY", "token": "D", "start": 9.0, "end": 17.0, "staffing_baseline": 1,
+               "aliases": ["8D"]},
+        "DS": {"shift_type": "DAY", "token": "D", "start": 7.0, "end": 15.0, "staffing_baseline": 6},
+        "LEADER": {"shift_type": "DAY", "token": "D", "start": 7.0, "end": 15.0, "staffing_baseline": 6},
+        "E": {"shift_type": "EVENING", "token": "E", "start": 14.0, "end": 22.0, "staffing_baseline": 6,
+              "aliases": ["EVENING", "EL"]},
+        "N": {"shift_type": "NIGHT", "token": "N", "start": 21.5, "end": 31.5, "staffing_baseline": 5,
+              "aliases": ["NIGHT", "NL"]},
+        "NS": {"shift_type": "NIGHT", "token": "N", "start": 21.5, "end": 31.5, "staffing_baseline": 5},
+        "OFF": {"shift_type": "OFF", "token": "O", "staffing_baseline": 0,
+                "aliases": ["O", "휴무", "OFFDAY", "유급", ""]},
+    },
+    # 코드북에 없는 근무코드: 근무일로 취급 (근무시간 미상).
+    # 토큰 X는 quick_returns 패턴에 쓰지 않는 중립 토큰이라, E/N 다음 날이어도 quick return으로 보지 않는다.
+    "unknown": {"shift_type": "OTHER", "token": "X", "staffing_baseline": 0},
+    "ignore": ["A"],  # UM 등 분석 제외
+    "levels": {"Critical": 3, "Moderate": 2, "Low": 1, "No Risk": 0},
+    "thresholds": {
+        "consecutive_working_days": [
+            {"level": "Critical", "min": 6},
+            {"level": "Moderate", "min": 5, "max": 6},
+            {"level": "Low", "min": 4, "max": 5},
+        ],
+        "consecutive_night_shifts": [
+            {"level": "Critical", "min": 5},
+            {"level": "Moderate", "min": 4, "max": 5},
+            {"level": "Low", "min": 3, "max": 4},
+        ],
+        "staffing_diff": [
+            {"level": "Critical", "min": 2},
+            {"level": "Moderate", "min": 1, "max": 2},
+        ],
+        "total_off_days": [
+            {"level": "Critical", "max": 9},
+            {"level": "Moderate", "min": 9, "max": 10},
+            {"level": "Low", "min": 10, "max": 12},
+        ],
+        "total_night_days": [
+            {"level": "Critical", "min": 7},
+            {"level": "Low", "min": 6, "max": 7},
+        ],
+        "min_off_interval": [
+            {"level": "Critical", "max": 11},
+            {"level": "Low", "min": 11, "max": 16},
+        ],
+        # 최근 N일 누적 업무량 (행 = 그날 포함 직전 N일, 근무표에 없는 날은 0)
+        "nights_7d": [
+            {"level": "Critical", "min": 5},
+            {"level": "Moderate", "min": 4, "max": 5},
+            {"level": "Low", "min": 3, "max": 4},
+        ],
+        "working_14d": [
+            {"level": "Critical", "min": 12},
+            {"level": "Moderate", "min": 11, "max": 12},
+            {"level": "Low", "min": 10, "max": 11},
+        ],
+        "hours_28d": [
+            {"level": "Critical", "min": 192},
+            {"level": "Moderate", "min": 176, "max": 192},
+            {"level": "Low", "min": 168, "max": 176},
+        ],
+        "weekend_shifts_28d": [
+            {"level": "Critical", "min": 7},
+            {"level": "Moderate", "min": 6, "max": 7},
+            {"level": "Low", "min": 5, "max": 6},
+        ],
+        # 근무 중 최저 각성도 (utils.fatigue, 낮을수록 피로)
+        "fatigue_alertness": [
+            {"level": "Critical", "max": 7},
+            {"level": "Moderate", "min": 7, "max": 7.5},
+            {"level": "Low", "min": 7.5, "max": 8.5},
+        ],
+    },
+    "quick_returns": {
+        "ED_quick_return": {"Critical": ["ED"], "Moderate": ["EOD"]},
+        "N_quick_return": {"Critical": ["ND", "NE", "NOD"], "Moderate": ["NOE"]},
+    },
+}
+
+NO_RISK = "No Risk"
+
+
+def _clean(code) -> str:
+    if code is None or (not isinstance(code, str) and pd.isna(code)):
+        return ""
+    return str(code).strip().upper()
+
+
+# =========================================================
+# 2. 컴파일된 코드북
+# =========================================================
+class Codebook:
+    """
+    선언형 코드북을 한 번 컴파일해 벡터 연산용 조회표로 보관한다.
+
+    근무코드 컬럼은 factorize로 정수화한 뒤 고유 코드 수만큼만 사전 조회하고,
+    행 단위 값은 정수 코드로 numpy 조회표를 인덱싱해서 얻는다.
+    """
+
+    def __init__(self, spec: Optional[Dict[str, Any]] = None):
+        self.spec = copy.deepcopy(spec or DEFAULT_CODEBOOK)
+        codes = self.spec["codes"]
+
+        self.alias: Dict[str, str] = {}
+        for canonical, info in codes.items():
+            self.alias[_clean(canonical)] = canonical
+            for a in info.get("aliases", []):
+                self.alias[_clean(a)] = canonical
+
+        self.ignored = {_clean(c) for c in self.spec.get("ignore", [])}
+        self.unknown = self.spec.get("unknown", DEFAULT_CODEBOOK["unknown"])
+        self.level_points: Dict[str, int] = dict(self.spec["levels"])
+        self.thresholds: Dict[str, List[dict]] = self.spec["thresholds"]
+        self.quick_returns: Dict[str, Dict[str, List[str]]] = self.spec.get("quick_returns", {})
+
+    # -------------------------------
+    # CODE LOOKUPS
+    # -------------------------------
+    def normalize_one(self, code) -> str:
+        s = _clean(code)
+        return self.alias.get(s, s)
+
+    def info(self, canonical: str) -> dict:
+        return self.spec["codes"].get(canonical, self.unknown)
+
+    def _lookup(self, codes: pd.Series, fn) -> np.ndarray:
+        # 고유 코드별로 한 번만 fn 호출, NaN(-1)은 마지막 칸
+        ids, uniques = pd.factorize(np.asarray(codes, dtype=object), sort=False)
+        table = np.empty(len(uniques) + 1, dtype=object)
+        table[:-1] = [fn(c) for c in uniques]
+        table[-1] = fn(None)
+        return table[ids]
+
+    def normalize(self, codes: pd.Series) -> pd.Series:
+        """원본 근무코드 → 표준 코드 (공백/대소문자/표기 변형 정리)."""
+        return pd.Series(self._lookup(codes, self.normalize_one), index=codes.index, dtype=object)
+
+    def is_ignored(self, codes: pd.Series) -> np.ndarray:
+        return self._lookup(codes, lambda c: _clean(c) in self.ignored).astype(bool)
+
+    def shift_type(self, canonical: pd.Series) -> np.ndarray:
+        return self._lookup(canonical, lambda c: self.info(c)["shift_type"])
+
+    def token(self, canonical: pd.Series) -> np.ndarray:
+        return self._lookup(canonical, lambda c: self.info(c)["token"])
+
+    def staffing_baseline(self, canonical: pd.Series) -> np.ndarray:
+        return self._lookup(canonical, lambda c: self.info(c).get("staffing_baseline", 0)).astype(np.int64)
+
+    def shift_hours(self, canonical: pd.Series):
+        """(시작, 종료) 시각 — 근무일 0시 기준 시간(float). 근무시간이 없으면 NaN."""
+        start = self._lookup(canonical, lambda c: self.info(c).get("start", np.nan)).astype(float)
+        end = self._lookup(canonical, lambda c: self.info(c).get("end", np.nan)).astype(float)
+        return start, end
+
+    def codes_of_type(self, shift_type: str) -> set:
+        return {
+            alias
+            for alias, canonical in self.alias.items()
+            if self.info(canonical)["shift_type"] == shift_type and alias
+        }
+
+    # -------------------------------
+    # THRESHOLDS
+    # -------------------------------
+    def level(self, metric: str, values) -> np.ndarray:
+        """지표 값 → 위험 등급 라벨 (NaN은 No Risk)."""
+        v = np.asarray(values, dtype=float)
+        conds, labels = [], []
+        for rule in self.thresholds[metric]:
+            lo = rule.get("min")
+            hi = rule.get("max")
+            c = ~np.isnan(v)
+            if lo is not None:
+                c &= v >= lo
+            if hi is not None:
+                c &= v < hi
+            conds.append(c)
+            labels.append(rule["level"])
+        return np.select(conds, labels, default=NO_RISK) if conds else np.full(v.shape, NO_RISK, dtype=object)
+
+    def points(self, metric: str, values) -> np.ndarray:
+        """지표 값 → 위험 점수 (Critical=3, Moderate=2, Low=1, No Risk=0)."""
+        return self.level_to_points(self.level(metric, values))
+
+    def level_to_points(self, labels) -> np.ndarray:
+        labels = np.asarray(labels, dtype=object)
+        out = np.zeros(labels.shape, dtype=np.int64)
+        for label, pts in self.level_points.items():
+            out[labels == label] = pts
+        return out
+
+
+# =========================================================
+# 3. 코드북 로딩 (YAML / Excel)
+# =========================================================
+def _spec_from_excel(path: str) -> Dict[str, Any]:
+    """
+    엑셀 코드북 형식:
+      - codes 시트: code, shift_type, token, start, end, staffing_baseline, aliases(쉼표 구분), ignore
+      - thresholds 시트: metric, level, min, max
+      - quick_returns 시트(선택): name, level, pattern
+    없는 시트/컬럼은 기본 코드북 값을 사용한다.
+    """
+    sheets = pd.read_excel(path, sheet_name=None)
+    spec = copy.deepcopy(DEFAULT_CODEBOOK)
+
+    if "codes" in sheets:
+        codes: Dict[str, Any] = {}
+        ignore: List[str] = []
+        for r in sheets["codes"].to_dict("records"):
+            code = _clean(r.get("code"))
+            if not code:
+                continue
+            if bool(r.get("ignore")) and not pd.isna(r.get("ignore")):
+                ignore.append(code)
+                continue
+            info = {k: r[k] for k in ("shift_type", "token", "start", "end", "staffing_baseline")
+                    if k in r and not pd.isna(r[k])}
+            aliases = r.get("aliases")
+            if isinstance(aliases, str) and aliases.strip():
+                info["aliases"] = [a.strip() for a in aliases.split(",")]
+            codes[code] = info
+        spec["codes"] = codes
+        spec["ignore"] = ignore
+
+    if "thresholds" in sheets:
+        thresholds: Dict[str, List[dict]] = {}
+        for r in sheets["thresholds"].to_dict("records"):
+            rule = {"level": r["level"]}
+            for k in ("min", "max"):
+                if k in r and not pd.isna(r[k]):
+                    rule[k] = float(r[k])
+            thresholds.setdefault(r["metric"], []).append(rule)
+        spec["thresholds"].update(thresholds)
+
+    if "quick_returns" in sheets:
+        qr: Dict[str, Dict[str, List[str]]] = {}
+        for r in sheets["quick_returns"].to_dict("records"):
+            qr.setdefault(r["name"], {}).setdefault(r["level"], []).append(str(r["pattern"]).strip())
+        spec["quick_returns"] = qr
+
+    return spec
+
+
+def load_codebook(path: str) -> Codebook:
+    """YAML(.yml/.yaml) 또는 Excel(.xlsx) 코드북 파일을 읽어 컴파일한다."""
+    lower = str(path).lower()
+    if lower.endswith((".yml", ".yaml")):
+        try:
+            import yaml
+        except ImportError as e:
+            raise ImportError("YAML 코드북을 읽으려면 PyYAML이 필요합니다 (pip install pyyaml).") from e
+        with open(path, encoding="utf-8") as f:
+            loaded = yaml.safe_load(f) or {}
+        spec = copy.deepcopy(DEFAULT_CODEBOOK)
+        spec.update(loaded)
+        return Codebook(spec)
+    if lower.endswith((".xlsx", ".xls")):
+        return Codebook(_spec_from_excel(path))
+    raise ValueError(f"지원하지 않는 코드북 형식입니다: {path}")
+
+
+_DEFAULT: Optional[Codebook] = None
+
+
+def get_codebook() -> Codebook:
+    """
+    기본 코드북 (프로세스당 한 번 컴파일).
+    환경변수 CODEBOOK_PATH가 있으면 해당 파일을 사용한다.
+    """
+    global _DEFAULT
+    if _DEFAULT is None:
+        path = os.getenv("CODEBOOK_PATH")
+        _DEFAULT = load_codebook(path) if path else Codebook()
+    return _DEFAULT
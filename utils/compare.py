@@ -0,0 +1,161 @@
+# utils/compare.py
+import io
+import time
+from concurrent.futures import Executor, as_completed
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from utils.fairness import compute_fairness_stats, compute_fairness_table
+from utils.features import add_base_features, load_schedule_file
+from utils.jobs import get_jobs
+from utils.risk import add_risk_scores, summarize_codebook
+
+ALL_WARDS = "전체"
+
+# 순위 기준 (앞쪽이 우선, 모두 낮을수록 좋음)
+RANK_BY = ["total_risk", "critical_nurses", "fairness_score_std"]
+
+METRIC_COLUMNS = [
+    "start_date",
+    "end_date",
+    "n_nurses",
+    "n_days",
+    "total_risk",
+    "mean_risk",
+    "critical_nurses",
+    "quick_returns",
+    "understaffed_shifts",
+    "fairness_score_std",
+    "total_night_std",
+    "total_off_std",
+]
+
+
+class _NamedBytes(io.BytesIO):
+    """load_schedule_file이 확장자를 확인할 수 있도록 name을 가진 BytesIO."""
+
+    def __init__(self, data: bytes, name: str):
+        super().__init__(data)
+        self.name = name
+
+
+# =========================================================
+# 1. 근무표 1개 평가 (작업 프로세스에서 실행)
+# =========================================================
+def _ward_metrics(scored: pd.DataFrame, summary: pd.DataFrame) -> dict:
+    fair = compute_fairness_table(scored)
+    stats = compute_fairness_stats(fair)
+    risk_cols = [c for c in summary.columns if c.endswith("_risk")]
+    critical = (summary[risk_cols] == "Critical").any(axis=1) if risk_cols else pd.Series(False, index=summary.index)
+
+    qr_cols = [c for c in scored.columns if c.endswith("_quick_return") and scored[c].dtype == bool]
+    understaffed = scored.loc[scored["staffing_diff"] > 0, ["date", "shift_code"]].drop_duplicates()
+    return {
+        "start_date": scored["date"].min(),
+        "end_date": scored["date"].max(),
+        "n_nurses": int(scored["nurse_id"].nunique()),
+        "n_days": int(pd.Series(scored["date"]).nunique()),
+        "total_risk": int(scored["overall_risk_score"].sum()),
+        "mean_risk": round(float(scored["overall_risk_score"].mean()), 3),
+        "critical_nurses": int(critical.sum()),
+        "quick_returns": int(scored[qr_cols].to_numpy().sum()) if qr_cols else 0,
+        "understaffed_shifts": int(len(understaffed)),
+        "fairness_score_std": round(float(stats.get("fairness_score_std", 0.0)), 4),
+        "total_night_std": round(float(stats.get("total_night_std", 0.0)), 4),
+        "total_off_std": round(float(stats.get("total_off_std", 0.0)), 4),
+    }
+
+
+def evaluate_roster(raw: pd.DataFrame) -> List[dict]:
+    """
+    정규화된 근무표 → 병동 단위 지표 목록.
+    피처 → 위험도 → 공정성 → 코드북 요약 파이프라인을 그대로 돌린다.
+    ward 컬럼이 있으면 병동별 + 전체, 없으면 전체 한 줄.
+    """
+    scored = add_risk_scores(add_base_features(raw))
+    summary = summarize_codebook(scored)
+
+    rows = [{"ward": ALL_WARDS, **_ward_metrics(scored, summary)}]
+    if "ward" in scored.columns and scored["ward"].nunique() > 1:
+        for ward, sub in scored.groupby("ward", sort=True):
+            sub_summary = summary[summary["nurse_id"].isin(sub["nurse_id"].unique())]
+            rows.append({"ward": ward, **_ward_metrics(sub, sub_summary)})
+    return rows
+
+
+def _evaluate_file(item: Tuple[str, bytes]) -> Tuple[str, List[dict], float]:
+    name, data = item
+    started = time.perf_counter()
+    raw = load_schedule_file(_NamedBytes(data, name))
+    return name, evaluate_roster(raw), time.perf_counter() - started
+
+
+# =========================================================
+# 2. 여러 근무표 병렬 비교
+# =========================================================
+def rank_rosters(metrics: pd.DataFrame, rank_by: Sequence[str] = RANK_BY) -> pd.DataFrame:
+    """병동별로 rank_by 순서(모두 오름차순)에 따라 1위부터 순위를 매긴다."""
+    if metrics.empty:
+        return metrics
+    ordered = metrics.sort_values(["ward", *rank_by], kind="stable").copy()
+    ordered.insert(0, "rank", ordered.groupby("ward", sort=False).cumcount() + 1)
+    # 전체 행을 먼저
+    ordered["_all"] = ordered["ward"] != ALL_WARDS
+    ordered = ordered.sort_values(["_all", "ward", "rank"], kind="stable").drop(columns="_all")
+    return ordered.reset_index(drop=True)
+
+
+def compare_rosters(
+    files: Sequence[Tuple[str, bytes]],
+    max_workers: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    progress: Optional[Callable[[int, int, str], None]] = None,
+) -> Tuple[pd.DataFrame, Dict[str, str]]:
+    """
+    같은 기간의 후보 근무표 여러 개를 작업 프로세스에서 병렬로 평가해 순위표를 만든다.
+
+    files: [(파일 이름, 파일 내용 bytes)] — 파싱부터 작업 프로세스에서 한다
+    progress(완료 수, 전체 수, 방금 끝난 파일 이름)
+    반환값: (순위표, {파일 이름: 오류 메시지})
+    """
+    files = list(files)
+    errors: Dict[str, str] = {}
+    records: List[dict] = []
+    if not files:
+        return pd.DataFrame(columns=["rank", "roster", "ward", *METRIC_COLUMNS, "eval_sec"]), errors
+
+    def collect(name, rows, elapsed):
+        for r in rows:
+            records.append({"roster": name, **r, "eval_sec": round(elapsed, 3)})
+
+    if executor is None and (len(files) == 1 or (max_workers or get_jobs().max_workers) == 1):
+        # 병렬로 얻을 것이 없으면 프로세스를 띄우지 않는다
+        for i, item in enumerate(files, start=1):
+            try:
+                collect(*_evaluate_file(item))
+            except Exception as e:
+                errors[item[0]] = str(e)
+            if progress is not None:
+                progress(i, len(files), item[0])
+    else:
+        # 백그라운드 작업(utils.jobs)과 같은 프로세스 풀을 쓴다
+        pool = executor or get_jobs().pool()
+        futures = {pool.submit(_evaluate_file, item): item[0] for item in files}
+        for i, fut in enumerate(as_completed(futures), start=1):
+            name = futures[fut]
+            try:
+                collect(*fut.result())
+            except Exception as e:
+                errors[name] = str(e)
+            if progress is not None:
+                progress(i, len(files), name)
+
+    metrics = pd.DataFrame(records, columns=["roster", "ward", *METRIC_COLUMNS, "eval_sec"])
+    return rank_rosters(metrics), errors
+
+
+def period_mismatch(table: pd.DataFrame) -> bool:
+    """후보들의 기간(시작일/종료일)이 서로 다르면 True (같은 달 비교인지 확인용)."""
+    whole = table.loc[table["ward"] == ALL_WARDS, ["start_date", "end_date"]]
+    return bool(len(whole.drop_duplicates()) > 1)
@@ -0,0 +1,159 @@
+# utils/coverage.py
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.codebook import Codebook, get_codebook
+
+# 커버리지를 보는 근무 구분 (하루 안 순서 = 배열 순서)
+SHIFTS = ["DAY", "EVENING", "NIGHT"]
+
+# ward 컬럼이 없는 근무표의 병동 이름
+SINGLE_WARD = "전체"
+
+# 신규 간호사 비율이 이 값 이상이면 novice-heavy
+DEFAULT_NOVICE_LIMIT = 0.5
+
+COVERAGE_COLUMNS = ["ward", "date", "shift", "staff", "novice", "novice_ratio", "baseline", "deficit",
+                    "understaffed", "novice_heavy", "flagged"]
+
+
+def default_baselines(codebook: Optional[Codebook] = None) -> Dict[str, int]:
+    """근무 구분별 기준 인원 기본값: 코드북에서 그 구분에 속한 근무코드 기준 인원 중 최댓값."""
+    cb = codebook or get_codebook()
+    out = {s: 0 for s in SHIFTS}
+    for info in cb.spec["codes"].values():
+        if info.get("shift_type") in out:
+            out[info["shift_type"]] = max(out[info["shift_type"]], int(info.get("staffing_baseline", 0)))
+    return out
+
+
+# =========================================================
+# 1. 병동 × 날짜 × 근무 인원 / 신규 인원 (한 번의 bincount)
+# =========================================================
+def coverage_counts(rows: pd.DataFrame) -> pd.DataFrame:
+    """
+    근무 행(shift_type 포함) → 병동 × 날짜 × 근무 구분 격자의 인원/신규 인원.
+    근무표 기간 안의 모든 칸을 포함한다 (아무도 없는 칸은 staff 0).
+    같은 간호사가 같은 칸에 여러 번 있으면 한 번만 센다.
+    """
+    # 근무 구분 → 0/1/2 (그 밖의 구분은 -1): 고유 값만 조회
+    type_codes, types = pd.factorize(rows["shift_type"])
+    lookup = np.array([SHIFTS.index(t) if t in SHIFTS else -1 for t in types] + [-1], dtype=np.int64)
+    shift = lookup[type_codes]
+
+    if "ward" in rows.columns:
+        ward_codes, wards = pd.factorize(rows["ward"].fillna(SINGLE_WARD).astype(str), sort=True)
+    else:
+        wards = pd.Index([SINGLE_WARD])
+        ward_codes = np.zeros(len(rows), dtype=np.int64)
+
+    days = pd.to_datetime(rows["date"]).values.astype("datetime64[D]").astype(np.int64)
+    day0 = int(days.min()) if len(days) else 0
+    n_days = int(days.max()) - day0 + 1 if len(days) else 0
+
+    n_cells = len(wards) * n_days * len(SHIFTS)
+    work = shift >= 0
+    cell = ((ward_codes * n_days + days - day0) * len(SHIFTS) + shift)[work]
+    novice = rows["is_novice"].fillna(False).to_numpy(dtype=bool) if "is_novice" in rows.columns else np.zeros(len(rows), bool)
+    novice = novice[work]
+
+    # 같은 간호사가 같은 칸에 여러 번 있으면 한 번만 센다
+    nurse = pd.factorize(rows["nurse_id"])[0][work]
+    key = nurse.astype(np.int64) * max(n_cells, 1) + cell
+    if len(key) and (np.diff(np.sort(key)) == 0).any():
+        _, first = np.unique(key, return_index=True)
+        cell, novice = cell[first], novice[first]
+
+    staff = np.bincount(cell, minlength=n_cells)
+    novice_count = np.bincount(cell, weights=novice, minlength=n_cells).astype(np.int64)
+
+    dates = (np.arange(n_days) + day0).astype("datetime64[D]")
+    return pd.DataFrame(
+        {
+            "ward": np.repeat(wards.to_numpy(dtype=object), n_days * len(SHIFTS)),
+            "date": pd.to_datetime(np.tile(np.repeat(dates, len(SHIFTS)), len(wards))).date,
+            "shift": np.tile(SHIFTS, len(wards) * n_days),
+            "staff": staff,
+            "novice": novice_count,
+        }
+    )
+
+
+# =========================================================
+# 2. 기준 인원 대비 부족 / 숙련도 구성
+# =========================================================
+def apply_baselines(
+    counts: pd.DataFrame,
+    baselines: Optional[Dict[str, int]] = None,
+    novice_limit: float = DEFAULT_NOVICE_LIMIT,
+    codebook: Optional[Codebook] = None,
+) -> pd.DataFrame:
+    """
+    coverage_counts 결과에 기준 인원 대비 부족 인원과 신규 비율 판정을 붙인다 (열 단위 연산만).
+    baselines: 근무 구분별 기준 인원 (없는 구분은 default_baselines 값)
+    """
+    base = {**default_baselines(codebook), **(baselines or {})}
+    out = counts.copy()
+    staff = out["staff"].to_numpy()
+    out["novice_ratio"] = np.round(np.divide(out["novice"].to_numpy(), staff, out=np.zeros(len(out)), where=staff > 0), 3)
+    out["baseline"] = out["shift"].map(base).fillna(0).astype(np.int64)
+    out["deficit"] = np.maximum(out["baseline"].to_numpy() - staff, 0)
+    out["understaffed"] = out["deficit"] > 0
+    out["novice_heavy"] = out["novice_ratio"] >= novice_limit
+    out["flagged"] = out["understaffed"] & out["novice_heavy"]
+    return out[COVERAGE_COLUMNS]
+
+
+def coverage_table(
+    rows: pd.DataFrame,
+    baselines: Optional[Dict[str, int]] = None,
+    novice_limit: float = DEFAULT_NOVICE_LIMIT,
+    codebook: Optional[Codebook] = None,
+) -> pd.DataFrame:
+    """근무 행 → 병동 × 날짜 × 근무 구분 커버리지 표 (coverage_counts + apply_baselines)."""
+    return apply_baselines(coverage_counts(rows), baselines, novice_limit, codebook)
+
+
+# =========================================================
+# 3. 연속된 위험 근무 구간 (인원 부족 + 신규 비율 높음)
+# =========================================================
+def risky_runs(coverage: pd.DataFrame, min_length: int = 2, column: str = "flagged") -> pd.DataFrame:
+    """
+    병동별로 시간 순서(날짜 → DAY → EVENING → NIGHT)로 이어지는 column=True 칸의 구간.
+    coverage는 coverage_table 결과처럼 병동마다 빈칸 없이 정렬된 격자여야 한다.
+    반환: ward, start_date, start_shift, end_date, end_shift, shifts, total_deficit, mean_novice_ratio
+    """
+    cols = ["ward", "start_date", "start_shift", "end_date", "end_shift", "shifts", "total_deficit", "mean_novice_ratio"]
+    flag = coverage[column].to_numpy(dtype=bool)
+    if not flag.any():
+        return pd.DataFrame(columns=cols)
+
+    ward = coverage["ward"].to_numpy()
+    same_ward = np.r_[False, ward[1:] == ward[:-1]]
+    starts = flag & ~(np.r_[False, flag[:-1]] & same_ward)
+    run_id = np.cumsum(starts) - 1
+    idx = np.flatnonzero(flag)
+    run = run_id[idx]
+
+    length = np.bincount(run)
+    first = idx[np.r_[0, np.flatnonzero(np.diff(run)) + 1]]
+    last = first + length - 1
+    deficit = np.bincount(run, weights=coverage["deficit"].to_numpy()[idx]).astype(np.int64)
+    ratio = np.bincount(run, weights=coverage["novice_ratio"].to_numpy()[idx]) / length
+
+    out = pd.DataFrame(
+        {
+            "ward": ward[first],
+            "start_date": coverage["date"].to_numpy()[first],
+            "start_shift": coverage["shift"].to_numpy()[first],
+            "end_date": coverage["date"].to_numpy()[last],
+            "end_shift": coverage["shift"].to_numpy()[last],
+            "shifts": length,
+            "total_deficit": deficit,
+            "mean_novice_ratio": np.round(ratio, 3),
+        }
+    )
+    out = out[out["shifts"] >= min_length]
+    return out.sort_values(["shifts", "total_deficit"], ascending=False, kind="stable").reset_index(drop=True)
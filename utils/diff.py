@@ -0,0 +1,202 @@
+# utils/diff.py
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.codebook import Codebook, get_codebook
+from utils.fairness import compute_fairness_stats, compute_fairness_table
+from utils.features import _compute_staffing_features, add_base_features
+from utils.preferences import PreferenceIndex
+from utils.risk import add_risk_scores
+
+KEY = ["nurse_id", "date"]
+STAFFING_COLS = ["staffing_count", "staffing_baseline", "staffing_diff"]
+FAIRNESS_DELTA_COLS = ["fairness_score", "total_off_days", "total_night_days", "total_weekend_days", "min_off_interval", "level_night_ratio", "pref_match_ratio"]
+FAIRNESS_STAT_KEYS = ["fairness_score_std", "total_night_std", "total_off_std", "weekend_std", "night_ratio_std", "avg_pref_match_ratio"]
+
+
+# =========================================================
+# 1. 변경 칸 찾기 (nurse_id, date 해시 조인)
+# =========================================================
+def changed_cells(old: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """
+    두 근무표를 (nurse_id, date)로 맞춰 바뀐 칸만 돌려준다.
+    change: changed(코드 변경) / added(새 버전에만 있음) / removed(이전 버전에만 있음)
+    """
+    cols = KEY + ["nurse_name", "shift_code"]
+    merged = old[cols].merge(new[cols], on=KEY, how="outer", suffixes=("_old", "_new"), indicator=True)
+    diff = merged["shift_code_old"].fillna("\0") != merged["shift_code_new"].fillna("\0")
+    out = merged[diff].copy()
+    out["change"] = out["_merge"].map({"both": "changed", "left_only": "removed", "right_only": "added"}).astype(str)
+    out["nurse_name"] = out["nurse_name_new"].fillna(out["nurse_name_old"])
+    out = out.rename(columns={"shift_code_old": "old_shift", "shift_code_new": "new_shift"})
+    return out[["nurse_id", "nurse_name", "date", "old_shift", "new_shift", "change"]].sort_values(KEY).reset_index(drop=True)
+
+
+# =========================================================
+# 2. 영향 받는 행만 다시 계산
+# =========================================================
+def rescore_incremental(
+    old_scored: pd.DataFrame,
+    new: pd.DataFrame,
+    changes: pd.DataFrame,
+    codebook: Optional[Codebook] = None,
+) -> pd.DataFrame:
+    """
+    old_scored(이전 버전 add_risk_scores 결과)를 바탕으로 새 버전 점수표를 만든다.
+
+    - 연속근무/야간, quick return: 간호사 안에서만 이어지므로 바뀐 간호사만 다시 계산
+    - staffing: 날짜 × 근무코드 인원이므로 바뀐 날짜의 행만 다시 계산
+      (바뀐 간호사의 다른 날짜 행은 이전 버전 날짜 × 근무코드 인원을 그대로 조회)
+    - 위험점수: 위 두 집합에 속한 행만 다시 계산, 나머지 행은 이전 값 유지
+    결과는 새 버전 전체를 처음부터 계산한 것과 같다.
+    """
+    cb = codebook or get_codebook()
+    if changes.empty:
+        return old_scored
+
+    nurses = changes["nurse_id"].unique()
+    dates = changes["date"].unique()
+
+    keep = old_scored[~old_scored["nurse_id"].isin(nurses)]
+    fresh = add_base_features(new[new["nurse_id"].isin(nurses)], cb)
+
+    # 바뀐 날짜: 새 버전의 그 날짜 행 전체로 인원 재계산
+    on_dates = new["date"].isin(dates)
+    day_staff = _compute_staffing_features(
+        new.loc[on_dates, ["date", "nurse_id", "shift_code"]].assign(shift_type=cb.shift_type(new.loc[on_dates, "shift_code"])),
+        cb,
+    )[KEY + STAFFING_COLS]
+
+    # 바뀌지 않은 날짜: 이전 버전 (date, shift_code) 인원 조회
+    old_staff = old_scored.drop_duplicates(["date", "shift_code"])[["date", "shift_code", "staffing_count"]]
+
+    scored = pd.concat([keep, fresh], ignore_index=True, sort=False)
+    affected = scored["nurse_id"].isin(nurses).to_numpy() | scored["date"].isin(dates).to_numpy()
+    part = scored[affected].drop(columns=STAFFING_COLS, errors="ignore")
+
+    by_day = part.merge(day_staff, on=KEY, how="left")
+    from_old = by_day["staffing_count"].isna().to_numpy()
+    if from_old.any():
+        lookup = by_day.loc[from_old, ["date", "shift_code"]].merge(old_staff, on=["date", "shift_code"], how="left")
+        count = lookup["staffing_count"].fillna(0).to_numpy()
+        count = np.where(by_day.loc[from_old, "shift_type"].to_numpy() == "OFF", 0, count)
+        by_day.loc[from_old, "staffing_count"] = count
+        by_day.loc[from_old, "staffing_baseline"] = cb.staffing_baseline(by_day.loc[from_old, "shift_code"])
+    by_day["staffing_count"] = by_day["staffing_count"].astype(int)
+    by_day["staffing_baseline"] = by_day["staffing_baseline"].astype(int)
+    by_day["staffing_diff"] = (by_day["staffing_baseline"] - by_day["staffing_count"]).astype(int)
+
+    rescored = add_risk_scores(by_day, cb)
+    rescored.index = scored.index[affected]
+    scored = pd.concat([scored[~affected], rescored[scored.columns]])
+    # fresh 행에는 점수 컬럼이 없어 concat 중 float로 바뀐 dtype을 되돌린다
+    scored = scored.astype({c: t for c, t in old_scored.dtypes.items() if c in scored.columns})
+    return scored.sort_values(KEY, kind="stable").reset_index(drop=True)
+
+
+# =========================================================
+# 3. 변화량 요약
+# =========================================================
+def _risk_by(scored: pd.DataFrame, key) -> pd.Series:
+    return scored.groupby(key, sort=True)["overall_risk_score"].sum()
+
+
+def _delta(old: pd.Series, new: pd.Series, name: str) -> pd.DataFrame:
+    both = pd.concat([old.rename(f"{name}_old"), new.rename(f"{name}_new")], axis=1).fillna(0)
+    both[f"{name}_delta"] = both[f"{name}_new"] - both[f"{name}_old"]
+    return both[both[f"{name}_delta"] != 0]
+
+
+def diff_rosters(
+    old: pd.DataFrame,
+    new: pd.DataFrame,
+    old_scored: Optional[pd.DataFrame] = None,
+    old_fairness: Optional[pd.DataFrame] = None,
+    codebook: Optional[Codebook] = None,
+    preferences: Optional[PreferenceIndex] = None,
+) -> dict:
+    """
+    같은 달 근무표 두 버전 비교.
+
+    old/new: load_schedule_file(prepare_schedule) 결과
+    old_scored/old_fairness: 이전 버전에서 이미 계산한 결과가 있으면 재사용 (없으면 계산)
+    preferences: 희망 신청 인덱스 (old_fairness와 같은 신청으로 pref_match_ratio를 다시 계산)
+
+    반환 dict:
+      changes        바뀐 칸 목록
+      nurse_delta    간호사별 overall_risk_score 합 변화 (staffing으로 다른 간호사 점수가 바뀐 경우 포함)
+      day_delta      날짜별 overall_risk_score 합 변화
+      staffing_delta 날짜 × 근무코드 staffing_diff 변화
+      fairness_delta 간호사별 공정성 지표 변화, fairness_stats 병동 지표 (이전/이후)
+      scored         새 버전 점수표, touched 영향 범위 (간호사 수/날짜 수/다시 계산한 행 수)
+    """
+    cb = codebook or get_codebook()
+    if old_scored is None:
+        old_scored = add_risk_scores(add_base_features(old, cb), cb)
+
+    changes = changed_cells(old, new)
+    scored = rescore_incremental(old_scored, new, changes, cb)
+
+    nurses = changes["nurse_id"].unique()
+    dates = changes["date"].unique()
+    affected_old = old_scored["nurse_id"].isin(nurses) | old_scored["date"].isin(dates)
+    affected_new = scored["nurse_id"].isin(nurses) | scored["date"].isin(dates)
+
+    names = pd.concat([old_scored, scored])[["nurse_id", "nurse_name"]].drop_duplicates("nurse_id").set_index("nurse_id")
+    nurse_delta = _delta(
+        _risk_by(old_scored[affected_old], "nurse_id"), _risk_by(scored[affected_new], "nurse_id"), "risk"
+    )
+    nurse_delta.insert(0, "nurse_name", names["nurse_name"].reindex(nurse_delta.index))
+    day_delta = _delta(_risk_by(old_scored[affected_old], "date"), _risk_by(scored[affected_new], "date"), "risk")
+
+    def staffing(df):
+        rows = df[df["date"].isin(dates) & (df["shift_type"] != "OFF")]
+        return rows.drop_duplicates(["date", "shift_code"]).set_index(["date", "shift_code"])["staffing_diff"]
+
+    staffing_delta = _delta(staffing(old_scored), staffing(scored), "staffing_diff")
+
+    # 공정성: 간호사 단위 지표라 바뀐 간호사만 다시 계산
+    if old_fairness is None:
+        old_fairness = compute_fairness_table(old_scored, preferences)
+    touched_names = changes["nurse_name"].unique()
+    fresh_fair = compute_fairness_table(scored[scored["nurse_name"].isin(touched_names)], preferences)
+    new_fairness = pd.concat(
+        [old_fairness[~old_fairness["nurse_name"].isin(touched_names)], fresh_fair], ignore_index=True
+    ).sort_values("nurse_name").reset_index(drop=True)
+
+    f_old = old_fairness.set_index("nurse_name")[FAIRNESS_DELTA_COLS]
+    f_new = new_fairness.set_index("nurse_name")[FAIRNESS_DELTA_COLS]
+    idx = f_old.index.union(f_new.index).intersection(pd.Index(touched_names))
+    fairness_delta = (f_new.reindex(idx) - f_old.reindex(idx)).add_suffix("_delta")
+    fairness_delta = fairness_delta[(fairness_delta.fillna(1) != 0).any(axis=1)]
+
+    s_old = compute_fairness_stats(old_fairness)
+    s_new = compute_fairness_stats(new_fairness)
+    fairness_stats = pd.DataFrame(
+        {
+            "old": [s_old.get(k, 0.0) for k in FAIRNESS_STAT_KEYS],
+            "new": [s_new.get(k, 0.0) for k in FAIRNESS_STAT_KEYS],
+        },
+        index=FAIRNESS_STAT_KEYS,
+    )
+    fairness_stats["delta"] = fairness_stats["new"] - fairness_stats["old"]
+
+    return {
+        "changes": changes,
+        "nurse_delta": nurse_delta.sort_values("risk_delta").reset_index(),
+        "day_delta": day_delta.reset_index(),
+        "staffing_delta": staffing_delta.reset_index(),
+        "fairness_delta": fairness_delta.reset_index(),
+        "fairness_stats": fairness_stats,
+        "total_risk": (int(old_scored["overall_risk_score"].sum()), int(scored["overall_risk_score"].sum())),
+        "scored": scored,
+        "fairness": new_fairness,
+        "touched": {
+            "nurses": int(len(nurses)),
+            "dates": int(len(dates)),
+            "rescored_rows": int(affected_new.sum()),
+            "total_rows": int(len(scored)),
+        },
+    }
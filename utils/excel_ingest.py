@@ -0,0 +1,166 @@
+# utils/excel_ingest.py
+import io
+from concurrent.futures import as_completed
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from utils.features import REQUIRED_COLS, prepare_schedule
+from utils.jobs import get_jobs
+
+# 필수 컬럼 외에 분석에서 쓰는 컬럼 (있으면 같이 읽는다)
+OPTIONAL_COLS = ["is_novice", "ward"]
+
+# 시트 이름을 담는 컬럼
+SHEET_COL = "sheet"
+
+
+def _open_workbook(data: bytes):
+    from openpyxl import load_workbook
+
+    # read_only: 셀을 스트리밍으로 읽는다 / data_only: 수식 대신 저장된 값
+    return load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+
+
+# =========================================================
+# 1. 시트 목록
+# =========================================================
+def _header(ws) -> Optional[List[str]]:
+    """첫 행(헤더)의 컬럼 이름. 빈 시트면 None."""
+    header = next(ws.iter_rows(max_row=1, values_only=True), None)
+    if header is None:
+        return None
+    return [str(h).strip() if h is not None else "" for h in header]
+
+
+def list_sheets(data: bytes) -> List[dict]:
+    """
+    워크북의 시트 이름, 대략적인 크기(행 수, 열 수), 헤더에 없는 필수 컬럼(missing).
+    셀은 헤더 행만 읽는다. missing이 있는 시트(README, 메모 시트 등)는 근무표가 아니다.
+    """
+    wb = _open_workbook(data)
+    try:
+        out = []
+        for ws in wb.worksheets:
+            names = _header(ws) or []
+            out.append(
+                {
+                    "sheet": ws.title,
+                    "rows": ws.max_row or 0,
+                    "cols": ws.max_column or 0,
+                    "missing": [c for c in REQUIRED_COLS if c not in names],
+                }
+            )
+        return out
+    finally:
+        wb.close()
+
+
+def roster_sheets(info: List[dict]) -> List[str]:
+    """list_sheets 결과 중 필수 컬럼이 모두 있는 시트 이름 (워크북 순서)."""
+    return [s["sheet"] for s in info if not s["missing"]]
+
+
+# =========================================================
+# 2. 시트 읽기 (작업 프로세스에서 실행)
+# =========================================================
+def _sheet_frame(ws, sheet: str) -> pd.DataFrame:
+    """
+    첫 행을 헤더로 보고, 필수/선택 컬럼 위치의 값만 모은다.
+    필요한 마지막 컬럼 뒤의 셀은 읽지 않는다.
+    """
+    names = _header(ws)
+    if names is None:
+        return pd.DataFrame(columns=REQUIRED_COLS)
+
+    wanted = [c for c in REQUIRED_COLS + OPTIONAL_COLS if c in names]
+    missing = [c for c in REQUIRED_COLS if c not in wanted]
+    if missing:
+        raise ValueError(f"[{sheet}] 필수 컬럼이 없습니다: {missing}")
+
+    idx = [names.index(c) for c in wanted]
+    rows = ws.iter_rows(min_row=2, max_col=max(idx) + 1, values_only=True)
+    records = [
+        [row[i] if i < len(row) else None for i in idx]
+        for row in rows
+        if row and any(v is not None for v in row)
+    ]
+    return pd.DataFrame(records, columns=wanted)
+
+
+def _read_sheets(item: Tuple[bytes, List[str]]) -> List[Tuple[str, pd.DataFrame]]:
+    """워크북을 한 번 열어 시트 여러 개를 읽는다 (작업 프로세스 하나가 맡는 묶음)."""
+    data, sheets = item
+    wb = _open_workbook(data)
+    try:
+        return [(sheet, _sheet_frame(wb[sheet], sheet)) for sheet in sheets]
+    finally:
+        wb.close()
+
+
+def _balance(sheets: List[dict], n_chunks: int) -> List[List[str]]:
+    """행 수가 큰 시트부터 가장 가벼운 묶음에 넣어 작업 프로세스별 분량을 고르게 나눈다."""
+    chunks: List[List[str]] = [[] for _ in range(n_chunks)]
+    load = [0] * n_chunks
+    for s in sorted(sheets, key=lambda s: -s["rows"]):
+        i = load.index(min(load))
+        chunks[i].append(s["sheet"])
+        load[i] += s["rows"]
+    return [c for c in chunks if c]
+
+
+# =========================================================
+# 3. 여러 시트 병렬 읽기
+# =========================================================
+def read_workbook(
+    data: bytes,
+    sheets: Optional[Sequence[str]] = None,
+    max_workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int, str], None]] = None,
+) -> pd.DataFrame:
+    """
+    선택한 시트를 작업 프로세스에서 병렬로 읽어 하나의 정규화된 근무표로 합친다.
+    sheets가 없으면 필수 컬럼이 있는 시트 전체를 읽는다 (README 같은 시트는 건너뜀).
+    직접 고른 시트에 필수 컬럼이 없으면 ValueError.
+    각 행에는 시트 이름(sheet 컬럼)이 붙는다. 시트 순서는 워크북 순서를 따른다.
+    시트는 행 수 기준으로 작업 프로세스 수만큼 묶어, 프로세스마다 워크북을 한 번만 연다.
+
+    progress(완료 수, 전체 수, 방금 끝난 시트 이름)
+    """
+    info = list_sheets(data)
+    order = [s["sheet"] for s in info]
+    if sheets is None:
+        sheets = roster_sheets(info)
+    unknown = [s for s in sheets if s not in order]
+    if unknown:
+        raise ValueError(f"워크북에 없는 시트입니다: {unknown}")
+    selected = set(sheets)
+    sheets = [s for s in order if s in selected]
+    if not sheets:
+        raise ValueError("읽을 시트를 하나 이상 선택해 주세요.")
+
+    workers = min(max_workers or get_jobs().max_workers, len(sheets))
+    chunks = _balance([s for s in info if s["sheet"] in selected], workers)
+
+    parts: Dict[str, pd.DataFrame] = {}
+
+    def collect(results):
+        for name, df in results:
+            parts[name] = df
+            if progress is not None:
+                progress(len(parts), len(sheets), name)
+
+    if len(chunks) == 1:
+        # 병렬로 얻을 것이 없으면 프로세스를 띄우지 않는다
+        collect(_read_sheets((data, chunks[0])))
+    else:
+        # 백그라운드 작업(utils.jobs)과 같은 프로세스 풀을 쓴다
+        pool = get_jobs().pool()
+        futures = [pool.submit(_read_sheets, (data, chunk)) for chunk in chunks]
+        for fut in as_completed(futures):
+            collect(fut.result())
+
+    frames = [parts[s].assign(**{SHEET_COL: s}) for s in sheets if not parts[s].empty]
+    if not frames:
+        raise ValueError("선택한 시트에 데이터가 없습니다.")
+    return prepare_schedule(pd.concat(frames, ignore_index=True))
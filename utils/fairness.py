@@ -1,9 +1,20 @@
+from typing import Optional
+
+import numpy as np
 import pandas as pd
 
+from utils.fairness_stats import inequality
+from utils.preferences import PreferenceIndex
+
+# 희망 신청이 없는 간호사의 선호 반영율 (중립값)
+PREF_FALLBACK = 0.5
 
-def compute_fairness_table(df: pd.DataFrame) -> pd.DataFrame:
+
+def compute_fairness_table(df: pd.DataFrame, preferences: Optional[PreferenceIndex] = None) -> pd.DataFrame:
     """
     스케줄 df에서 간호사별 공정성 지표를 계산하여 반환한다.
+    preferences(utils.preferences.PreferenceIndex)가 있으면 pref_match_ratio = 신청 반영 수 / 신청 수,
+    신청이 없는 간호사는 PREF_FALLBACK (pref_requests = 0).
 
     요구되는 최소 컬럼:
     - nurse_name
@@ -17,11 +28,14 @@ def compute_fairness_table(df: pd.DataFrame) -> pd.DataFrame:
                 "nurse_name",
                 "fairness_score",
                 "pref_match_ratio",
+                "pref_requests",
                 "total_off_days",
                 "total_night_days",
                 "min_off_interval",
                 "level_night_ratio",
                 "level_workingdays_ratio",
+                "total_weekend_days",
+                "weekend_ratio",
             ]
         )
 
@@ -30,6 +44,19 @@ def compute_fairness_table(df: pd.DataFrame) -> pd.DataFrame:
     if missing:
         raise ValueError(f"compute_fairness_table: 필수 컬럼이 없습니다: {missing}")
 
+    # 주말 근무 여부 (weekend_flag가 없으면 날짜에서 계산)
+    if "weekend_flag" in df.columns:
+        weekend = df["weekend_flag"].fillna(False).to_numpy(dtype=bool)
+    else:
+        weekend = pd.to_datetime(df["date"]).dt.weekday.to_numpy() >= 5
+    df = df.assign(_weekend_work=weekend & (df["shift_type"] != "OFF").to_numpy())
+
+    # 희망 신청 반영 (근무표 전체와 merge 한 번, 간호사 이름 단위로 집계)
+    pref = pd.DataFrame(columns=["requests", "matched"])
+    if preferences is not None and len(preferences) and "nurse_id" in df.columns:
+        matched = preferences.match(df)
+        pref = matched.groupby("nurse_name")["matched"].agg(requests="size", matched="sum")
+
     result_rows = []
 
     for nurse, sub in df.groupby("nurse_name"):
@@ -39,6 +66,7 @@ def compute_fairness_table(df: pd.DataFrame) -> pd.DataFrame:
         total_off = int((sub["shift_type"] == "OFF").sum())
         total_night = int((sub["shift_type"] == "NIGHT").sum())
         total_working = int((sub["shift_type"] != "OFF").sum())
+        total_weekend = int(sub["_weekend_work"].sum())
 
         # 최소 OFF 간격
         off_dates = sub.loc[sub["shift_type"] == "OFF", "date"].sort_values()
@@ -48,8 +76,13 @@ def compute_fairness_table(df: pd.DataFrame) -> pd.DataFrame:
         else:
             min_off_interval = 0
 
-        # 선호 반영율(현재는 placeholder, 나중에 엑셀 규칙으로 교체)
-        pref_match_ratio = 0.5
+        # 선호 반영율 (희망 신청이 없으면 중립값)
+        if nurse in pref.index:
+            pref_requests = int(pref.at[nurse, "requests"])
+            pref_match_ratio = float(pref.at[nurse, "matched"]) / pref_requests
+        else:
+            pref_requests = 0
+            pref_match_ratio = PREF_FALLBACK
 
         # 연차 기반 비율(placeholder) - 현재는 단순 비율
         level_night_ratio = float(total_night) / max(total_working, 1)
@@ -66,16 +99,21 @@ def compute_fairness_table(df: pd.DataFrame) -> pd.DataFrame:
             - 0.01 * max(0, 2 - min_off_interval)
         )
 
+        row = {"ward": sub["ward"].iloc[0]} if "ward" in sub.columns else {}
         result_rows.append(
             {
+                **row,
                 "nurse_name": nurse,
                 "fairness_score": float(fairness_score),
                 "pref_match_ratio": float(pref_match_ratio),
+                "pref_requests": pref_requests,
                 "total_off_days": total_off,
                 "total_night_days": total_night,
                 "min_off_interval": min_off_interval,
                 "level_night_ratio": float(level_night_ratio),
                 "level_workingdays_ratio": float(level_workingdays_ratio),
+                "total_weekend_days": total_weekend,
+                "weekend_ratio": float(total_weekend) / max(total_working, 1),
             }
         )
 
@@ -96,18 +134,31 @@ def compute_fairness_stats(fair_df: pd.DataFrame) -> dict:
     stats = {}
 
     # 공정성 점수/선호 반영율/야간·OFF 분포
-    stats["fairness_score_std"] = fair_df["fairness_score"].std(skipna=True) or 0.0
-    stats["avg_pref_match_ratio"] = fair_df["pref_match_ratio"].mean(skipna=True) or 0.0
-    stats["total_night_std"] = fair_df["total_night_days"].std(skipna=True) or 0.0
-    stats["total_off_std"] = fair_df["total_off_days"].std(skipna=True) or 0.0
+    stats["fairness_score_std"] = float(np.nan_to_num(fair_df["fairness_score"].std(skipna=True)))
+    # 희망 신청이 있는 간호사가 있으면 그 간호사들만 평균 (기본값 0.5가 섞이지 않도록)
+    requested = fair_df["pref_requests"] > 0 if "pref_requests" in fair_df.columns else pd.Series(False, index=fair_df.index)
+    pref = fair_df.loc[requested, "pref_match_ratio"] if requested.any() else fair_df["pref_match_ratio"]
+    stats["avg_pref_match_ratio"] = float(np.nan_to_num(pref.mean(skipna=True)))
+    stats["total_night_std"] = float(np.nan_to_num(fair_df["total_night_days"].std(skipna=True)))
+    stats["total_off_std"] = float(np.nan_to_num(fair_df["total_off_days"].std(skipna=True)))
 
     # 기존 메인 페이지에서 쓰는 이름들과 맞추기 위한 매핑
     stats["night_std"] = stats["total_night_std"]
-    stats["weekend_std"] = 0.0  # 아직 weekend 기반 공정성은 계산하지 않음
-    stats["night_ratio_std"] = fair_df["level_night_ratio"].std(skipna=True) or 0.0
-    stats["weekend_ratio_std"] = 0.0  # 아직 weekend 기반 비율 없음
+    stats["night_ratio_std"] = float(np.nan_to_num(fair_df["level_night_ratio"].std(skipna=True)))
+    if "total_weekend_days" in fair_df.columns:
+        stats["weekend_std"] = float(np.nan_to_num(fair_df["total_weekend_days"].std(skipna=True)))
+        stats["weekend_ratio_std"] = float(np.nan_to_num(fair_df["weekend_ratio"].std(skipna=True)))
+    else:
+        stats["weekend_std"] = 0.0
+        stats["weekend_ratio_std"] = 0.0
     stats["avg_mean_overall_risk"] = 0.0  # 필요 시 나중에 overall_risk_score 기반으로 채울 수 있음
 
+    # 병원 전체 불평등 지표 (점 추정값, 신뢰구간은 utils.fairness_stats.fairness_inequality)
+    for name, col in [("night", "total_night_days"), ("weekend", "total_weekend_days"), ("off", "total_off_days")]:
+        if col in fair_df.columns:
+            for index, value in inequality(fair_df[col].to_numpy()).items():
+                stats[f"{name}_{index}"] = value
+
     return stats
 
 
@@ -137,9 +188,13 @@ def generate_fairness_narrative(fair_df: pd.DataFrame, nurse_name: str) -> str:
     lines.append(f"- 최소 OFF 간격: {int(r['min_off_interval'])}일")
 
     # 선호 반영율
-    lines.append(
-        f"- 선호 근무 패턴 반영률(placeholder): {r['pref_match_ratio'] * 100:.1f}%"
-    )
+    if int(r.get("pref_requests", 0)) > 0:
+        lines.append(
+            f"- 희망 근무/휴무 신청 반영률: {r['pref_match_ratio'] * 100:.1f}% "
+            f"(신청 {int(r['pref_requests'])}건)"
+        )
+    else:
+        lines.append("- 희망 근무/휴무 신청: 없음 (반영률 기본값 50%)")
 
     # 간단한 해석
     if r["fairness_score"] < fair_df["fairness_score"].median():
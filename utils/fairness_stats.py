@@ -0,0 +1,150 @@
+# utils/fairness_stats.py
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# 공정성 테이블(utils.fairness) 컬럼 중 불평등 지표를 보는 부담 항목
+BURDENS = {
+    "night": "total_night_days",
+    "weekend": "total_weekend_days",
+    "off": "total_off_days",
+}
+
+# 병원 전체 행의 ward 이름
+HOSPITAL = "전체"
+
+N_BOOT = 10_000
+CI_LEVEL = 0.95
+
+INEQUALITY_COLUMNS = [
+    "ward", "burden", "n",
+    "gini", "gini_lo", "gini_hi",
+    "jain", "jain_lo", "jain_hi",
+    "max_min_ratio", "max_min_lo", "max_min_hi",
+    "above_hospital",
+]
+
+
+# =========================================================
+# 1. 불평등 지표 (고유값 × 빈도 표현)
+#    values: 오름차순 고유값 (k,)  counts: 빈도 (..., k)  → 지표 (...)
+#    부트스트랩 표본도 같은 고유값 위의 빈도 행렬이므로 표본 B개를 한 번에 계산한다.
+# =========================================================
+def _gini(values: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Gini = Σ_i Σ_j c_i c_j |v_i - v_j| / (2 n Σ c v). 0 = 완전 균등."""
+    counts = counts.astype(float)
+    n = counts.sum(axis=-1)
+    cv = counts * values
+    total = cv.sum(axis=-1)
+    # 정렬된 값에서 Σ_{i<j} c_i c_j (v_j - v_i) = Σ_j c_j (v_j · 앞쪽 개수 - 앞쪽 합)
+    before_n = np.cumsum(counts, axis=-1) - counts
+    before_sum = np.cumsum(cv, axis=-1) - cv
+    pair = (counts * (values * before_n - before_sum)).sum(axis=-1)
+    return np.divide(pair, n * total, out=np.zeros(np.shape(total)), where=total > 0)
+
+
+def _jain(values: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Jain's index = (Σx)² / (n Σx²). 1 = 완전 균등, 1/n = 한 명에게 몰림."""
+    counts = counts.astype(float)
+    n = counts.sum(axis=-1)
+    total = (counts * values).sum(axis=-1)
+    sq = (counts * values * values).sum(axis=-1)
+    return np.divide(total * total, n * sq, out=np.ones(np.shape(total)), where=sq > 0)
+
+
+def _max_min(values: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """최댓값 / 최솟값. 최솟값이 0이면 inf (모두 0이면 1)."""
+    present = counts > 0
+    vmax = np.where(present, values, -np.inf).max(axis=-1)
+    vmin = np.where(present, values, np.inf).min(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = vmax / vmin
+    return np.where(vmax == 0, 1.0, np.where(vmin == 0, np.inf, ratio))
+
+
+_INDICES = {"gini": _gini, "jain": _jain, "max_min_ratio": _max_min}
+
+
+def inequality(x) -> Dict[str, float]:
+    """한 집단의 Gini / Jain / max-min 비율 (점 추정값)."""
+    values, counts = np.unique(np.asarray(x, dtype=float), return_counts=True)
+    return {name: float(fn(values, counts)) for name, fn in _INDICES.items()}
+
+
+# =========================================================
+# 2. 부트스트랩 신뢰구간 (재표본 B개 = 다항분포 빈도 행렬 하나)
+# =========================================================
+def bootstrap_inequality(
+    x,
+    n_boot: int = N_BOOT,
+    ci: float = CI_LEVEL,
+    rng: Optional[np.random.Generator] = None,
+) -> Dict[str, float]:
+    """
+    x를 복원추출한 재표본 n_boot개의 지표 분포에서 백분위 신뢰구간을 구한다.
+    복원추출 한 번 = 고유값별 뽑힌 횟수(다항분포)이므로 (n_boot × 고유값 수) 행렬 하나로 뽑고 계산한다.
+    반환: {지표, 지표_lo, 지표_hi} (max_min_ratio는 max_min_lo/hi)
+    """
+    rng = rng or np.random.default_rng(0)
+    values, counts = np.unique(np.asarray(x, dtype=float), return_counts=True)
+    n = int(counts.sum())
+    out: Dict[str, float] = {"n": n}
+    if n == 0:
+        return out
+
+    samples = rng.multinomial(n, counts / n, size=n_boot)
+    q = [(1 - ci) / 2, 1 - (1 - ci) / 2]
+    for name, fn in _INDICES.items():
+        point = float(fn(values, counts))
+        # inf가 섞여도 보간하지 않도록 실제 표본 값을 그대로 고른다
+        lo, hi = np.quantile(fn(values, samples), q, method="inverted_cdf")
+        prefix = "max_min" if name == "max_min_ratio" else name
+        out[name] = point
+        out[f"{prefix}_lo"] = float(lo)
+        out[f"{prefix}_hi"] = float(hi)
+    return out
+
+
+# =========================================================
+# 3. 병동별 / 병원 전체 표
+# =========================================================
+def fairness_inequality(
+    fair_df: pd.DataFrame,
+    n_boot: int = N_BOOT,
+    ci: float = CI_LEVEL,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    공정성 테이블 → (병동, 부담 항목)별 Gini / Jain / max-min 비율과 부트스트랩 신뢰구간.
+    첫 행들은 병원 전체(ward = "전체"), ward 컬럼이 있으면 병동별 행이 이어진다.
+    above_hospital: 병동 Gini 신뢰구간 하한이 병원 전체 Gini보다 높음
+                    (그 병동의 불균등이 표본 잡음으로 설명되지 않는다는 뜻)
+    """
+    if fair_df is None or fair_df.empty:
+        return pd.DataFrame(columns=INEQUALITY_COLUMNS)
+    burdens = {k: c for k, c in BURDENS.items() if c in fair_df.columns}
+    if not burdens:
+        return pd.DataFrame(columns=INEQUALITY_COLUMNS)
+
+    rng = np.random.default_rng(seed)
+    groups = [(HOSPITAL, fair_df)]
+    if "ward" in fair_df.columns and fair_df["ward"].nunique() > 1:
+        groups += list(fair_df.groupby("ward", sort=True))
+
+    rows = []
+    hospital_gini = {}
+    for ward, sub in groups:
+        for burden, col in burdens.items():
+            res = bootstrap_inequality(sub[col].to_numpy(), n_boot, ci, rng)
+            if ward == HOSPITAL:
+                hospital_gini[burden] = res.get("gini", 0.0)
+                above = False
+            else:
+                above = res.get("gini_lo", 0.0) > hospital_gini[burden]
+            rows.append({"ward": ward, "burden": burden, **res, "above_hospital": bool(above)})
+
+    out = pd.DataFrame(rows).reindex(columns=INEQUALITY_COLUMNS)
+    num = out.columns.difference(["ward", "burden", "n", "above_hospital"])
+    out[num] = out[num].astype(float).round(4)
+    return out
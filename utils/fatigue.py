@@ -0,0 +1,126 @@
+# utils/fatigue.py
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.codebook import Codebook, get_codebook
+
+# =========================================================
+# 0. 모델 상수 (three-process model, Åkerstedt & Folkard)
+#    각성도 = S(항상성) + C(일주기) + W(수면 관성), 낮을수록 피로. 7 미만 ≈ 심한 졸림
+# =========================================================
+S_WAKE_ASYMPTOTE = 2.4     # 깨어 있을 때 S가 수렴하는 값
+S_WAKE_RATE = 0.0353       # 깨어 있을 때 S 감소 속도 (1/h)
+S_SLEEP_ASYMPTOTE = 14.3   # 잘 때 S가 회복하는 상한
+S_SLEEP_RATE = 0.381       # 잘 때 S 회복 속도 (1/h)
+C_AMPLITUDE = 2.5
+C_ACROPHASE = 16.8         # 일주기 각성도 최고 시각 (h)
+W_AMPLITUDE = -5.72
+W_RATE = 1.51
+S_INITIAL = 13.0           # 시뮬레이션 시작(워밍업 첫날 0시) 값
+
+# =========================================================
+# 수면/각성 일정 가정 (근무표에는 수면 기록이 없으므로 규칙으로 만든다)
+# =========================================================
+NIGHT_SLEEP = (23, 7)      # 평소 밤잠 시각 [23시, 다음날 7시)
+COMMUTE_HOURS = 1          # 근무 전후 깨어 있는 시간 (출퇴근/인수인계)
+DAY_SLEEP_HOURS = 6        # 야간 근무 후 낮잠(주간 수면) 길이
+NAP_HOURS = 2              # 야간 근무 전 낮잠 길이
+WARMUP_DAYS = 2            # 첫 근무 전 평소 일정으로 돌리는 기간
+
+
+def _interval_mask(n_nurses: int, n_hours: int, nurse: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    """간호사별 시간 구간 [lo, hi) 합집합 → 간호사 × 시간 bool 격자 (차분 배열 누적합)."""
+    lo = np.clip(lo, 0, n_hours)
+    hi = np.clip(hi, 0, n_hours)
+    keep = hi > lo
+    diff = np.zeros((n_nurses, n_hours + 1), dtype=np.int16)
+    np.add.at(diff, (nurse[keep], lo[keep]), 1)
+    np.add.at(diff, (nurse[keep], hi[keep]), -1)
+    return diff[:, :-1].cumsum(axis=1, dtype=np.int16) > 0
+
+
+def simulate_alertness(asleep: np.ndarray, hour0: int = 0) -> np.ndarray:
+    """
+    간호사 × 시간 수면 격자 → 같은 모양의 각성도 (float32).
+    S는 시간 단계마다 모든 간호사를 한 번에 갱신하고, C와 W는 격자 전체에서 한 번에 계산한다.
+    hour0: 격자 첫 칸의 시각(0 = 자정)
+    """
+    n_nurses, n_hours = asleep.shape
+    kw = np.float32(np.exp(-S_WAKE_RATE))
+    ks = np.float32(np.exp(-S_SLEEP_RATE))
+
+    S = np.empty((n_nurses, n_hours), dtype=np.float32)
+    s = np.full(n_nurses, S_INITIAL, dtype=np.float32)
+    awake = ~asleep
+    for t in range(n_hours):
+        # 이번 시간 시작 시점 값을 기록한 뒤 1시간 경과
+        S[:, t] = s
+        s = np.where(awake[:, t], S_WAKE_ASYMPTOTE + (s - S_WAKE_ASYMPTOTE) * kw,
+                     S_SLEEP_ASYMPTOTE - (S_SLEEP_ASYMPTOTE - s) * ks)
+
+    hours = np.arange(n_hours) + hour0
+    C = (C_AMPLITUDE * np.cos(2 * np.pi * (hours % 24 - C_ACROPHASE) / 24)).astype(np.float32)
+
+    # 마지막으로 잔 시간 → 깬 뒤 경과 시간 (깨어 있는 칸만 의미 있음)
+    last_sleep = np.where(asleep, np.arange(n_hours), -10_000)
+    np.maximum.accumulate(last_sleep, axis=1, out=last_sleep)
+    since_wake = (np.arange(n_hours) - last_sleep - 1).astype(np.float32)
+    W = np.where(awake, W_AMPLITUDE * np.exp(-W_RATE * since_wake), 0).astype(np.float32)
+
+    return S + C + W
+
+
+def shift_alertness(df: pd.DataFrame, codebook: Optional[Codebook] = None) -> np.ndarray:
+    """
+    근무 행마다 근무 시간 중 최저 각성도 (three-process model). 근무시간이 없는 행(OFF 등)은 NaN.
+
+    간호사별 근무를 코드북 시작/종료 시각으로 시간 단위 타임라인에 펼친 뒤 수면 일정을 규칙으로 만든다.
+      - 평소 23시~7시 수면, 근무 전후 COMMUTE_HOURS는 깨어 있음
+      - 야간 근무(다음날 끝나는 근무) 후에는 DAY_SLEEP_HOURS 주간 수면, 전에는 NAP_HOURS 낮잠
+    """
+    cb = codebook or get_codebook()
+    out = np.full(len(df), np.nan)
+    if len(df) == 0:
+        return out
+
+    start_h, end_h = cb.shift_hours(df["shift_code"])
+    has = ~np.isnan(start_h)
+    if not has.any():
+        return out
+
+    codes, nurses = pd.factorize(df["nurse_id"])
+    days = pd.to_datetime(df["date"]).values.astype("datetime64[D]").astype(np.int64)
+    first_day = int(days.min()) - WARMUP_DAYS
+    # 마지막 날 야간 근무가 다음날로 넘어가므로 하루 여유
+    n_hours = (int(days.max()) - first_day + 2) * 24
+
+    nurse = codes[has]
+    base = (days[has] - first_day) * 24
+    work_lo = base + np.floor(start_h[has]).astype(np.int64)
+    work_hi = base + np.ceil(end_h[has]).astype(np.int64)
+    overnight = end_h[has] > 24
+
+    n_nurses = len(nurses)
+    hour_of_day = np.arange(n_hours) % 24
+    night_sleep = (hour_of_day >= NIGHT_SLEEP[0]) | (hour_of_day < NIGHT_SLEEP[1])
+    extra_sleep = _interval_mask(
+        n_nurses, n_hours,
+        np.r_[nurse[overnight], nurse[overnight]],
+        np.r_[work_hi[overnight] + COMMUTE_HOURS, work_lo[overnight] - COMMUTE_HOURS - NAP_HOURS],
+        np.r_[work_hi[overnight] + COMMUTE_HOURS + DAY_SLEEP_HOURS, work_lo[overnight] - COMMUTE_HOURS],
+    )
+    forced_awake = _interval_mask(n_nurses, n_hours, nurse, work_lo - COMMUTE_HOURS, work_hi + COMMUTE_HOURS)
+    asleep = (night_sleep[None, :] | extra_sleep) & ~forced_awake
+
+    alert = simulate_alertness(asleep)
+
+    # 근무 시간 [work_lo, work_hi) 중 최저값: 최대 근무 길이만큼 펼쳐 한 번에 조회
+    length = work_hi - work_lo
+    offsets = np.arange(max(int(length.max()), 1))
+    idx = np.minimum(work_lo[:, None] + offsets, n_hours - 1)
+    values = np.where(offsets < length[:, None], alert[nurse[:, None], idx], np.inf)
+    out[has] = values.min(axis=1)
+    out[has & ~np.isfinite(out)] = np.nan
+    return np.round(out, 2)
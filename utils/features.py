@@ -1,49 +1,55 @@
+import numpy as np
 import pandas as pd
 import datetime as dt
-from typing import Tuple
+import re
+from typing import Optional, Sequence, Tuple
+
+from utils.codebook import Codebook, get_codebook
+from utils.fatigue import shift_alertness
+from utils.patterns import detect_patterns
 
 REQUIRED_COLS = ["date", "nurse_id", "nurse_name", "shift_code"]
 
-OFF_CODES = {"OFF", "O", "휴무", "OFFDAY"}
-NIGHT_CODES = {"N", "NIGHT", "NS"}
-EVENING_CODES = {"E", "EVENING"}
-DAY_CODES = {"D", "DAY", "DS", "9D", "LEADER"}
-IGNORED_CODES = {"A"}  # UM 등 분석 제외
+# 근무코드 분류는 utils.codebook 한 곳에서 관리한다 (아래 집합은 하위 호환용)
+OFF_CODES = get_codebook().codes_of_type("OFF")
+NIGHT_CODES = get_codebook().codes_of_type("NIGHT")
+EVENING_CODES = get_codebook().codes_of_type("EVENING")
+DAY_CODES = get_codebook().codes_of_type("DAY")
+IGNORED_CODES = set(get_codebook().ignored)  # UM 등 분석 제외
+
+# 최근 N일 업무량 피처: 컬럼 → (창 길이(일), 하루 값)
+WORKLOAD_WINDOWS = {
+    "nights_7d": (7, "night"),
+    "working_14d": (14, "work"),
+    "hours_28d": (28, "hours"),
+    "weekend_shifts_28d": (28, "weekend"),
+}
+
+# 근무시간이 코드북에 없는 근무(OTHER 등)의 추정 근무시간
+DEFAULT_SHIFT_HOURS = 8.0
 
 
 # -------------------------------
 # SHIFT NORMALIZATION
 # -------------------------------
 def normalize_shift_code(code: str) -> str:
-    if pd.isna(code):
-        return ""
-    s = str(code).strip().upper()
-    if s == "8D":
-        return "9D"
-    return s
+    return get_codebook().normalize_one(code)
 
 
 def classify_shift(code: str) -> str:
-    if code in OFF_CODES:
-        return "OFF"
-    if code in NIGHT_CODES:
-        return "NIGHT"
-    if code in EVENING_CODES:
-        return "EVENING"
-    if code in DAY_CODES:
-        return "DAY"
-    return "OTHER"
+    cb = get_codebook()
+    return cb.info(cb.normalize_one(code))["shift_type"]
 
 
 # -------------------------------
 # LOAD SCHEDULE FILE
 # -------------------------------
-def load_schedule_file(uploaded_file) -> pd.DataFrame:
-    fname = uploaded_file.name.lower()
-    if fname.endswith(".csv"):
-        df = pd.read_csv(uploaded_file)
-    else:
-        df = pd.read_excel(uploaded_file)
+def prepare_schedule(df: pd.DataFrame, codebook: Optional[Codebook] = None) -> pd.DataFrame:
+    """
+    원본 근무표 DataFrame 검증 + 날짜/근무코드 정규화.
+    (파일 업로드와 챗봇 분석이 같은 정규화를 쓰도록 분리)
+    """
+    cb = codebook or get_codebook()
 
     missing = [c for c in REQUIRED_COLS if c not in df.columns]
     if missing:
@@ -51,8 +57,9 @@ def load_schedule_file(uploaded_file) -> pd.DataFrame:
 
     df = df.copy()
     df["date"] = pd.to_datetime(df["date"]).dt.date
-    df["shift_code"] = df["shift_code"].apply(normalize_shift_code)
-    df = df[~df["shift_code"].isin(IGNORED_CODES)]
+    ignored = cb.is_ignored(df["shift_code"])
+    df["shift_code"] = cb.normalize(df["shift_code"])
+    df = df[~ignored]
 
     if "is_novice" not in df.columns:
         df["is_novice"] = False
@@ -60,140 +67,211 @@ def load_schedule_file(uploaded_file) -> pd.DataFrame:
     return df
 
 
+def load_schedule_file(uploaded_file, sheets: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    CSV/XLSX 근무표 → 정규화된 DataFrame.
+    XLSX에서 sheets를 주면 그 시트들을 병렬로 읽어 합친다 (sheet 컬럼 추가, utils.excel_ingest).
+    """
+    fname = uploaded_file.name.lower()
+    if fname.endswith(".csv"):
+        df = pd.read_csv(uploaded_file)
+    elif sheets is not None:
+        from utils.excel_ingest import read_workbook
+
+        return read_workbook(uploaded_file.getvalue(), sheets)
+    else:
+        df = pd.read_excel(uploaded_file)
+
+    return prepare_schedule(df)
+
+
 # -------------------------------
 # BASE FEATURE COMPUTATION
 # -------------------------------
 def _compute_consecutive_features(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.sort_values(["nurse_id", "date"])
-    df["prev_date"] = df.groupby("nurse_id")["date"].shift(1)
-    df["prev_shift_code"] = df.groupby("nurse_id")["shift_code"].shift(1)
-    df["prev_shift_type"] = df.groupby("nurse_id")["shift_type"].shift(1)
-
-    cw_map = {}
-    cn_map = {}
-
-    for nurse_id, group in df.groupby("nurse_id", sort=False):
-        group = group.sort_values("date")
-        cw = 0
-        cn = 0
-        last_date = None
-
-        for idx, row in group.iterrows():
-            if row["shift_type"] == "OFF":
-                cw = 0
-                cn = 0
-            else:
-                if last_date is not None and (row["date"] - last_date).days == 1:
-                    cw += 1
-                else:
-                    cw = 1
-
-                if row["shift_type"] == "NIGHT":
-                    if last_date is not None and (row["date"] - last_date).days == 1 and row["prev_shift_type"] == "NIGHT":
-                        cn += 1
-                    else:
-                        cn = 1
-                else:
-                    cn = 0
-
-            cw_map[idx] = cw
-            cn_map[idx] = cn
-            last_date = row["date"]
-
-    df["consecutive_working_days"] = df.index.map(cw_map).fillna(0).astype(int)
-    df["consecutive_night_shifts"] = df.index.map(cn_map).fillna(0).astype(int)
+    """
+    간호사별 연속 근무일/연속 야간 수.
+    달력상 하루 간격으로 이어지는 근무만 연속으로 본다 (OFF 또는 날짜 공백에서 리셋).
+    """
+    df = df.sort_values(["nurse_id", "date"], kind="stable")
+    g = df.groupby("nurse_id", sort=False)
+    df["prev_date"] = g["date"].shift(1)
+    df["prev_shift_code"] = g["shift_code"].shift(1)
+    df["prev_shift_type"] = g["shift_type"].shift(1)
+
+    days = pd.to_datetime(df["date"]).values.astype("datetime64[D]").astype(np.int64)
+    nurse = df["nurse_id"].to_numpy()
+    stype = df["shift_type"].to_numpy()
+
+    new_nurse = np.r_[True, nurse[1:] != nurse[:-1]]
+    adjacent = ~new_nurse & (np.r_[0, np.diff(days)] == 1)
+    prev_type = np.r_[None, stype[:-1]]
+
+    work = stype != "OFF"
+    night = stype == "NIGHT"
+
+    # 구간 시작점마다 새 번호 → 구간 안 순번 = 연속 일수
+    work_start = work & ~(adjacent & np.r_[False, work[:-1]])
+    night_start = night & ~(adjacent & (prev_type == "NIGHT"))
+
+    cw = pd.Series(work_start.cumsum()).groupby(work_start.cumsum()).cumcount().to_numpy() + 1
+    cn = pd.Series(night_start.cumsum()).groupby(night_start.cumsum()).cumcount().to_numpy() + 1
+
+    df["consecutive_working_days"] = np.where(work, cw, 0).astype(int)
+    df["consecutive_night_shifts"] = np.where(night, cn, 0).astype(int)
     return df
 
 
-def _compute_staffing_features(df: pd.DataFrame) -> pd.DataFrame:
-    staffed = (
-        df[df["shift_type"] != "OFF"]
-        .groupby(["date", "shift_code"])["nurse_id"]
-        .nunique()
-    )
+def _compute_staffing_features(df: pd.DataFrame, codebook: Optional[Codebook] = None) -> pd.DataFrame:
+    cb = codebook or get_codebook()
+    work = (df["shift_type"] != "OFF").to_numpy()
 
-    df["staffing_count"] = list(
-        df.set_index(["date", "shift_code"]).index.map(
-            lambda key: staffed.get(key, 0)
-        )
+    # 날짜 × 근무코드별 근무 인원 (OFF 행은 0)
+    staffed = (
+        df.loc[work]
+        .groupby(["date", "shift_code"], sort=False)["nurse_id"]
+        .transform("nunique")
     )
+    count = np.zeros(len(df), dtype=np.int64)
+    count[work] = staffed.to_numpy()
 
-    def baseline_for_row(row) -> int:
-        code = row["shift_code"]
-        stype = row["shift_type"]
-        if code == "9D":
-            return 1
-        if stype == "DAY":
-            return 6
-        if stype == "EVENING":
-            return 6
-        if stype == "NIGHT":
-            return 5
-        return 0
-
-    df["staffing_baseline"] = df.apply(baseline_for_row, axis=1)
+    df["staffing_count"] = count
+    df["staffing_baseline"] = cb.staffing_baseline(df["shift_code"])
     df["staffing_diff"] = (df["staffing_baseline"] - df["staffing_count"]).astype(int)
     return df
 
 
-def _compute_quick_return_flags(df: pd.DataFrame) -> pd.DataFrame:
-    df["ED_quick_return"] = (
-        (df["prev_shift_type"] == "EVENING")
-        & (df["shift_type"] == "DAY")
-        & (df["shift_code"].isin({"D", "9D"}))
-    )
+def _compute_quick_return_flags(df: pd.DataFrame, codebook: Optional[Codebook] = None) -> pd.DataFrame:
+    """
+    코드북 quick_returns 패턴(ED, ND, NE, EOD, NOD, NOE ...)을 달력 기준으로 탐지.
+    패턴이 끝나는 날의 행에 {group} 플래그와 {group}_severity(등급 점수)를 붙인다.
+    """
+    flags = detect_patterns(df, codebook=codebook).row_flags()
+    for col in flags.columns:
+        df[col] = flags[col].to_numpy()
+    return df
 
-    df["N_quick_return"] = (
-        (df["prev_shift_type"] == "NIGHT")
-        & (
-            (df["shift_code"].isin({"D", "9D"}))
-            | (df["shift_type"] == "EVENING")
-        )
-    )
+
+def _compute_workload_features(df: pd.DataFrame, codebook: Optional[Codebook] = None) -> pd.DataFrame:
+    """
+    간호사별 최근 N일(그날 포함) 업무량: 야간 수, 근무일 수, 추정 근무시간, 주말 근무 수.
+    간호사 × 날짜 격자에 하루 값을 더해 누적합을 만든 뒤 cs[d] - cs[d - N]으로 구하므로
+    창 길이와 무관하게 격자 크기에 비례하는 시간이 든다 (근무표에 없는 날은 0).
+    """
+    cb = codebook or get_codebook()
+    stype = df["shift_type"].to_numpy()
+    work = stype != "OFF"
+
+    start_h, end_h = cb.shift_hours(df["shift_code"])
+    hours = np.where(np.isnan(start_h), DEFAULT_SHIFT_HOURS, end_h - start_h)
+    daily = {
+        "night": stype == "NIGHT",
+        "work": work,
+        "hours": np.where(work, hours, 0.0),
+        "weekend": work & df["weekend_flag"].to_numpy(dtype=bool),
+    }
+
+    codes, nurses = pd.factorize(df["nurse_id"])
+    days = pd.to_datetime(df["date"]).values.astype("datetime64[D]").astype(np.int64)
+    if len(df) == 0:
+        for col in WORKLOAD_WINDOWS:
+            df[col] = np.zeros(0, dtype=float if col == "hours_28d" else np.int64)
+        return df
+    col = days - days.min()
+    n_days = int(col.max()) + 1
+
+    for name, (window, key) in WORKLOAD_WINDOWS.items():
+        grid = np.zeros((len(nurses), n_days + 1))
+        # 앞에 0 한 칸: cs[:, c + 1] = c일까지 누적
+        np.add.at(grid, (codes, col + 1), daily[key].astype(float))
+        cs = grid.cumsum(axis=1)
+        total = cs[codes, col + 1] - cs[codes, np.maximum(col + 1 - window, 0)]
+        df[name] = total.round(1) if key == "hours" else total.round().astype(np.int64)
     return df
 
 
-def add_base_features(df: pd.DataFrame) -> pd.DataFrame:
+def add_base_features(df: pd.DataFrame, codebook: Optional[Codebook] = None) -> pd.DataFrame:
+    cb = codebook or get_codebook()
     df = df.copy()
-    df["shift_type"] = df["shift_code"].apply(classify_shift)
-    df["weekday"] = df["date"].apply(lambda d: d.weekday())
+    df["shift_type"] = cb.shift_type(df["shift_code"])
+    df["token"] = cb.token(df["shift_code"])
+    df["weekday"] = pd.to_datetime(df["date"]).dt.weekday.to_numpy()
     df["weekend_flag"] = df["weekday"].isin({5, 6})
 
     df = _compute_consecutive_features(df)
-    df = _compute_staffing_features(df)
-    df = _compute_quick_return_flags(df)
+    df = _compute_workload_features(df, cb)
+    df["fatigue_alertness"] = shift_alertness(df, cb)
+    df = _compute_staffing_features(df, cb)
+    df = _compute_quick_return_flags(df, cb)
     return df
 
 
 # -------------------------------
 # DATE RANGE PARSER
 # -------------------------------
-def get_date_range_from_keyword(keyword: str) -> Tuple[dt.date, dt.date]:
-    text = keyword.replace(" ", "")
-    today = dt.date.today()
-
-    if "오늘" in text:
+def _month_range(year: int, month: int) -> Tuple[dt.date, dt.date]:
+    start = dt.date(year, month, 1)
+    if month == 12:
+        end = dt.date(year + 1, 1, 1) - dt.timedelta(days=1)
+    else:
+        end = dt.date(year, month + 1, 1) - dt.timedelta(days=1)
+    return start, end
+
+
+# 명시적 기간: 2025-01-03~2025-01-10 / 2025.1.3~1.10 / 1/3~1/10 / 1월 3일~1월 10일 (~ 대신 '-'나 '부터 … 까지'도 허용)
+_DATE_TOKEN = r"(?:(\d{4})[-./년]\s*)?(\d{1,2})[-./월]\s*(\d{1,2})일?"
+_EXPLICIT_RANGE = re.compile(_DATE_TOKEN + r"\s*(?:~|부터|-|–)\s*" + _DATE_TOKEN)
+_MONTH = re.compile(r"(?:(\d{4})년\s*)?(\d{1,2})월(?!\s*\d)")
+
+
+def parse_date_range(text: str, today: Optional[dt.date] = None) -> Optional[Tuple[dt.date, dt.date]]:
+    """
+    질문 문장에서 기간을 찾는다. 찾지 못하면 None (전체 기간으로 처리하는 쪽에서 판단).
+    지원: 오늘/내일/어제, 이번주/다음주/지난주, 이번달/다음달/지난달, N월, 명시적 기간(시작~끝).
+    """
+    today = today or dt.date.today()
+
+    m = _EXPLICIT_RANGE.search(text)
+    if m:
+        y1, m1, d1, y2, m2, d2 = m.groups()
+        try:
+            start = dt.date(int(y1 or today.year), int(m1), int(d1))
+            end = dt.date(int(y2 or start.year), int(m2), int(d2))
+        except ValueError:
+            return None
+        if end < start and y2 is None:
+            # 12/28~1/3 처럼 해를 넘기는 기간
+            end = end.replace(year=end.year + 1)
+        return (start, end) if start <= end else (end, start)
+
+    compact = text.replace(" ", "")
+    week_start = today - dt.timedelta(days=today.weekday())
+    if "오늘" in compact:
         return today, today
-    if "내일" in text:
+    if "내일" in compact:
         d = today + dt.timedelta(days=1)
         return d, d
-    if "이번주" in text:
-        start = today - dt.timedelta(days=today.weekday())
-        end = start + dt.timedelta(days=6)
-        return start, end
-    if "다음주" in text:
-        start = today - dt.timedelta(days=today.weekday()) + dt.timedelta(days=7)
-        end = start + dt.timedelta(days=6)
-        return start, end
-    if "이번달" in text or "이번월" in text:
-        start = today.replace(day=1)
-        if start.month == 12:
-            end = start.replace(year=start.year + 1, month=1) - dt.timedelta(days=1)
-        else:
-            end = start.replace(month=start.month + 1) - dt.timedelta(days=1)
-        return start, end
+    if "어제" in compact:
+        d = today - dt.timedelta(days=1)
+        return d, d
+    for words, weeks in ((("이번주", "금주"), 0), (("다음주",), 1), (("지난주", "저번주"), -1)):
+        if any(w in compact for w in words):
+            start = week_start + dt.timedelta(days=7 * weeks)
+            return start, start + dt.timedelta(days=6)
+    for words, months in ((("이번달", "이번월"), 0), (("다음달",), 1), (("지난달", "저번달"), -1)):
+        if any(w in compact for w in words):
+            index = today.year * 12 + today.month - 1 + months
+            return _month_range(index // 12, index % 12 + 1)
 
-    return today, today
+    m = _MONTH.search(text)
+    if m and 1 <= int(m.group(2)) <= 12:
+        return _month_range(int(m.group(1) or today.year), int(m.group(2)))
+    return None
+
+
+def get_date_range_from_keyword(keyword: str) -> Tuple[dt.date, dt.date]:
+    today = dt.date.today()
+    return parse_date_range(keyword, today) or (today, today)
 
 
 # -------------------------------
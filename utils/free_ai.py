@@ -1,40 +1,65 @@
-import requests
+import json
+from typing import Tuple
+
 import streamlit as st
 
-HF_API_TOKEN = st.secrets["HF_API_TOKEN"]
+from utils.llm_meter import post_json, record_call, token_counts
+
 HF_API_URL = "https://api-inference.huggingface.co/models/google/gemma-2b-it"
+HF_MODEL = "google/gemma-2b-it"
 
-def call_llm(prompt: str) -> str:
-    headers = {
-        "Authorization": f"Bearer {HF_API_TOKEN}",
-        "Content-Type": "application/json"
-    }
 
-    payload = {
-        "inputs": prompt,
-        "parameters": {"max_new_tokens": 200}
-    }
+def _api_token() -> str:
+    # secrets는 첫 호출 때 읽는다 (import 시점에 읽으면 토큰이 없을 때 페이지 전체가 실패)
+    return st.secrets["HF_API_TOKEN"]
 
-    try:
-        resp = requests.post(HF_API_URL, headers=headers, json=payload, timeout=40)
-    except Exception as e:
-        return f"[HTTP Error] {e}"
 
+def _parse(status: int, body: bytes) -> Tuple[str, bool]:
+    """응답 본문 → (표시할 텍스트, 생성 결과인지 여부)."""
     # JSON parse safety
     try:
-        data = resp.json()
+        data = json.loads(body)
     except Exception:
-        return f"[HF Raw Response] {resp.status_code}: {resp.text}"
+        return f"[HF Raw Response] {status}: {body.decode('utf-8', 'replace')}", False
 
     # Error
-    if "error" in data:
-        return f"[HF Error] {data['error']}"
+    if isinstance(data, dict) and "error" in data:
+        return f"[HF Error] {data['error']}", False
 
     # Standard inference output
     if isinstance(data, dict) and "generated_text" in data:
-        return data["generated_text"]
+        return data["generated_text"], True
 
     if isinstance(data, list) and len(data) > 0 and "generated_text" in data[0]:
-        return data[0]["generated_text"]
+        return data[0]["generated_text"], True
+
+    return f"[Unexpected Response] {data}", False
+
+
+def call_llm(prompt: str) -> str:
+    """Inference API 호출. 호출 기록(토큰 추정치, 지연, 상태, 재시도)은 분석 로그에 남는다."""
+    try:
+        token = _api_token()
+    except Exception:
+        return "[Config Error] HF_API_TOKEN이 설정되지 않았습니다."
+
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Content-Type": "application/json"
+    }
+
+    payload = {
+        "inputs": prompt,
+        "parameters": {"max_new_tokens": 200}
+    }
+
+    body, record = post_json(HF_API_URL, headers, payload, timeout=40)
+    if body is None:
+        answer, generated = f"[HTTP Error] {record['error']}", False
+    else:
+        answer, generated = _parse(record["status"], body)
+    completion = answer if generated else ""
 
-    return f"[Unexpected Response] {data}"
+    # Inference API 응답에는 usage가 없어 토큰 수는 로컬 추정값
+    record_call(prompt, answer, "free_ai", HF_MODEL, record, token_counts(prompt, completion))
+    return answer
@@ -0,0 +1,291 @@
+# utils/generator.py
+import datetime as dt
+import math
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.codebook import Codebook, get_codebook
+from utils.optimizer import RosterState
+from utils.patterns import encode_suffix, patterns_from_codebook, suffix_table
+
+# 배치 순서: 제약이 강한 근무부터 채운다
+DEFAULT_SHIFTS = ["N", "E", "D"]
+OFF_CODE = "OFF"
+
+# 코드북 총 휴무/야간 일수 구간은 월(31일) 기준 → 기간 길이에 비례해 적용
+MONTH_DAYS = 31
+
+# 기준 인원 부족 1명당 벌점 (위험점수보다 항상 크게)
+SHORTFALL_PENALTY = 1000.0
+
+
+# =========================================================
+# 1. 제약 / 기준 인원
+# =========================================================
+def _bound(cb: Codebook, metric: str, level: str, key: str) -> Optional[float]:
+    for rule in cb.thresholds.get(metric, []):
+        if rule["level"] == level and rule.get(key) is not None:
+            return float(rule[key])
+    return None
+
+
+def limits_from_codebook(codebook: Optional[Codebook] = None, n_days: int = MONTH_DAYS) -> dict:
+    """
+    코드북 Critical 구간 바로 앞까지를 생성 제약으로 쓴다.
+    - 연속 근무/연속 야간: Critical 시작값 - 1
+    - 총 야간 일수: Critical 시작값 - 1, 총 휴무 일수: Critical 상한 이상 (월 기준 → 기간 비례)
+    - Critical 등급 quick return 패턴(ED, ND, NE, NOD) 금지
+    """
+    cb = codebook or get_codebook()
+    scale = n_days / MONTH_DAYS
+    max_nights = _bound(cb, "total_night_days", "Critical", "min")
+    min_off = _bound(cb, "total_off_days", "Critical", "max")
+    return {
+        "max_consecutive_work": int(_bound(cb, "consecutive_working_days", "Critical", "min") or 7) - 1,
+        "max_consecutive_nights": int(_bound(cb, "consecutive_night_shifts", "Critical", "min") or 6) - 1,
+        "max_night_days": n_days if max_nights is None else int(math.floor((max_nights - 1) * scale)),
+        "min_off_days": 0 if min_off is None else int(math.ceil(min_off * scale)),
+        "forbidden_patterns": [p for p in patterns_from_codebook(cb) if p["severity"] == "Critical"],
+        "max_novice_ratio": 0.5,
+    }
+
+
+def baselines_from_codebook(shifts=None, codebook: Optional[Codebook] = None) -> Dict[str, int]:
+    """근무코드별 기준 인원 (_compute_staffing_features와 같은 코드북 값)."""
+    cb = codebook or get_codebook()
+    shifts = shifts or DEFAULT_SHIFTS
+    return {s: int(cb.info(s).get("staffing_baseline", 0)) for s in shifts}
+
+
+# =========================================================
+# 2. 생성기
+# =========================================================
+class _Problem:
+    """생성 1회분 입력을 배열로 정리 (재시작마다 공유)."""
+
+    def __init__(self, nurses, start, n_days, baselines, limits, requests, cb):
+        self.cb = cb
+        self.nurses = nurses.reset_index(drop=True)
+        self.n = len(self.nurses)
+        self.n_days = n_days
+        self.dates = [start + dt.timedelta(days=i) for i in range(n_days)]
+        self.limits = limits
+        self.novice = self.nurses.get("is_novice", pd.Series(False, index=self.nurses.index)).fillna(False).astype(bool).to_numpy()
+
+        self.shifts = [s for s in sorted(baselines, key=self._order) if baselines[s] > 0]
+        self.codes = [OFF_CODE] + self.shifts  # 코드 id 0 = OFF
+        self.need = np.array([baselines[s] for s in self.shifts], dtype=np.int64)
+        code_series = pd.Series(self.codes)
+        self.is_night = cb.shift_type(code_series) == "NIGHT"
+
+        tokens = cb.token(code_series)
+        vocab = {t: i for i, t in enumerate(sorted(set(tokens) | {t for p in limits["forbidden_patterns"] for t in p["sequence"]}))}
+        self.symbol = np.array([vocab[t] + 1 for t in tokens])  # 0 = 기록 없음
+        hits, self.base, self.width = suffix_table(limits["forbidden_patterns"], vocab)
+        self.forbidden = hits.any(axis=1) if hits.shape[1] else np.zeros(len(hits), dtype=bool)
+
+        # 요청: (간호사, 날짜) → 코드 id, 우선순위
+        self.req_code = np.full((self.n, n_days), -1, dtype=np.int64)
+        self.req_prio = np.zeros((self.n, n_days))
+        if requests is not None and len(requests):
+            pos = pd.Index(self.nurses["nurse_id"]).get_indexer(requests["nurse_id"])
+            day = (pd.to_datetime(requests["date"]) - pd.Timestamp(start)).dt.days.to_numpy()
+            code = pd.Index(self.codes).get_indexer(cb.normalize(requests["shift_code"]))
+            prio = requests["priority"].fillna(1).to_numpy(float) if "priority" in requests else np.ones(len(requests))
+            ok = (pos >= 0) & (day >= 0) & (day < n_days) & (code >= 0)
+            self.req_code[pos[ok], day[ok]] = code[ok]
+            self.req_prio[pos[ok], day[ok]] = prio[ok]
+
+    def _order(self, code):
+        order = {s: i for i, s in enumerate(DEFAULT_SHIFTS)}
+        return order.get(code, len(order))
+
+
+def _construct(p: _Problem, rng: np.random.Generator, noise: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    날짜 순서대로, 근무별 기준 인원을 점수가 낮은(유리한) 간호사부터 채우는 탐욕 배치.
+    매 (날짜, 근무)마다 간호사 전원을 배열 연산으로 한 번에 거른다.
+    반환값: (간호사 × 날짜 코드 id, 날짜 × 근무 부족 인원)
+    """
+    lim = p.limits
+    n, D = p.n, p.n_days
+    assign = np.zeros((n, D), dtype=np.int64)
+    shortfall = np.zeros((D, len(p.shifts)), dtype=np.int64)
+
+    cw = np.zeros(n, dtype=np.int64)
+    cn = np.zeros(n, dtype=np.int64)
+    work_total = np.zeros(n, dtype=np.int64)
+    night_total = np.zeros(n, dtype=np.int64)
+    shift_total = np.zeros((n, len(p.codes)), dtype=np.int64)
+    history = np.zeros((n, max(p.width - 1, 0)), dtype=np.int64)  # 최근 기호 (0 = 기록 없음)
+    last = np.zeros(n, dtype=np.int64)  # 전날 코드 id
+    max_work = D - lim["min_off_days"]
+
+    for d in range(D):
+        free = np.ones(n, dtype=bool)
+        req = p.req_code[:, d]
+        prio = p.req_prio[:, d]
+        for k, shift in enumerate(p.shifts):
+            code = k + 1
+            night = bool(p.is_night[code])
+
+            # 금지 패턴: 최근 기록 + 오늘 근무가 만드는 창이 금지 표에 있으면 제외
+            window = np.c_[history, np.full(n, p.symbol[code])]
+            pattern_ok = ~p.forbidden[encode_suffix(window, p.base, p.width)[:, -1]]
+            ok = free & pattern_ok & (cw < lim["max_consecutive_work"]) & (work_total < max_work)
+            if night:
+                ok &= (cn < lim["max_consecutive_nights"]) & (night_total < lim["max_night_days"])
+
+            score = (
+                work_total + 2.0 * shift_total[:, code]
+                - 3.0 * (last == code) * night  # 야간은 묶어서
+                - 1.0 * (last == code) * (not night)
+                - 10.0 * prio * (req == code)
+                + 10.0 * prio * ((req >= 0) & (req != code))
+                + noise * rng.random(n)
+            )
+            cand = np.flatnonzero(ok)
+            cand = cand[np.argsort(score[cand], kind="stable")]
+
+            # 신규 간호사 비율 상한 (skill mix)
+            cap = max(1, int(math.floor(p.need[k] * lim["max_novice_ratio"])))
+            nov = p.novice[cand]
+            cand = cand[~nov | (np.cumsum(nov) <= cap)]
+            chosen = cand[: p.need[k]]
+
+            assign[chosen, d] = code
+            free[chosen] = False
+            shortfall[d, k] = p.need[k] - len(chosen)
+
+        today = assign[:, d]
+        work = today != 0
+        is_n = p.is_night[today]
+        cw = np.where(work, cw + 1, 0)
+        cn = np.where(is_n, cn + 1, 0)
+        work_total += work
+        night_total += is_n
+        shift_total[np.arange(n), today] += 1
+        if history.shape[1]:
+            history = np.c_[history[:, 1:], p.symbol[today]]
+        last = today
+
+    return assign, shortfall
+
+
+def _to_frame(p: _Problem, assign: np.ndarray) -> pd.DataFrame:
+    codes = np.array(p.codes, dtype=object)
+    out = pd.DataFrame(
+        {
+            "date": np.tile(np.array(p.dates, dtype=object), p.n),
+            "nurse_id": np.repeat(p.nurses["nurse_id"].to_numpy(), p.n_days),
+            "nurse_name": np.repeat(p.nurses["nurse_name"].to_numpy(), p.n_days),
+            "shift_code": codes[assign.ravel()],
+            "is_novice": np.repeat(p.novice, p.n_days),
+        }
+    )
+    if "ward" in p.nurses.columns:
+        out["ward"] = np.repeat(p.nurses["ward"].to_numpy(), p.n_days)
+    return out
+
+
+def generate_schedule(
+    nurses: pd.DataFrame,
+    start_date,
+    n_days: int = 31,
+    baselines: Optional[Dict[str, int]] = None,
+    limits: Optional[dict] = None,
+    requests: Optional[pd.DataFrame] = None,
+    time_limit: float = 5.0,
+    max_restarts: int = 200,
+    fairness_weight: float = 5.0,
+    noise: float = 2.0,
+    seed: int = 0,
+    codebook: Optional[Codebook] = None,
+    progress: Optional[Callable[[float, str], None]] = None,
+) -> Tuple[pd.DataFrame, dict]:
+    """
+    다음 달 근무표 초안 생성.
+
+    nurses: nurse_id, nurse_name, (is_novice, ward)
+    baselines: {근무코드: 기준 인원} (기본: 코드북 D/E/N 기준 인원)
+    limits: limits_from_codebook() 형식 (일부 키만 바꿔서 넘겨도 됨)
+    requests: nurse_id, date, shift_code, (priority) — 원하는 근무/OFF
+
+    제약은 배치 시 바로 거르고(연속 근무·야간, 총 야간·휴무, 금지 패턴, 신규 비율),
+    요청·공정성·연속성은 점수로 반영한다. time_limit 안에서 무작위 재시작을 반복해
+    (부족 인원 × SHORTFALL_PENALTY + 위험점수 + fairness_weight × 공정성)이 가장 낮은 안을 고른다.
+    progress(진행률 0~1, 메시지)로 진행 상황을 알린다.
+
+    반환값: (add_base_features에 바로 넣을 수 있는 근무표, 리포트 dict)
+    """
+    cb = codebook or get_codebook()
+    start = pd.Timestamp(start_date).date()
+    lim = limits_from_codebook(cb, n_days)
+    lim.update(limits or {})
+    baselines = baselines or baselines_from_codebook(codebook=cb)
+
+    missing = [c for c in ("nurse_id", "nurse_name") if c not in nurses.columns]
+    if missing:
+        raise ValueError(f"간호사 목록에 필수 컬럼이 없습니다: {missing}")
+    nurses = nurses.drop_duplicates("nurse_id")
+    if nurses.empty:
+        raise ValueError("간호사 목록이 비어 있습니다.")
+
+    p = _Problem(nurses, start, n_days, baselines, lim, requests, cb)
+    rng = np.random.default_rng(seed)
+    started = time.perf_counter()
+
+    best = None
+    restarts = 0
+    while restarts < max_restarts:
+        # 첫 시도는 무작위성 없이, 이후는 점수에 잡음을 섞어 다른 해를 탐색
+        assign, shortfall = _construct(p, rng, noise if restarts else 0.0)
+        state = RosterState(_to_frame(p, assign), cb)
+        risk = state.total_risk()
+        objective = SHORTFALL_PENALTY * shortfall.sum() + risk + fairness_weight * state.fairness()
+        if best is None or objective < best[0]:
+            best = (objective, assign, shortfall, risk)
+        restarts += 1
+
+        elapsed = time.perf_counter() - started
+        if progress is not None:
+            frac = min(1.0, max(elapsed / time_limit if time_limit else 0.0, restarts / max_restarts))
+            progress(frac, f"{restarts}회 시도 · 최저 위험점수 {best[3]} · 부족 인원 {int(best[2].sum())}명")
+        if time_limit is not None and elapsed >= time_limit:
+            break
+
+    objective, assign, shortfall, risk = best
+    roster = _to_frame(p, assign)
+
+    short = pd.DataFrame(
+        {
+            "date": np.repeat(np.array(p.dates, dtype=object), len(p.shifts)),
+            "shift_code": np.tile(p.shifts, p.n_days),
+            "need": np.tile(p.need, p.n_days),
+            "shortfall": shortfall.ravel(),
+        }
+    )
+    requested = p.req_code >= 0
+    r_n, r_d = np.nonzero(requested & (p.req_code != assign))
+    unmet = pd.DataFrame(
+        {
+            "nurse_name": p.nurses["nurse_name"].to_numpy()[r_n],
+            "date": np.array(p.dates, dtype=object)[r_d],
+            "requested": np.array(p.codes, dtype=object)[p.req_code[r_n, r_d]],
+            "assigned": np.array(p.codes, dtype=object)[assign[r_n, r_d]],
+        }
+    )
+    report = {
+        "restarts": restarts,
+        "elapsed_sec": round(time.perf_counter() - started, 3),
+        "objective": float(objective),
+        "total_risk": int(risk),
+        "shortfall": short[short["shortfall"] > 0].reset_index(drop=True),
+        "requests_total": int(requested.sum()),
+        "unmet_requests": unmet,
+        "limits": {k: v for k, v in lim.items() if k != "forbidden_patterns"},
+    }
+    return roster, report
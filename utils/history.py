@@ -0,0 +1,267 @@
+# utils/history.py
+import io
+import json
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.codebook import Codebook, get_codebook
+from utils.features import REQUIRED_COLS, WORKLOAD_WINDOWS, _compute_staffing_features, add_base_features, prepare_schedule
+from utils.fatigue import WARMUP_DAYS
+from utils.risk import add_risk_scores
+
+# 다음 기간 첫 행들의 경계 피처를 다시 계산하는 데 필요한 과거 일수
+# (최근 N일 업무량 창이 가장 길다. 패턴/피로 워밍업은 이보다 짧다)
+CONTEXT_DAYS = max(max(w for w, _ in WORKLOAD_WINDOWS.values()), WARMUP_DAYS)
+
+# 상태 파일 형식 버전 (필드가 바뀌면 올린다)
+STATE_VERSION = 1
+
+# 간호사별 누적 상태 컬럼
+NURSE_COLUMNS = [
+    "nurse_id", "nurse_name", "ward",
+    "last_date", "last_shift_code", "last_shift_end",
+    "open_work_streak", "open_night_streak", "trailing_tokens",
+    "periods", "days", "work_days", "night_days", "off_days", "weekend_work_days",
+    "quick_returns", "risk_total",
+]
+
+# 누적 카운터 (기간마다 더한다)
+COUNTERS = ["days", "work_days", "night_days", "off_days", "weekend_work_days", "quick_returns", "risk_total"]
+
+# 꼬리(tail)에 보관하는 원본 컬럼 + 그 행의 실제 연속 일수
+_TAIL_EXTRA = ["is_novice", "ward"]
+_TRUE_STREAKS = {"consecutive_working_days": "_true_cw", "consecutive_night_shifts": "_true_cn"}
+
+# trailing_tokens 길이 (가장 긴 quick return 패턴 길이면 충분)
+TRAILING_TOKENS = 3
+
+
+def _day_numbers(dates) -> np.ndarray:
+    return pd.to_datetime(dates).values.astype("datetime64[D]").astype(np.int64)
+
+
+class RosterHistory:
+    """
+    월별 근무표를 이어 붙이며 분석하기 위한 간호사별 기간 말 상태.
+
+    - tail: 간호사별 마지막 CONTEXT_DAYS일의 근무 행 (원본 컬럼 + 실제 연속 근무/야간 일수)
+    - nurses: 간호사별 마지막 근무, 열린 연속 근무/야간 길이, 마지막 근무 종료 시각, 누적 카운터
+
+    append(새 기간 원본)는 새 행 앞에 tail만 붙여 피처를 계산하므로
+    월 경계를 넘는 연속 야간, quick return, 최근 N일 업무량이 끊기지 않고,
+    계산량은 (새 행 + tail) 크기에만 비례한다. 과거 전체 근무표는 다시 읽지 않는다.
+    """
+
+    def __init__(self, codebook: Optional[Codebook] = None):
+        self.cb = codebook or get_codebook()
+        self.tail = pd.DataFrame(columns=REQUIRED_COLS)
+        self.nurses = pd.DataFrame(columns=NURSE_COLUMNS).set_index("nurse_id")
+        self.periods = 0
+
+    def __len__(self) -> int:
+        return len(self.nurses)
+
+    @property
+    def last_date(self):
+        """기록된 마지막 날짜 (비어 있으면 None)."""
+        return None if self.nurses.empty else max(self.nurses["last_date"])
+
+    # =========================================================
+    # 1. 새 기간 추가
+    # =========================================================
+    def append(self, raw: pd.DataFrame) -> pd.DataFrame:
+        """
+        새 기간 원본 근무표 → 경계 피처가 보정된 새 행의 피처/위험도 (add_risk_scores 결과와 같은 컬럼).
+        상태(tail, 누적 카운터)도 함께 갱신한다.
+        간호사별 마지막 기록 날짜 이전(같은 날 포함)의 행이 있으면 ValueError (덧붙이기 전용).
+        """
+        cb = self.cb
+        new = prepare_schedule(raw, cb)
+        if new.empty:
+            return add_risk_scores(add_base_features(new, cb), cb)
+
+        new = new.assign(_new=True)
+        if not self.nurses.empty:
+            last = new["nurse_id"].map(self.nurses["last_date"])
+            stale = last.notna() & (new["date"] <= last)
+            if stale.any():
+                bad = new.loc[stale, "nurse_id"].unique()[:5].tolist()
+                raise ValueError(
+                    f"이미 기록된 기간과 겹치는 행이 있습니다 ({int(stale.sum())}행, 간호사 {bad}). "
+                    "누적 상태에는 마지막 기록 날짜 이후의 근무만 추가할 수 있습니다."
+                )
+
+        context = self.tail[self.tail["nurse_id"].isin(new["nurse_id"].unique())]
+        combined = pd.concat([context.assign(_new=False), new], ignore_index=True)
+        rows = add_base_features(combined.drop(columns=list(_TRUE_STREAKS.values()), errors="ignore"), cb)
+        rows = self._carry_streaks(rows, combined)
+
+        # 인원 집계는 새 기간 행끼리만 (다른 간호사의 tail 날짜가 섞이지 않도록)
+        fresh = rows[rows["_new"].to_numpy(dtype=bool)].drop(columns=["_new"])
+        fresh = add_risk_scores(_compute_staffing_features(fresh, cb), cb)
+
+        self._update(fresh)
+        self.periods += 1
+        return fresh
+
+    def _carry_streaks(self, rows: pd.DataFrame, combined: pd.DataFrame) -> pd.DataFrame:
+        """
+        tail 첫 행에서 시작하는 연속 구간은 그 이전(tail 밖)부터 이어졌을 수 있으므로
+        tail 첫 행의 실제 연속 일수와 다시 계산한 값의 차이를 같은 구간 행들에 더한다.
+        """
+        if "_true_cw" not in combined.columns or not (~combined["_new"]).any():
+            return rows
+
+        true = combined.loc[~combined["_new"], ["nurse_id", "date", *_TRUE_STREAKS.values()]]
+        first = true.sort_values("date", kind="stable").drop_duplicates("nurse_id").set_index("nurse_id")
+
+        rows = rows.copy()
+        nurse = rows["nurse_id"]
+        known = nurse.isin(first.index).to_numpy()
+        since = np.zeros(len(rows), dtype=np.int64)
+        since[known] = _day_numbers(rows.loc[known, "date"]) - _day_numbers(nurse[known].map(first["date"]))
+
+        for col, true_col in _TRUE_STREAKS.items():
+            computed = rows[col].to_numpy()
+            start_true = nurse.map(first[true_col]).fillna(0).to_numpy(dtype=np.int64)
+            # tail 첫 날부터 끊기지 않고 이어진 행 = 다시 계산한 연속 일수가 (첫 날부터 일수 + 1)
+            in_first_run = known & (computed > 0) & (computed == since + 1)
+            offset = np.maximum(start_true - 1, 0)
+            rows[col] = np.where(in_first_run, computed + offset, computed).astype(int)
+        return rows
+
+    def _update(self, fresh: pd.DataFrame) -> None:
+        """새 행으로 tail과 간호사별 누적 상태를 갱신한다."""
+        cb = self.cb
+        rows = fresh.sort_values(["nurse_id", "date"], kind="stable")
+
+        # tail: 기존 tail + 새 행에서 간호사별 마지막 CONTEXT_DAYS일
+        keep = [c for c in REQUIRED_COLS + _TAIL_EXTRA if c in rows.columns]
+        recent = rows[keep].assign(**{t: rows[c].to_numpy() for c, t in _TRUE_STREAKS.items()})
+        tail = pd.concat([self.tail, recent], ignore_index=True)
+        cutoff = _day_numbers(tail["nurse_id"].map(tail.groupby("nurse_id")["date"].max())) - CONTEXT_DAYS
+        self.tail = tail[_day_numbers(tail["date"]) > cutoff].reset_index(drop=True)
+
+        stype = rows["shift_type"]
+        qr_groups = [g for g in cb.quick_returns if g in rows.columns]
+        qr = rows[qr_groups].fillna(False).astype(bool).any(axis=1) if qr_groups else pd.Series(False, index=rows.index)
+        g = rows.groupby("nurse_id", sort=False)
+        counts = pd.DataFrame(
+            {
+                "days": g.size(),
+                "work_days": (stype != "OFF").groupby(rows["nurse_id"], sort=False).sum(),
+                "night_days": (stype == "NIGHT").groupby(rows["nurse_id"], sort=False).sum(),
+                "off_days": (stype == "OFF").groupby(rows["nurse_id"], sort=False).sum(),
+                "weekend_work_days": (rows["weekend_flag"] & (stype != "OFF")).groupby(rows["nurse_id"], sort=False).sum(),
+                "quick_returns": qr.groupby(rows["nurse_id"], sort=False).sum(),
+                "risk_total": g["overall_risk_score"].sum(),
+            }
+        )
+
+        last = g.tail(1).set_index("nurse_id")
+        _, end_h = cb.shift_hours(last["shift_code"])
+        end = pd.to_datetime(last["date"]) + pd.to_timedelta(end_h, unit="h")
+        tokens = g["token"].agg(lambda t: "".join(map(str, t.iloc[-TRAILING_TOKENS:])))
+
+        state = pd.DataFrame(
+            {
+                "nurse_name": last["nurse_name"],
+                "ward": last["ward"] if "ward" in last.columns else None,
+                "last_date": last["date"],
+                "last_shift_code": last["shift_code"],
+                "last_shift_end": end.dt.strftime("%Y-%m-%d %H:%M").where(end.notna(), None),
+                "open_work_streak": last["consecutive_working_days"].astype(int),
+                "open_night_streak": last["consecutive_night_shifts"].astype(int),
+                "trailing_tokens": tokens,
+            }
+        )
+
+        prev = self.nurses.reindex(state.index)
+        for col in COUNTERS:
+            state[col] = prev[col].fillna(0).to_numpy() + counts[col].reindex(state.index).to_numpy()
+        state["periods"] = prev["periods"].fillna(0).to_numpy().astype(int) + 1
+
+        untouched = self.nurses[~self.nurses.index.isin(state.index)]
+        self.nurses = pd.concat([untouched, state[NURSE_COLUMNS[1:]]]).rename_axis("nurse_id")
+
+    # =========================================================
+    # 2. 누적 지표
+    # =========================================================
+    def cumulative_fairness(self) -> pd.DataFrame:
+        """
+        누적 카운터 → 공정성 테이블(utils.fairness)과 같은 이름의 부담 컬럼.
+        utils.fairness_stats.fairness_inequality에 그대로 넣을 수 있다.
+        """
+        n = self.nurses
+        if n.empty:
+            return pd.DataFrame(columns=["ward", "nurse_name", "periods", "total_work_days",
+                                         "total_night_days", "total_weekend_days", "total_off_days"])
+        work = n["work_days"].astype(int)
+        out = pd.DataFrame(
+            {
+                "ward": n["ward"].to_numpy(),
+                "nurse_name": n["nurse_name"].to_numpy(),
+                "periods": n["periods"].astype(int).to_numpy(),
+                "total_work_days": work.to_numpy(),
+                "total_night_days": n["night_days"].astype(int).to_numpy(),
+                "total_weekend_days": n["weekend_work_days"].astype(int).to_numpy(),
+                "total_off_days": n["off_days"].astype(int).to_numpy(),
+                "weekend_ratio": (n["weekend_work_days"] / work.clip(lower=1)).round(3).to_numpy(),
+                "mean_risk": (n["risk_total"] / n["days"].clip(lower=1)).round(3).to_numpy(),
+            }
+        )
+        if out["ward"].isna().all():
+            out = out.drop(columns=["ward"])
+        return out
+
+    # =========================================================
+    # 3. 상태 파일 (JSON)
+    #    사용자가 올리는 파일이므로 pickle 대신 JSON으로만 읽고 쓴다.
+    # =========================================================
+    def to_bytes(self) -> bytes:
+        tail = self.tail.assign(date=self.tail["date"].astype(str))
+        nurses = self.nurses.reset_index()
+        nurses["last_date"] = nurses["last_date"].astype(str)
+        payload = {
+            "version": STATE_VERSION,
+            "periods": self.periods,
+            "tail": json.loads(tail.to_json(orient="split", index=False, force_ascii=False)),
+            "nurses": json.loads(nurses.to_json(orient="split", index=False, force_ascii=False)),
+        }
+        return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+    @classmethod
+    def from_bytes(cls, data: bytes, codebook: Optional[Codebook] = None) -> "RosterHistory":
+        try:
+            payload = json.loads(data.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ValueError(f"누적 상태 파일을 읽을 수 없습니다: {e}") from e
+        if not isinstance(payload, dict) or payload.get("version") != STATE_VERSION:
+            raise ValueError("지원하지 않는 누적 상태 파일 형식입니다.")
+
+        def frame(part: Any, required: list) -> pd.DataFrame:
+            # 빈 상태도 to_bytes가 컬럼 목록은 남기므로, 필수 컬럼이 없으면 형식 오류로 본다
+            try:
+                df = pd.read_json(io.StringIO(json.dumps(part)), orient="split", dtype=False, convert_dates=False)
+            except (TypeError, ValueError) as e:
+                raise ValueError("지원하지 않는 누적 상태 파일 형식입니다.") from e
+            if any(c not in df.columns for c in required):
+                raise ValueError("지원하지 않는 누적 상태 파일 형식입니다.")
+            return df
+
+        if not isinstance(payload.get("tail"), dict) or not isinstance(payload.get("nurses"), dict):
+            raise ValueError("지원하지 않는 누적 상태 파일 형식입니다.")
+
+        history = cls(codebook)
+        history.periods = int(payload.get("periods", 0))
+        tail = frame(payload["tail"], REQUIRED_COLS)
+        if not tail.empty:
+            tail["date"] = pd.to_datetime(tail["date"]).dt.date
+            history.tail = tail
+        nurses = frame(payload["nurses"], NURSE_COLUMNS)
+        if not nurses.empty:
+            nurses["last_date"] = pd.to_datetime(nurses["last_date"]).dt.date
+            history.nurses = nurses.set_index("nurse_id")
+        return history
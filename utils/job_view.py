@@ -0,0 +1,78 @@
+# utils/job_view.py
+from typing import Callable
+
+import streamlit as st
+
+from utils.artifacts import artifact_ready, artifact_version, provide_artifact
+from utils.jobs import CANCELLED, DONE, FAILED, FINISHED, get_jobs
+
+# 이 행 수 이상인 근무표만 백그라운드 작업으로 분석 (작으면 프로세스 왕복 비용이 더 크다)
+BACKGROUND_MIN_ROWS = 20_000
+
+# 진행률 갱신 주기 (초)
+POLL_SEC = 0.5
+
+# session_state: 산출물 이름 → {"job_id", "version", "cancelled"}
+STATE_KEY = "_background_jobs"
+SUBSCRIBER_KEY = "_job_subscriber"
+
+
+def _subscriber() -> int:
+    """이 세션의 작업 subscriber id (같은 작업을 기다리는 다른 세션의 취소와 구분)."""
+    if SUBSCRIBER_KEY not in st.session_state:
+        st.session_state[SUBSCRIBER_KEY] = get_jobs().new_subscriber()
+    return st.session_state[SUBSCRIBER_KEY]
+
+
+@st.fragment(run_every=POLL_SEC)
+def _progress(name: str, job_id: int, label: str) -> None:
+    # 이 fragment만 주기적으로 다시 실행되고, 작업이 끝나면 페이지 전체를 다시 그린다
+    snap = get_jobs().poll(job_id)
+    if snap["status"] in FINISHED:
+        st.rerun()
+    text = f"{label}: {snap['message'] or snap['status']} ({snap['elapsed_sec']}초)"
+    st.progress(snap["progress"], text=text)
+    if st.button("취소", key=f"job_cancel_{job_id}"):
+        # 다른 세션도 이 작업을 기다리고 있으면 이 세션만 빠지고 작업은 계속 돈다
+        get_jobs().cancel(job_id, subscriber=_subscriber())
+        st.session_state[STATE_KEY][name]["cancelled"] = True
+        st.rerun()
+
+
+def background_artifact(name: str, fn: Callable, *args, label: str) -> bool:
+    """
+    산출물 name을 백그라운드 작업 fn(*args)로 준비한다.
+    준비되어 있으면 True, 아직이면 진행률/취소 버튼을 보여 주고 False.
+
+    fn(*args)는 등록 함수가 같은 입력으로 돌려줄 값과 같은 값을 돌려줘야 한다.
+    같은 입력의 작업이 다른 세션에서 이미 돌고 있으면 그 작업 결과를 같이 받는다.
+    """
+    if artifact_ready(name):
+        return True
+
+    pending = st.session_state.setdefault(STATE_KEY, {})
+    version = artifact_version(name)
+    entry = pending.get(name)
+    if entry is None or entry["version"] != version:
+        job_id = get_jobs().submit(fn, *args, name=label, subscriber=_subscriber())
+        entry = pending[name] = {"job_id": job_id, "version": version, "cancelled": False}
+    job_id = entry["job_id"]
+
+    snap = {"status": CANCELLED} if entry["cancelled"] else get_jobs().poll(job_id)
+    if snap["status"] == DONE:
+        provide_artifact(name, get_jobs().result(job_id))
+        pending.pop(name, None)
+        return True
+    if snap["status"] == FAILED:
+        pending.pop(name, None)
+        st.error(f"{label} 중 오류가 발생했습니다: {snap['error']}")
+        return False
+    if snap["status"] == CANCELLED:
+        st.warning(f"{label}이(가) 취소되었습니다.")
+        if st.button("다시 실행", key=f"job_retry_{name}"):
+            pending.pop(name, None)
+            st.rerun()
+        return False
+
+    _progress(name, job_id, label)
+    return False
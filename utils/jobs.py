@@ -0,0 +1,308 @@
+# utils/jobs.py
+import itertools
+import os
+import queue
+import threading
+import time
+from concurrent.futures import CancelledError
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from utils.shared_store import fingerprint
+
+# 작업 프로세스 수 상한 (CPU 수와 이 값 중 작은 값)
+MAX_WORKERS = int(os.getenv("JOB_MAX_WORKERS", "4"))
+
+# 동시에 협조적 취소를 지원할 수 있는 작업 수 (공유 플래그 칸 수)
+CANCEL_SLOTS = 256
+
+# 끝난 작업은 이 개수까지만 보관 (오래된 것부터 정리)
+KEEP_FINISHED = 64
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """작업이 취소 요청을 받았을 때 작업 프로세스 안에서 발생 (report_progress 호출 시점)."""
+
+
+# =========================================================
+# 1. 작업 프로세스 쪽
+# =========================================================
+# 작업 프로세스 전역: 풀 initializer가 채운다
+_progress_queue = None
+_cancel_flags = None
+_current = (None, -1)  # (job_id, cancel slot)
+
+
+def _init_worker(progress_queue, cancel_flags) -> None:
+    global _progress_queue, _cancel_flags
+    _progress_queue = progress_queue
+    _cancel_flags = cancel_flags
+
+
+def report_progress(frac: float, msg: str = "") -> None:
+    """
+    작업 함수 안에서 진행률(0~1)을 알린다. 작업 밖(직접 호출)에서는 아무 일도 하지 않는다.
+    취소 요청이 들어와 있으면 JobCancelled를 일으킨다.
+    """
+    job_id, slot = _current
+    if job_id is None:
+        return
+    if slot >= 0 and _cancel_flags is not None and _cancel_flags[slot]:
+        raise JobCancelled(job_id)
+    if _progress_queue is not None:
+        _progress_queue.put((job_id, float(frac), msg))
+
+
+def _run_job(job_id: int, slot: int, fn: Callable, args: tuple, kwargs: dict) -> Any:
+    global _current
+    _current = (job_id, slot)
+    try:
+        report_progress(0.0, "시작")
+        return fn(*args, **kwargs)
+    finally:
+        _current = (None, -1)
+
+
+# =========================================================
+# 2. 작업 정의 (작업 프로세스에서 실행되는 무거운 분석)
+# =========================================================
+def score_roster(raw: pd.DataFrame) -> pd.DataFrame:
+    """업로드 근무표 → risk_scores 산출물 (피처 → 위험도)."""
+    from utils.features import add_base_features
+    from utils.risk import add_risk_scores
+
+    report_progress(0.1, "기본 피처 계산 중")
+    base = add_base_features(raw)
+    report_progress(0.6, "위험도 계산 중")
+    return add_risk_scores(base)
+
+
+# =========================================================
+# 3. 작업 관리 (Streamlit 서버 프로세스 쪽)
+# =========================================================
+class Job:
+    __slots__ = (
+        "id", "key", "name", "status", "progress", "message",
+        "submitted_at", "started_at", "finished_at", "error", "future", "slot",
+        "subscribers", "cancel_requested",
+    )
+
+    def __init__(self, job_id: int, key: str, name: str, slot: int):
+        self.id = job_id
+        self.key = key
+        self.name = name
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = ""
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self.future = None
+        self.slot = slot
+        self.subscribers: set = set()
+        self.cancel_requested = False
+
+    @property
+    def done(self) -> bool:
+        return self.status in FINISHED
+
+    def snapshot(self) -> dict:
+        end = self.finished_at or time.time()
+        return {
+            "job_id": self.id,
+            "name": self.name,
+            "status": self.status,
+            "progress": round(self.progress, 3),
+            "message": self.message,
+            "elapsed_sec": round(end - self.submitted_at, 2),
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """
+    제한된 프로세스 풀 위의 작업 큐.
+
+    submit()은 바로 job_id를 돌려주고, 페이지는 poll()로 상태/진행률을 확인한 뒤
+    끝나면 result()로 결과를 받는다. 같은 함수 + 같은 입력(내용 해시)으로 진행 중이거나
+    끝난 작업이 있으면 새로 돌리지 않고 그 job_id를 돌려준다.
+
+    한 작업을 여러 세션이 같이 기다릴 수 있으므로 세션은 subscriber(new_subscriber())를 붙여
+    제출하고, cancel도 자기 subscriber로 한다. 작업은 마지막 subscriber가 취소할 때만 멈춘다.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or max(1, min(os.cpu_count() or 1, MAX_WORKERS))
+        self._lock = threading.RLock()
+        self._ids = itertools.count(1)
+        self._jobs: Dict[int, Job] = {}
+        self._by_key: Dict[str, int] = {}
+        self._free_slots = list(range(CANCEL_SLOTS))
+        self._subscriber_ids = itertools.count(1)
+        self._pool = None
+        self._queue = None
+        self._flags = None
+
+    # -------------------------------
+    # 풀
+    # -------------------------------
+    def pool(self):
+        """
+        spawn 방식 프로세스 풀 (프로세스당 한 번 생성해 재사용, 비정상 종료 시 새로 만든다).
+        작업 프로세스는 streamlit을 import하지 않는 utils 모듈만 읽는다.
+        """
+        import multiprocessing as mp
+        from concurrent.futures import ProcessPoolExecutor
+
+        with self._lock:
+            broken = self._pool is not None and getattr(self._pool, "_broken", False)
+            if self._pool is None or broken:
+                if self._pool is not None:
+                    self._pool.shutdown(wait=False, cancel_futures=True)
+                ctx = mp.get_context("spawn")
+                self._queue = ctx.Queue()
+                self._flags = ctx.Array("b", CANCEL_SLOTS, lock=False)
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=ctx,
+                    initializer=_init_worker,
+                    initargs=(self._queue, self._flags),
+                )
+            return self._pool
+
+    # -------------------------------
+    # 제출 / 조회
+    # -------------------------------
+    def new_subscriber(self) -> int:
+        return next(self._subscriber_ids)
+
+    def submit(
+        self, fn: Callable, *args, name: Optional[str] = None, subscriber: Optional[int] = None, **kwargs
+    ) -> int:
+        key = fingerprint((fn.__module__, fn.__qualname__, [fingerprint(a) for a in args], sorted(
+            (k, fingerprint(v)) for k, v in kwargs.items()
+        )))
+        with self._lock:
+            existing = self._jobs.get(self._by_key.get(key, -1))
+            # 취소 플래그가 선 작업은 곧 멈추므로 같이 기다리지 않고 새로 돌린다
+            if existing is not None and existing.status not in (FAILED, CANCELLED) and not existing.cancel_requested:
+                if subscriber is not None:
+                    existing.subscribers.add(subscriber)
+                return existing.id
+
+            pool = self.pool()
+            slot = self._free_slots.pop() if self._free_slots else -1
+            if slot >= 0:
+                self._flags[slot] = 0
+            job = Job(next(self._ids), key, name or fn.__name__, slot)
+            if subscriber is not None:
+                job.subscribers.add(subscriber)
+            job.future = pool.submit(_run_job, job.id, slot, fn, args, kwargs)
+            job.future.add_done_callback(lambda _f, j=job: self._finish(j))
+            self._jobs[job.id] = job
+            self._by_key[key] = job.id
+            self._prune()
+            return job.id
+
+    def _finish(self, job: Job) -> None:
+        with self._lock:
+            if job.done:
+                return
+            self._drain()
+            job.finished_at = time.time()
+            fut = job.future
+            try:
+                fut.result()
+                job.status, job.progress, job.message = DONE, 1.0, "완료"
+            except (CancelledError, JobCancelled):
+                job.status = CANCELLED
+            except Exception as e:
+                job.status, job.error = FAILED, f"{type(e).__name__}: {e}"
+            if job.slot >= 0:
+                self._free_slots.append(job.slot)
+
+    def _drain(self) -> None:
+        """작업 프로세스가 보낸 진행률을 반영한다 (poll할 때마다 호출)."""
+        if self._queue is None:
+            return
+        while True:
+            try:
+                job_id, frac, msg = self._queue.get_nowait()
+            except (queue.Empty, OSError, ValueError):
+                return
+            job = self._jobs.get(job_id)
+            if job is not None and not job.done:
+                job.status = RUNNING
+                job.started_at = job.started_at or time.time()
+                job.progress = max(job.progress, frac)
+                job.message = msg or job.message
+
+    def poll(self, job_id: int) -> dict:
+        """작업 상태/진행률 snapshot. 없는 job_id면 KeyError."""
+        with self._lock:
+            self._drain()
+            job = self._jobs[job_id]
+            if job.future is not None and job.future.done() and not job.done:
+                self._finish(job)
+            return job.snapshot()
+
+    def result(self, job_id: int) -> Any:
+        """끝난 작업의 결과. 실패했으면 예외를 그대로 다시 일으킨다."""
+        with self._lock:
+            job = self._jobs[job_id]
+        return job.future.result()
+
+    def cancel(self, job_id: int, subscriber: Optional[int] = None) -> bool:
+        """
+        subscriber를 작업에서 뗀다. 그 작업을 기다리는 다른 subscriber가 남아 있으면 작업은 계속 돈다.
+        남은 subscriber가 없으면(subscriber=None이면 바로) 작업을 취소한다:
+        대기 중이면 바로 취소하고, 실행 중이면 취소 플래그를 세운다
+        (작업 함수가 다음에 report_progress를 부를 때 멈춘다).
+        반환: 요청을 처리했으면 True, 없거나 이미 끝난 작업이면 False
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.done:
+                return False
+            if subscriber is not None:
+                job.subscribers.discard(subscriber)
+                if job.subscribers:
+                    return True
+            job.cancel_requested = True
+            if job.future.cancel():
+                self._finish(job)
+                return True
+            if job.slot >= 0:
+                self._flags[job.slot] = 1
+            job.message = "취소 요청됨"
+            return True
+
+    def jobs(self) -> List[dict]:
+        with self._lock:
+            self._drain()
+            return [j.snapshot() for j in self._jobs.values()]
+
+    def _prune(self) -> None:
+        finished = [j for j in self._jobs.values() if j.done]
+        for job in sorted(finished, key=lambda j: j.finished_at)[: max(0, len(finished) - KEEP_FINISHED)]:
+            self._jobs.pop(job.id, None)
+            if self._by_key.get(job.key) == job.id:
+                self._by_key.pop(job.key, None)
+
+
+_MANAGER: Optional[JobManager] = None
+_MANAGER_LOCK = threading.Lock()
+
+
+def get_jobs() -> JobManager:
+    """프로세스 전체에서 하나인 작업 관리자 (모든 Streamlit 세션이 같은 풀을 쓴다)."""
+    global _MANAGER
+    with _MANAGER_LOCK:
+        if _MANAGER is None:
+            _MANAGER = JobManager()
+        return _MANAGER
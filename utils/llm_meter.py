@@ -0,0 +1,261 @@
+# utils/llm_meter.py
+import json
+import math
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from utils.analysis_log import fetch_logs, log_analysis
+
+# 분석 로그 meta["kind"] 값 (LLM 호출 기록 구분)
+LOG_KIND = "llm_call"
+
+# 재시도: 연결 오류와 아래 상태 코드 (모델 로딩 중 503, 요청 한도 429 등)
+MAX_RETRIES = 2
+RETRY_STATUS = {429, 500, 502, 503, 504}
+BACKOFF_SEC = 1.0
+
+# 연결(TCP+TLS) timeout, 재시도·대기를 모두 합친 호출 전체 상한 (초)
+CONNECT_TIMEOUT_SEC = 10
+DEADLINE_SEC = 90
+
+# 로컬 토큰 추정 (응답에 usage가 없고 tiktoken도 없을 때)
+ASCII_CHARS_PER_TOKEN = 4.0
+NON_ASCII_TOKENS_PER_CHAR = 1.0   # 한글은 음절 하나가 대략 토큰 하나
+
+CALL_COLUMNS = [
+    "timestamp", "source", "model", "status", "retries",
+    "connect_ms", "first_byte_ms", "total_ms", "wall_ms",
+    "prompt_tokens", "completion_tokens", "token_source", "error",
+]
+
+
+# =========================================================
+# 1. HTTP 호출 (단계별 지연 측정)
+# =========================================================
+_conn_timing = threading.local()
+_timed_classes: Dict[type, type] = {}
+
+
+def _timed_connection_class(base: type) -> type:
+    """connect()에 걸린 시간을 스레드 로컬에 남기는 urllib3 연결 클래스 (기반 클래스마다 한 번 만든다)."""
+    if base in _timed_classes.values():
+        return base
+    if base not in _timed_classes:
+        def connect(self):
+            t0 = time.perf_counter()
+            try:
+                return base.connect(self)
+            finally:
+                _conn_timing.connect_sec = getattr(_conn_timing, "connect_sec", 0.0) + time.perf_counter() - t0
+
+        _timed_classes[base] = type(f"Timed{base.__name__}", (base,), {"connect": connect})
+    return _timed_classes[base]
+
+
+def _timed_session():
+    """
+    연결 시간을 잴 수 있는 requests 세션.
+    프록시(HTTP(S)_PROXY), 리다이렉트, CA 번들(certifi/REQUESTS_CA_BUNDLE) 처리는 requests 그대로다.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    class _TimedAdapter(HTTPAdapter):
+        def get_connection_with_tls_context(self, *args, **kwargs):
+            pool = super().get_connection_with_tls_context(*args, **kwargs)
+            pool.ConnectionCls = _timed_connection_class(pool.ConnectionCls)
+            return pool
+
+        def get_connection(self, *args, **kwargs):  # requests < 2.32
+            pool = super().get_connection(*args, **kwargs)
+            pool.ConnectionCls = _timed_connection_class(pool.ConnectionCls)
+            return pool
+
+    session = requests.Session()
+    session.mount("https://", _TimedAdapter())
+    session.mount("http://", _TimedAdapter())
+    return session
+
+
+def post_json(
+    url: str,
+    headers: Dict[str, str],
+    payload: Any,
+    timeout: float = 60,
+    max_retries: int = MAX_RETRIES,
+    deadline: float = DEADLINE_SEC,
+) -> Tuple[Optional[bytes], Dict[str, Any]]:
+    """
+    JSON POST 한 번 (필요하면 재시도) → (응답 본문 bytes 또는 None, 측정 기록).
+
+    timeout: 시도 한 번의 응답 대기 상한, deadline: 재시도·대기를 포함한 전체 상한 (초).
+    남은 시간이 없으면 더 재시도하지 않고, 본문을 읽다가 deadline을 넘으면 그 시도는 timeout 오류다.
+
+    기록: status, retries, connect_ms(TCP+TLS, 재사용 연결이면 0), first_byte_ms(요청 시작 → 응답 헤더),
+          total_ms(요청 시작 → 본문 끝), wall_ms(재시도·대기 포함 전체), error
+    지연 값은 마지막 시도 기준이다.
+    """
+    import requests
+
+    record: Dict[str, Any] = {"status": None, "retries": 0, "connect_ms": None, "first_byte_ms": None,
+                              "total_ms": None, "wall_ms": None, "error": ""}
+    started = time.perf_counter()
+    stop_at = started + deadline
+    data = None
+    with _timed_session() as session:
+        for attempt in range(max_retries + 1):
+            record["retries"] = attempt
+            remaining = stop_at - time.perf_counter()
+            _conn_timing.connect_sec = 0.0
+            t0 = time.perf_counter()
+            try:
+                with session.post(
+                    url,
+                    headers=headers,
+                    json=payload,
+                    stream=True,
+                    timeout=(min(CONNECT_TIMEOUT_SEC, remaining), min(timeout, remaining)),
+                ) as resp:
+                    t_head = time.perf_counter()
+                    chunks = []
+                    for chunk in resp.iter_content(chunk_size=65536):
+                        chunks.append(chunk)
+                        if time.perf_counter() > stop_at:
+                            raise requests.Timeout(f"응답 본문을 {deadline:g}초 안에 다 받지 못했습니다")
+                    data = b"".join(chunks)
+                    t_end = time.perf_counter()
+            except requests.RequestException as e:
+                record.update(status=None, error=f"{type(e).__name__}: {e}",
+                              connect_ms=None, first_byte_ms=None, total_ms=round((time.perf_counter() - t0) * 1000, 1))
+                data = None
+            else:
+                record.update(
+                    status=resp.status_code,
+                    error="" if resp.status_code < 400 else f"HTTP {resp.status_code}",
+                    connect_ms=round(_conn_timing.connect_sec * 1000, 1),
+                    first_byte_ms=round((t_head - t0) * 1000, 1),
+                    total_ms=round((t_end - t0) * 1000, 1),
+                )
+                if resp.status_code not in RETRY_STATUS:
+                    break
+
+            wait = BACKOFF_SEC * 2 ** attempt
+            # 대기 후에도 연결할 시간이 남아 있을 때만 재시도
+            if attempt >= max_retries or time.perf_counter() + wait + 1 > stop_at:
+                break
+            time.sleep(wait)
+
+    record["wall_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return data, record
+
+
+# =========================================================
+# 2. 토큰 수 (응답 usage → 없으면 로컬 추정)
+# =========================================================
+def estimate_tokens(text: str) -> int:
+    """tiktoken이 있으면 cl100k_base로 세고, 없으면 문자 수로 어림한다."""
+    if not text:
+        return 0
+    try:
+        import tiktoken
+    except ImportError:
+        ascii_chars = sum(1 for c in text if ord(c) < 128)
+        other = len(text) - ascii_chars
+        return int(math.ceil(ascii_chars / ASCII_CHARS_PER_TOKEN + other * NON_ASCII_TOKENS_PER_CHAR))
+    return len(tiktoken.get_encoding("cl100k_base").encode(text))
+
+
+def token_counts(prompt: str, completion: str, usage: Optional[dict] = None) -> Dict[str, Any]:
+    """{prompt_tokens, completion_tokens, token_source("usage" | "estimate")}"""
+    usage = usage or {}
+    if usage.get("prompt_tokens") is not None and usage.get("completion_tokens") is not None:
+        return {
+            "prompt_tokens": int(usage["prompt_tokens"]),
+            "completion_tokens": int(usage["completion_tokens"]),
+            "token_source": "usage",
+        }
+    return {
+        "prompt_tokens": estimate_tokens(prompt),
+        "completion_tokens": estimate_tokens(completion),
+        "token_source": "estimate",
+    }
+
+
+# =========================================================
+# 3. 분석 로그 기록 / 조회
+# =========================================================
+def record_call(query: str, response: str, source: str, model: str, record: Dict[str, Any], tokens: Dict[str, Any]) -> None:
+    """LLM 호출 1건을 분석 로그(utils.analysis_log)에 남긴다. 로그 저장 실패는 응답에 영향을 주지 않는다."""
+    meta = {"kind": LOG_KIND, "source": source, "model": model, **record, **tokens}
+    try:
+        log_analysis(query, response, meta)
+    except OSError:
+        pass
+
+
+def llm_calls(logs: Optional[List[Dict[str, str]]] = None, limit: int = 5000) -> pd.DataFrame:
+    """분석 로그 → LLM 호출 기록 표 (CALL_COLUMNS). meta가 LLM 호출이 아닌 행은 건너뛴다."""
+    logs = fetch_logs(limit=limit) if logs is None else logs
+    rows = []
+    for row in logs:
+        try:
+            meta = json.loads(row.get("meta") or "{}")
+        except (TypeError, json.JSONDecodeError):
+            continue
+        if isinstance(meta, dict) and meta.get("kind") == LOG_KIND:
+            rows.append({"timestamp": row.get("timestamp"), **meta})
+
+    df = pd.DataFrame(rows).reindex(columns=CALL_COLUMNS)
+    df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
+    for col in ["connect_ms", "first_byte_ms", "total_ms", "wall_ms", "prompt_tokens", "completion_tokens", "retries"]:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df
+
+
+def latency_summary(calls: pd.DataFrame) -> pd.DataFrame:
+    """
+    모델별 호출 수, 오류율, 지연 p50/p95(ms), 출력 토큰/초, 토큰 합계.
+    지연과 tokens_per_sec(출력 토큰 / 전체 응답 시간)는 성공한 호출(status 200)만 본다.
+    """
+    cols = ["model", "calls", "error_rate", "p50_total_ms", "p95_total_ms", "p50_first_byte_ms",
+            "p50_connect_ms", "tokens_per_sec", "prompt_tokens", "completion_tokens", "retries"]
+    if calls.empty:
+        return pd.DataFrame(columns=cols)
+
+    # 지연/처리량은 성공한 호출만 (연결 실패는 지연이 짧게 잡혀 분포를 왜곡한다)
+    ok = calls["status"].eq(200) & calls["total_ms"].gt(0)
+    timed = calls[["total_ms", "first_byte_ms", "connect_ms"]].where(ok, axis=0)
+    tps = (calls["completion_tokens"] / (calls["total_ms"] / 1000)).where(ok)
+    g = calls.assign(_tps=tps, _error=~ok, **{f"_{c}": timed[c] for c in timed.columns}).groupby("model", sort=True)
+    out = pd.DataFrame(
+        {
+            "calls": g.size(),
+            "error_rate": g["_error"].mean().round(3),
+            "p50_total_ms": g["_total_ms"].quantile(0.5).round(1),
+            "p95_total_ms": g["_total_ms"].quantile(0.95).round(1),
+            "p50_first_byte_ms": g["_first_byte_ms"].quantile(0.5).round(1),
+            "p50_connect_ms": g["_connect_ms"].quantile(0.5).round(1),
+            "tokens_per_sec": g["_tps"].median().round(1),
+            "prompt_tokens": g["prompt_tokens"].sum().astype(int),
+            "completion_tokens": g["completion_tokens"].sum().astype(int),
+            "retries": g["retries"].sum().astype(int),
+        }
+    )
+    return out.reset_index()[cols]
+
+
+def token_usage(calls: pd.DataFrame, freq: str = "D") -> pd.DataFrame:
+    """기간(freq) × 모델별 토큰 합계 (입력 + 출력). 행 = 기간 시작, 열 = 모델."""
+    if calls.empty:
+        return pd.DataFrame()
+    used = calls.dropna(subset=["timestamp"]).assign(
+        tokens=lambda d: d["prompt_tokens"].fillna(0) + d["completion_tokens"].fillna(0)
+    )
+    return (
+        used.groupby([pd.Grouper(key="timestamp", freq=freq), "model"])["tokens"]
+        .sum()
+        .unstack("model", fill_value=0)
+    )
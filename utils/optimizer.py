@@ -0,0 +1,489 @@
+# utils/optimizer.py
+import time
+from typing import Callable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.codebook import Codebook, get_codebook
+from utils.patterns import MISSING, encode_suffix, patterns_from_codebook, suffix_table
+
+# 공정성 변화량을 계산하는 간호사별 지표 (표준편차, 작을수록 공정)
+FAIRNESS_METRICS = ["night_days", "off_days", "weekend_work_days"]
+
+
+def _saturation(cb: Codebook, metric: str) -> int:
+    """구간표의 가장 큰 경계값. 이 값 이상에서는 등급이 더 바뀌지 않는다."""
+    bounds = [r[k] for r in cb.thresholds[metric] for k in ("min", "max") if r.get(k) is not None]
+    return int(np.ceil(max(bounds))) if bounds else 1
+
+
+def _std(total: np.ndarray, sq_total: np.ndarray, n: int) -> np.ndarray:
+    # pandas 기본값과 같은 표본 표준편차 (ddof=1)
+    if n < 2:
+        return np.zeros(np.shape(total))
+    var = (sq_total - total * total / n) / (n - 1)
+    return np.sqrt(np.maximum(var, 0.0))
+
+
+# =========================================================
+# 1. 탐색 상태 (간호사 × 날짜 근무코드 격자)
+# =========================================================
+class RosterState:
+    """
+    국소 탐색용 근무표 상태.
+
+    - grid: 간호사 × 날짜 근무코드 id (앞뒤로 MISSING 여백을 둬서 경계 검사 없이 slice)
+    - staff: 날짜 × 근무코드 인원 (staffing_diff 계산용)
+    - 간호사별 야간/OFF/주말근무 일수와 그 합·제곱합 (공정성 변화량 O(1) 계산용)
+
+    한 칸(간호사 n, 날짜 d)을 바꾸면 행 단위 위험도가 달라지는 칸은
+    d ~ d+ahead 뿐이다 (연속일 구간표와 quick return 패턴 길이로 정해짐).
+    그래서 이동 하나의 위험도 변화는 [d-back, d+ahead] 창만 다시 채점해서 얻는다.
+    """
+
+    def __init__(self, rows: pd.DataFrame, codebook: Optional[Codebook] = None, patterns: Optional[Sequence[dict]] = None):
+        cb = codebook or get_codebook()
+        self.cb = cb
+        rows = rows.drop_duplicates(["nurse_id", "date"], keep="first")
+
+        nurse_idx, self.nurse_ids = pd.factorize(rows["nurse_id"], sort=True)
+        names = rows.groupby("nurse_id", sort=True)["nurse_name"].first()
+        self.nurse_names = names.reindex(self.nurse_ids).to_numpy()
+
+        days = pd.to_datetime(rows["date"]).values.astype("datetime64[D]").astype(np.int64)
+        self.day0 = int(days.min())
+        self.n_days = int(days.max()) - self.day0 + 1
+        day_idx = days - self.day0
+
+        # 근무코드 어휘: 코드북 표준 코드 + 근무표에 있는 그 밖의 코드
+        canonical = list(cb.spec["codes"])
+        seen = [c for c in pd.unique(rows["shift_code"]) if c not in canonical]
+        self.code_names = np.array(canonical + sorted(map(str, seen)), dtype=object)
+        code_id = {c: i for i, c in enumerate(self.code_names)}
+        codes = rows["shift_code"].map(code_id).to_numpy()
+
+        code_series = pd.Series(self.code_names)
+        stype = cb.shift_type(code_series)
+        self.is_work = stype != "OFF"
+        self.is_night = stype == "NIGHT"
+        self.is_off = stype == "OFF"
+        self.baseline = cb.staffing_baseline(code_series)
+        tokens = cb.token(code_series)
+        self.token_vocab = {t: i for i, t in enumerate(sorted(set(tokens)))}
+        self.token_of = np.array([self.token_vocab[t] for t in tokens])
+
+        # 근무코드 변경 후보: 근무표에 실제로 쓰인 표준 코드
+        present = set(codes.tolist())
+        self.change_codes = np.array([i for i in range(len(canonical)) if i in present])
+
+        # 행 단위 채점표 (구간표는 saturation 이상에서 등급이 고정)
+        self.cap_work = _saturation(cb, "consecutive_working_days")
+        self.cap_night = _saturation(cb, "consecutive_night_shifts")
+        self.work_points = cb.points("consecutive_working_days", np.arange(self.cap_work + 1))
+        self.night_points = cb.points("consecutive_night_shifts", np.arange(self.cap_night + 1))
+
+        # quick return 패턴 → 길이 max_len 토큰 창(기록 없음 포함) 전체에 대한 점수표.
+        # 칸 점수 = 그룹마다 그 칸에서 끝나는 패턴 중 최고 등급 점수의 합
+        self.patterns = list(patterns) if patterns is not None else patterns_from_codebook(cb)
+        hits, self._pattern_base, self._pattern_width = suffix_table(self.patterns, self.token_vocab)
+        if self.patterns:
+            severity = hits * cb.level_to_points([p["severity"] for p in self.patterns])
+            groups = pd.factorize(pd.Series([p.get("group", p["name"]) for p in self.patterns], dtype=object))[0]
+            self.pattern_table = sum(severity[:, groups == g].max(axis=1) for g in range(groups.max() + 1))
+        else:
+            self.pattern_table = None
+        max_len = self._pattern_width
+
+        reach = max(self.cap_work, self.cap_night, max_len - 1)
+        self.back = reach
+        self.ahead = reach
+        self._offsets = np.arange(self.back + self.ahead + 1)
+
+        n_nurses = len(self.nurse_ids)
+        self.grid = np.full((n_nurses, self.back + self.n_days + self.ahead), MISSING, dtype=np.int64)
+        self.grid[nurse_idx, self.back + day_idx] = codes
+
+        self.staff = np.zeros((self.n_days, len(self.code_names)), dtype=np.int64)
+        np.add.at(self.staff, (day_idx, codes), 1)
+
+        weekday = (np.arange(self.n_days) + self.day0 + 3) % 7  # 1970-01-01 = 목요일(3)
+        self.weekend = weekday >= 5
+
+        self._init_fairness()
+        # 현재 근무표의 칸별 위험 점수 (staffing 제외). 이동 평가 시 '이전' 값으로 재사용
+        self.cell_points = np.zeros(self.grid.shape, dtype=np.int64)
+        self.cell_points[:, self.back:self.back + self.n_days] = self._segment_points(self.grid)[
+            :, self.back:self.back + self.n_days
+        ]
+
+    # -------------------------------
+    # FAIRNESS COUNTS
+    # -------------------------------
+    def _cells(self) -> np.ndarray:
+        return self.grid[:, self.back:self.back + self.n_days]
+
+    def _init_fairness(self):
+        cells = self._cells()
+        present = cells >= 0
+        safe = np.where(present, cells, 0)
+        self.counts = {
+            "night_days": (self.is_night[safe] & present).sum(axis=1),
+            "off_days": (self.is_off[safe] & present).sum(axis=1),
+            "weekend_work_days": (self.is_work[safe] & present & self.weekend).sum(axis=1),
+        }
+        self.count_sum = {k: float(v.sum()) for k, v in self.counts.items()}
+        self.count_sq = {k: float((v.astype(float) ** 2).sum()) for k, v in self.counts.items()}
+
+    def fairness(self) -> float:
+        n = len(self.nurse_ids)
+        return float(sum(_std(self.count_sum[k], self.count_sq[k], n) for k in FAIRNESS_METRICS))
+
+    def _metric_change(self, codes_from: np.ndarray, codes_to: np.ndarray, days: np.ndarray):
+        """칸 하나의 코드가 from → to로 바뀔 때 지표별 간호사 일수 변화량."""
+        wk = self.weekend[days]
+        return {
+            "night_days": self.is_night[codes_to].astype(int) - self.is_night[codes_from],
+            "off_days": self.is_off[codes_to].astype(int) - self.is_off[codes_from],
+            "weekend_work_days": (self.is_work[codes_to].astype(int) - self.is_work[codes_from]) * wk,
+        }
+
+    def _fairness_delta(self, nurses: Sequence[np.ndarray], changes: Sequence[dict]) -> np.ndarray:
+        """
+        간호사별 일수 변화량 → 지표별 표준편차 변화량 합 (합·제곱합만 갱신, O(1)).
+        nurses[i], changes[i]: i번째로 바뀌는 간호사와 그 변화량 (이동당 1~2명).
+        """
+        n = len(self.nurse_ids)
+        total = np.zeros(len(nurses[0]))
+        for k in FAIRNESS_METRICS:
+            ds = np.zeros(len(nurses[0]))
+            dq = np.zeros(len(nurses[0]))
+            for who, change in zip(nurses, changes):
+                x = self.counts[k][who].astype(float)
+                dx = change[k]
+                ds += dx
+                dq += (x + dx) ** 2 - x * x
+            before = _std(self.count_sum[k], self.count_sq[k], n)
+            total += _std(self.count_sum[k] + ds, self.count_sq[k] + dq, n) - before
+        return total
+
+    # -------------------------------
+    # RISK SCORING
+    # -------------------------------
+    def _segment_points(self, seg: np.ndarray) -> np.ndarray:
+        """
+        (M, W) 코드 창 → 칸별 위험 점수 (staffing 제외).
+        연속일 수는 saturation에서 자르므로 창 앞쪽 back칸만 있으면 정확하다.
+        """
+        present = seg >= 0
+        safe = np.where(present, seg, 0)
+        work = self.is_work[safe] & present
+        night = self.is_night[safe] & present
+
+        points = np.zeros(seg.shape, dtype=np.int64)
+        cw = np.zeros(seg.shape[0], dtype=np.int64)
+        cn = np.zeros(seg.shape[0], dtype=np.int64)
+        for j in range(seg.shape[1]):
+            cw = np.where(work[:, j], np.minimum(cw + 1, self.cap_work), 0)
+            cn = np.where(night[:, j], np.minimum(cn + 1, self.cap_night), 0)
+            points[:, j] = self.work_points[cw] + self.night_points[cn]
+
+        if self.pattern_table is not None:
+            points += self._pattern_points(np.where(present, self.token_of[safe] + 1, 0))
+        return points
+
+    def _pattern_points(self, symbols: np.ndarray) -> np.ndarray:
+        """칸별 quick return 점수: 그 칸에서 끝나는 길이 max_len 창을 인코딩해 점수표 조회."""
+        return self.pattern_table[encode_suffix(symbols, self._pattern_base, self._pattern_width)]
+
+    def _staffing_term(self, code: np.ndarray, count: np.ndarray) -> np.ndarray:
+        # 해당 날짜·코드 행들의 staffing 점수 합 = 인원 × 점수(기준 - 인원)
+        return count * self.cb.points("staffing_diff", self.baseline[code] - count)
+
+    def total_risk(self) -> int:
+        """add_risk_scores의 patient_safety_risk 합과 같은 값 (피로도 점수는 근무 이력 전체에 걸쳐 있어 제외)."""
+        seg_points = self.cell_points.sum()
+        days, codes = np.nonzero(self.staff)
+        staffing = self._staffing_term(codes, self.staff[days, codes]).sum()
+        return int(seg_points + staffing)
+
+    def _windows(self, nurses: np.ndarray, days: np.ndarray) -> np.ndarray:
+        # 패딩된 격자에서 [d-back, d+ahead] 창 (d는 0부터 시작하는 날짜 번호)
+        return self.grid[nurses[:, None], days[:, None] + self._offsets]
+
+    def _window_delta(self, nurses: np.ndarray, days: np.ndarray, new_codes: np.ndarray) -> np.ndarray:
+        new = self._windows(nurses, days)
+        new[:, self.back] = new_codes
+        after = self._segment_points(new)[:, self.back:].sum(axis=1)
+        before = self.cell_points[nurses[:, None], days[:, None] + self._offsets[self.back:]].sum(axis=1)
+        return after - before
+
+    # -------------------------------
+    # MOVES
+    # -------------------------------
+    def swap_deltas(self, days: np.ndarray, a: np.ndarray, b: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        같은 날 두 간호사 근무 맞교환의 (위험도 변화, 공정성 변화).
+        같은 날 코드 구성이 그대로라 staffing 점수는 변하지 않는다.
+        """
+        ca = self.grid[a, self.back + days]
+        cb_ = self.grid[b, self.back + days]
+        risk = self._window_delta(np.r_[a, b], np.r_[days, days], np.r_[cb_, ca])
+        risk = risk[:len(a)] + risk[len(a):]
+        fair = self._fairness_delta(
+            [a, b],
+            [self._metric_change(ca, cb_, days), self._metric_change(cb_, ca, days)],
+        )
+        return risk, fair
+
+    def change_deltas(self, days: np.ndarray, nurses: np.ndarray, codes: np.ndarray):
+        """
+        한 간호사의 하루 근무코드 변경의 (위험도 변화, 공정성 변화, 가능 여부).
+        원래 근무의 인원이 기준 인원 밑으로 내려가는 변경은 불가능으로 표시한다.
+        """
+        old = self.grid[nurses, self.back + days]
+        risk = self._window_delta(nurses, days, codes)
+
+        k_old = self.staff[days, old]
+        k_new = self.staff[days, codes]
+        risk = risk + (
+            self._staffing_term(old, k_old - 1) - self._staffing_term(old, k_old)
+            + self._staffing_term(codes, k_new + 1) - self._staffing_term(codes, k_new)
+        )
+        feasible = (old != codes) & ((self.baseline[old] == 0) | (k_old - 1 >= self.baseline[old]))
+        fair = self._fairness_delta([nurses], [self._metric_change(old, codes, days)])
+        return risk, fair, feasible
+
+    def _set(self, nurse: int, day: int, code: int):
+        old = int(self.grid[nurse, self.back + day])
+        change = self._metric_change(np.array([old]), np.array([code]), np.array([day]))
+        for k in FAIRNESS_METRICS:
+            x = float(self.counts[k][nurse])
+            dx = float(change[k][0])
+            self.counts[k][nurse] += int(dx)
+            self.count_sum[k] += dx
+            self.count_sq[k] += (x + dx) ** 2 - x * x
+        self.staff[day, old] -= 1
+        self.staff[day, code] += 1
+        self.grid[nurse, self.back + day] = code
+
+        # 바뀐 칸 이후 ahead칸의 점수만 다시 계산 (여백 칸은 0 유지)
+        cols = day + self._offsets
+        points = self._segment_points(self.grid[nurse, cols][None, :])[0, self.back:]
+        target = cols[self.back:]
+        inside = target < self.back + self.n_days
+        self.cell_points[nurse, target[inside]] = points[inside]
+
+    def apply_swap(self, day: int, a: int, b: int):
+        ca = int(self.grid[a, self.back + day])
+        cb_ = int(self.grid[b, self.back + day])
+        self._set(a, day, cb_)
+        self._set(b, day, ca)
+
+    def apply_change(self, day: int, nurse: int, code: int):
+        self._set(nurse, day, code)
+
+    # -------------------------------
+    # OUTPUT
+    # -------------------------------
+    def date_of(self, day) -> np.ndarray:
+        return (np.asarray(day) + self.day0).astype("datetime64[D]")
+
+    def to_frame(self, rows: pd.DataFrame) -> pd.DataFrame:
+        """원본 행에 현재 격자의 근무코드를 다시 써넣는다 (add_base_features 입력용)."""
+        out = rows.copy()
+        nurse = pd.Index(self.nurse_ids).get_indexer(out["nurse_id"])
+        day = pd.to_datetime(out["date"]).values.astype("datetime64[D]").astype(np.int64) - self.day0
+        out["shift_code"] = self.code_names[self.grid[nurse, self.back + day]]
+        return out
+
+    # -------------------------------
+    # CANDIDATES
+    # -------------------------------
+    def _present(self, nurses: np.ndarray, days: np.ndarray) -> np.ndarray:
+        return self.grid[nurses, self.back + days] >= 0
+
+    def sample_swaps(self, rng: np.random.Generator, size: int):
+        days = rng.integers(0, self.n_days, size)
+        a = rng.integers(0, len(self.nurse_ids), size)
+        b = rng.integers(0, len(self.nurse_ids), size)
+        ok = (a != b) & self._present(a, days) & self._present(b, days)
+        ok &= self.grid[a, self.back + days] != self.grid[b, self.back + days]
+        return days[ok], a[ok], b[ok]
+
+    def sample_changes(self, rng: np.random.Generator, size: int):
+        days = rng.integers(0, self.n_days, size)
+        nurses = rng.integers(0, len(self.nurse_ids), size)
+        codes = self.change_codes[rng.integers(0, len(self.change_codes), size)]
+        ok = self._present(nurses, days)
+        return days[ok], nurses[ok], codes[ok]
+
+
+# =========================================================
+# 2. 단일 교환 제안 (순위표)
+# =========================================================
+def propose_swaps(
+    rows: pd.DataFrame,
+    top_k: int = 20,
+    max_candidates: int = 300_000,
+    fairness_weight: float = 0.0,
+    codebook: Optional[Codebook] = None,
+    seed: int = 0,
+    chunk: int = 50_000,
+) -> pd.DataFrame:
+    """
+    같은 날 두 간호사의 근무를 맞바꾸는 후보를 모두(많으면 max_candidates개 표본) 평가해
+    환자안전 위험점수(patient_safety_risk, 피로도 점수 제외)를 가장 많이 낮추는 순으로 top_k개를 돌려준다.
+    맞교환은 날짜별 근무코드 구성을 바꾸지 않으므로 staffing 기준은 항상 유지된다.
+
+    rows: add_base_features 입력 형식 (date, nurse_id, nurse_name, shift_code)
+    """
+    state = RosterState(rows, codebook)
+    n = len(state.nurse_ids)
+    if n < 2:
+        return _empty_proposals()
+
+    ia, ib = np.triu_indices(n, k=1)
+    total = len(ia) * state.n_days
+    if total <= max_candidates:
+        days = np.repeat(np.arange(state.n_days), len(ia))
+        a = np.tile(ia, state.n_days)
+        b = np.tile(ib, state.n_days)
+        ok = state._present(a, days) & state._present(b, days)
+        ok &= state.grid[a, state.back + days] != state.grid[b, state.back + days]
+        days, a, b = days[ok], a[ok], b[ok]
+    else:
+        rng = np.random.default_rng(seed)
+        days, a, b = state.sample_swaps(rng, max_candidates)
+        key = np.unique(np.c_[days, np.minimum(a, b), np.maximum(a, b)], axis=0)
+        days, a, b = key[:, 0], key[:, 1], key[:, 2]
+
+    if not len(days):
+        return _empty_proposals()
+
+    risk = np.empty(len(days), dtype=np.int64)
+    fair = np.empty(len(days))
+    for s in range(0, len(days), chunk):
+        e = s + chunk
+        risk[s:e], fair[s:e] = state.swap_deltas(days[s:e], a[s:e], b[s:e])
+
+    score = risk + fairness_weight * fair
+    order = np.lexsort((fair, score))[:top_k]
+    order = order[risk[order] + fairness_weight * fair[order] < 0]
+    return pd.DataFrame(
+        {
+            "date": state.date_of(days[order]).astype(object),
+            "nurse_a": state.nurse_names[a[order]],
+            "shift_a": state.code_names[state.grid[a[order], state.back + days[order]]],
+            "nurse_b": state.nurse_names[b[order]],
+            "shift_b": state.code_names[state.grid[b[order], state.back + days[order]]],
+            "safety_risk_delta": risk[order],
+            "fairness_delta": np.round(fair[order], 4),
+        }
+    ).assign(date=lambda f: pd.to_datetime(f["date"]).dt.date)
+
+
+def _empty_proposals() -> pd.DataFrame:
+    return pd.DataFrame(columns=["date", "nurse_a", "shift_a", "nurse_b", "shift_b", "safety_risk_delta", "fairness_delta"])
+
+
+# =========================================================
+# 3. 국소 탐색 (simulated annealing + tabu)
+# =========================================================
+def optimize_roster(
+    rows: pd.DataFrame,
+    iterations: int = 2000,
+    batch: int = 512,
+    change_ratio: float = 0.3,
+    fairness_weight: float = 0.5,
+    temperature: float = 1.0,
+    cooling: float = 0.995,
+    tabu_tenure: int = 50,
+    time_limit: Optional[float] = None,
+    codebook: Optional[Codebook] = None,
+    seed: int = 0,
+    progress: Optional[Callable[[int, float], None]] = None,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    맞교환 + 근무코드 변경 이동으로 (patient_safety_risk 합 + fairness_weight × 공정성)을 낮춘다.
+    피로도 점수(fatigue_risk)는 목적 함수에 들어가지 않는다 (RosterState.total_risk 참고).
+
+    매 반복마다 batch개 후보의 변화량을 한 번에 평가해 가장 좋은 후보를 고르고,
+    개선이면 채택, 악화면 exp(-Δ/T) 확률로 채택한다 (T는 매 반복 cooling배).
+    최근 tabu_tenure 반복 안에 바뀐 칸은 다시 건드리지 않는다.
+    change_ratio: 후보 중 근무코드 변경 이동 비율 (0이면 맞교환만).
+
+    반환값: (가장 좋았던 시점의 근무표 rows, 채택된 이동 기록)
+    """
+    rng = np.random.default_rng(seed)
+    state = RosterState(rows, codebook)
+    tabu = np.full(state.grid.shape, -1, dtype=np.int64)
+
+    current = best = state.total_risk() + fairness_weight * state.fairness()
+    best_grid = state.grid.copy()
+    log = []
+    T = temperature
+    started = time.perf_counter()
+    n_changes = int(batch * change_ratio) if len(state.change_codes) else 0
+
+    for it in range(iterations):
+        if time_limit is not None and time.perf_counter() - started > time_limit:
+            break
+
+        sd, sa, sb = state.sample_swaps(rng, batch - n_changes)
+        s_risk, s_fair = state.swap_deltas(sd, sa, sb) if len(sd) else (np.zeros(0), np.zeros(0))
+        s_ok = (tabu[sa, state.back + sd] < it) & (tabu[sb, state.back + sd] < it)
+
+        cd, cn, cc = state.sample_changes(rng, n_changes)
+        if len(cd):
+            c_risk, c_fair, c_ok = state.change_deltas(cd, cn, cc)
+            c_ok &= tabu[cn, state.back + cd] < it
+        else:
+            c_risk, c_fair, c_ok = np.zeros(0), np.zeros(0), np.zeros(0, dtype=bool)
+
+        delta = np.r_[s_risk + fairness_weight * s_fair, c_risk + fairness_weight * c_fair]
+        ok = np.r_[s_ok, c_ok]
+        if not ok.any():
+            continue
+        delta = np.where(ok, delta, np.inf)
+        i = int(np.argmin(delta))
+        d = float(delta[i])
+
+        if d < 0 or rng.random() < np.exp(-d / max(T, 1e-9)):
+            if i < len(sd):
+                day, n1, n2 = int(sd[i]), int(sa[i]), int(sb[i])
+                move = {"move": "swap", "date": state.date_of(day), "nurse_a": state.nurse_names[n1],
+                        "shift_a": state.code_names[state.grid[n1, state.back + day]],
+                        "nurse_b": state.nurse_names[n2],
+                        "shift_b": state.code_names[state.grid[n2, state.back + day]],
+                        "safety_risk_delta": int(s_risk[i]), "fairness_delta": float(s_fair[i])}
+                state.apply_swap(day, n1, n2)
+                tabu[[n1, n2], state.back + day] = it + tabu_tenure
+            else:
+                j = i - len(sd)
+                day, n1, code = int(cd[j]), int(cn[j]), int(cc[j])
+                move = {"move": "change", "date": state.date_of(day), "nurse_a": state.nurse_names[n1],
+                        "shift_a": state.code_names[state.grid[n1, state.back + day]],
+                        "nurse_b": None, "shift_b": state.code_names[code],
+                        "safety_risk_delta": int(c_risk[j]), "fairness_delta": float(c_fair[j])}
+                state.apply_change(day, n1, code)
+                tabu[n1, state.back + day] = it + tabu_tenure
+            current += d
+            move["objective"] = current
+            log.append(move)
+            if current < best - 1e-9:
+                best = current
+                best_grid = state.grid.copy()
+
+        T *= cooling
+        if progress is not None and it % 50 == 0:
+            progress(it, best)
+
+    state.grid = best_grid  # to_frame은 격자만 읽는다
+    moves = pd.DataFrame(
+        log,
+        columns=["move", "date", "nurse_a", "shift_a", "nurse_b", "shift_b", "safety_risk_delta", "fairness_delta", "objective"],
+    )
+    if not moves.empty:
+        moves["date"] = pd.to_datetime(moves["date"]).dt.date
+    return state.to_frame(rows), moves
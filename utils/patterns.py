@@ -0,0 +1,252 @@
+# utils/patterns.py
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.codebook import Codebook, get_codebook
+
+MISSING = -1  # 근무 기록이 없는 날 (패턴을 끊는다)
+
+
+def _day_numbers(dates) -> np.ndarray:
+    return pd.to_datetime(dates).values.astype("datetime64[D]").astype(np.int64)
+
+
+# =========================================================
+# 1. 달력 정렬 격자 (간호사 × 날짜)
+# =========================================================
+class ShiftGrid:
+    """
+    간호사 × 날짜 정수 코드 격자.
+
+    - 행: 간호사 (factorize 순서), 열: 첫 날짜부터 마지막 날짜까지 하루 단위
+    - 값: column(기본 token)의 정수 코드, 기록이 없는 날은 MISSING(-1)
+    - row_nurse / row_day: 원본 행 → 격자 좌표 (결과를 행 단위로 되돌릴 때 사용)
+    """
+
+    def __init__(self, rows: pd.DataFrame, column: str = "token"):
+        self.index = rows.index
+        nurse_idx, nurses = pd.factorize(rows["nurse_id"], sort=False)
+        days = _day_numbers(rows["date"])
+
+        self.nurses = nurses
+        self.day0 = int(days.min()) if len(days) else 0
+        n_days = int(days.max()) - self.day0 + 1 if len(days) else 0
+
+        codes, vocab = pd.factorize(rows[column], sort=True)
+        self.vocab: Dict[str, int] = {v: i for i, v in enumerate(vocab)}
+
+        self.row_nurse = nurse_idx
+        self.row_day = days - self.day0
+        self.codes = np.full((len(nurses), n_days), MISSING, dtype=np.int32)
+        self.codes[self.row_nurse, self.row_day] = codes
+
+    @property
+    def shape(self):
+        return self.codes.shape
+
+    def dates(self) -> pd.DatetimeIndex:
+        start = pd.Timestamp(np.datetime64(self.day0, "D"))
+        return pd.date_range(start, periods=self.shape[1], freq="D")
+
+
+# =========================================================
+# 2. 패턴 정의
+#    {"name", "group", "sequence", "severity"}
+#    sequence: 토큰 문자열("NOD") 또는 토큰 목록(["N", "O", "D"])
+# =========================================================
+def patterns_from_codebook(codebook: Optional[Codebook] = None) -> List[dict]:
+    """코드북 quick_returns → 패턴 목록."""
+    cb = codebook or get_codebook()
+    out = []
+    for group, by_level in cb.quick_returns.items():
+        for level, sequences in by_level.items():
+            for seq in sequences:
+                out.append({"name": f"{group}:{seq}", "group": group, "sequence": seq, "severity": level})
+    return out
+
+
+def _tokens(sequence) -> List[str]:
+    return list(sequence) if isinstance(sequence, str) else [str(t) for t in sequence]
+
+
+# =========================================================
+# 3. 패턴 탐지
+# =========================================================
+class PatternMatches:
+    """
+    detect_patterns 결과.
+    hits[n, d, p] = 간호사 n의 d일에 패턴 p가 끝남 (패턴 마지막 날에 표시).
+    """
+
+    def __init__(self, grid: ShiftGrid, patterns: List[dict], hits: np.ndarray, codebook: Codebook):
+        self.grid = grid
+        self.patterns = patterns
+        self.hits = hits
+        self.cb = codebook
+        self.names = [p["name"] for p in patterns]
+
+    def _groups(self) -> Dict[str, np.ndarray]:
+        groups: Dict[str, List[int]] = {}
+        for i, p in enumerate(self.patterns):
+            groups.setdefault(p.get("group", p["name"]), []).append(i)
+        return {g: np.asarray(idx) for g, idx in groups.items()}
+
+    def _severity_points(self) -> np.ndarray:
+        return self.cb.level_to_points([p["severity"] for p in self.patterns])
+
+    # -------------------------------
+    # ROW LEVEL
+    # -------------------------------
+    def row_hits(self) -> np.ndarray:
+        """(행 수, 패턴 수) bool — 원본 행 순서."""
+        return self.hits[self.grid.row_nurse, self.grid.row_day]
+
+    def row_flags(self) -> pd.DataFrame:
+        """
+        행 단위 결과 (원본 index 유지).
+        그룹마다 {group}(해당 날짜에 끝나는 패턴 존재)와
+        {group}_severity(그중 가장 높은 등급 점수) 컬럼.
+        """
+        hits = self.row_hits()
+        weighted = hits * self._severity_points()
+        out = {}
+        for group, idx in self._groups().items():
+            out[group] = hits[:, idx].any(axis=1)
+            out[f"{group}_severity"] = weighted[:, idx].max(axis=1) if len(hits) else np.zeros(0, dtype=np.int64)
+        return pd.DataFrame(out, index=self.grid.index)
+
+    # -------------------------------
+    # NURSE LEVEL
+    # -------------------------------
+    def nurse_counts(self) -> pd.DataFrame:
+        """간호사 × 패턴 발생 횟수."""
+        counts = self.hits.sum(axis=1)
+        return pd.DataFrame(counts, index=pd.Index(self.grid.nurses, name="nurse_id"), columns=self.names)
+
+    def counts_by_level(self) -> pd.DataFrame:
+        """간호사 × {group}_{등급} 발생 횟수."""
+        counts = self.nurse_counts()
+        keys = [f"{p.get('group', p['name'])}_{p['severity']}" for p in self.patterns]
+        return counts.T.groupby(keys, sort=False).sum().T
+
+
+def detect_patterns(
+    rows: pd.DataFrame,
+    patterns: Optional[Sequence[dict]] = None,
+    codebook: Optional[Codebook] = None,
+    column: str = "token",
+    grid: Optional[ShiftGrid] = None,
+) -> PatternMatches:
+    """
+    모든 간호사 × 모든 패턴을 한 번에 탐지한다.
+
+    길이 L 창(window)을 격자 코드의 기수 K 정수로 인코딩(K = 코드 수 + 1)해
+    패턴 인코딩 값과 searchsorted로 대조한다 (compile_patterns / match_windows).
+    반복은 최대 패턴 길이만큼만 돌고 패턴 개수와는 무관하다.
+    창 안에 MISSING(기록 없는 날)이 있으면 불일치.
+    """
+    cb = codebook or get_codebook()
+    patterns = list(patterns) if patterns is not None else patterns_from_codebook(cb)
+    grid = grid or ShiftGrid(rows, column=column)
+    compiled = compile_patterns(patterns, grid.vocab)
+    hits = match_windows(grid.codes, compiled, len(patterns), base=len(grid.vocab) + 1)
+    return PatternMatches(grid, patterns, hits, cb)
+
+
+# =========================================================
+# 4. 창(window) 인코딩 / 대조 (격자 일부에도 재사용)
+# =========================================================
+def compile_patterns(patterns: Sequence[dict], vocab: Dict[str, int]) -> Dict[int, tuple]:
+    """
+    패턴 목록 → {길이 L: (정렬된 인코딩 값, 소속 행렬[인코딩, 패턴])}.
+    vocab에 없는 토큰이 들어간 패턴은 매칭될 수 없으므로 제외한다.
+    """
+    base = len(vocab) + 1
+    by_length: Dict[int, List[tuple]] = {}
+    for i, p in enumerate(patterns):
+        seq = _tokens(p["sequence"])
+        if not seq or any(t not in vocab for t in seq):
+            continue
+        key = 0
+        for t in seq:
+            key = key * base + vocab[t]
+        by_length.setdefault(len(seq), []).append((key, i))
+
+    compiled = {}
+    for L, items in by_length.items():
+        keys = np.array([k for k, _ in items], dtype=np.int64)
+        ids = np.array([i for _, i in items])
+        # 같은 인코딩을 가진 패턴(다른 그룹/등급으로 중복 등록)은 함께 표시
+        uniq, inverse = np.unique(keys, return_inverse=True)
+        member = np.zeros((len(uniq), len(patterns)), dtype=bool)
+        member[inverse, ids] = True
+        compiled[L] = (uniq, member)
+    return compiled
+
+
+def match_windows(codes: np.ndarray, compiled: Dict[int, tuple], n_patterns: int, base: int) -> np.ndarray:
+    """
+    codes: (행, 날짜) 정수 코드 (MISSING 허용) → hits: (행, 날짜, 패턴) bool.
+    base: compile_patterns에 쓴 vocab 크기 + 1.
+    창 [d-L+1, d] 인코딩 = (d-1에서 끝나는 길이 L-1 창) * K + codes[d] 로 누적하므로
+    반복은 최대 패턴 길이만큼만 돈다.
+    """
+    n_rows, n_days = codes.shape
+    hits = np.zeros((n_rows, n_days, n_patterns), dtype=bool)
+    if not compiled or n_days == 0:
+        return hits
+
+    codes = codes.astype(np.int64)
+    present = codes >= 0
+    h = np.where(present, codes, 0)
+    valid = present
+    for L in range(1, max(compiled) + 1):
+        if L > n_days:
+            break
+        if L > 1:
+            prev_h, prev_valid = h, valid
+            h = np.zeros_like(prev_h)
+            valid = np.zeros_like(prev_valid)
+            h[:, 1:] = prev_h[:, :-1] * base + codes[:, 1:]
+            valid[:, 1:] = prev_valid[:, :-1] & present[:, 1:]
+        if L not in compiled:
+            continue
+        uniq, member = compiled[L]
+        pos = np.minimum(np.searchsorted(uniq, h), len(uniq) - 1)
+        matched = valid & (uniq[pos] == h)
+        r_idx, d_idx = np.nonzero(matched)
+        hits[r_idx, d_idx] |= member[pos[r_idx, d_idx]]
+    return hits
+
+
+def suffix_table(patterns: Sequence[dict], vocab: Dict[str, int]) -> Tuple[np.ndarray, int, int]:
+    """
+    길이 width(= 최장 패턴) 토큰 창 전체에 대해 '창 마지막 날에 끝나는 패턴' 표.
+    창 인코딩: 기호 0 = 기록 없음, 토큰 i = i+1, 기수 B = len(vocab) + 1.
+    칸 하나의 패턴 판정이 인코딩 한 번 + 표 조회 한 번으로 끝난다.
+
+    반환값: (hits[창 인코딩, 패턴] bool, B, width)
+    """
+    compiled = compile_patterns(patterns, vocab)
+    B = len(vocab) + 1
+    width = max(compiled) if compiled else 1
+    n_states = B ** width
+    if n_states > 1 << 22:
+        raise ValueError(f"패턴 조합이 너무 많습니다 (토큰 {B - 1}개, 길이 {width}).")
+    digits = (np.arange(n_states)[:, None] // B ** np.arange(width - 1, -1, -1)) % B
+    hits = match_windows(digits - 1, compiled, len(patterns), base=B)[:, -1, :]
+    return hits, B, width
+
+
+def encode_suffix(symbols: np.ndarray, base: int, width: int) -> np.ndarray:
+    """
+    (행, 날짜) 기호 배열(0 = 기록 없음) → 각 칸에서 끝나는 길이 width 창의 인코딩.
+    첫 날 이전은 기록 없음으로 본다.
+    """
+    padded = np.pad(symbols, ((0, 0), (width - 1, 0)))
+    h = np.zeros(symbols.shape, dtype=np.int64)
+    for k in range(width):
+        h = h * base + padded[:, k:k + symbols.shape[1]]
+    return h
@@ -0,0 +1,151 @@
+# utils/preferences.py
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.codebook import Codebook, get_codebook
+
+PREFERENCE_COLS = ["nurse_id", "date", "requested_shift"]
+
+# priority가 없는 신청의 우선순위 (1 = 가장 높음)
+DEFAULT_PRIORITY = 2
+
+# 근무 구분으로 비교하는 신청 (예: "D" 신청은 DAY 계열 근무면 반영된 것으로 본다).
+# 그 밖의 근무코드(교육 등)는 근무코드가 같아야 반영된 것으로 본다.
+MATCH_BY_TYPE = {"DAY", "EVENING", "NIGHT", "OFF"}
+
+_INDEX_COLUMNS = ["key", "nurse_id", "date", "requested_shift", "requested_type", "priority"]
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _keys(nurse_id: pd.Series, date: pd.Series) -> np.ndarray:
+    """
+    (nurse_id, 날짜) → uint64 해시 키.
+    간호사 ID는 고유값만 해시하고 날짜(일 번호)와 섞으므로 행 수가 많아도 빠르다.
+    """
+    codes, uniques = pd.factorize(nurse_id.astype(str))
+    nurse_hash = pd.util.hash_array(uniques.to_numpy(dtype=object))[codes]
+    days = pd.to_datetime(date).values.astype("datetime64[D]").astype(np.int64).astype(np.uint64)
+    return nurse_hash ^ (days * _MIX)
+
+
+def prepare_preferences(df: pd.DataFrame, codebook: Optional[Codebook] = None) -> pd.DataFrame:
+    """
+    원본 희망 신청표 검증 + 정규화.
+    필수: nurse_id, date, requested_shift (OFF 신청 = 휴무 희망) / 선택: priority (1 = 가장 높음)
+    """
+    cb = codebook or get_codebook()
+    missing = [c for c in PREFERENCE_COLS if c not in df.columns]
+    if missing:
+        raise ValueError(f"희망 신청표에 필수 컬럼이 없습니다: {missing}")
+
+    out = pd.DataFrame(
+        {
+            "nurse_id": df["nurse_id"].to_numpy(),
+            "date": pd.to_datetime(df["date"]).dt.date.to_numpy(),
+            "requested_shift": cb.normalize(df["requested_shift"]).to_numpy(),
+        }
+    )
+    out["requested_type"] = cb.shift_type(out["requested_shift"])
+    if "priority" in df.columns:
+        out["priority"] = pd.to_numeric(df["priority"], errors="coerce").fillna(DEFAULT_PRIORITY).astype(int).to_numpy()
+    else:
+        out["priority"] = DEFAULT_PRIORITY
+    out.insert(0, "key", _keys(out["nurse_id"], out["date"]))
+    return out
+
+
+def load_preference_file(uploaded_file) -> pd.DataFrame:
+    """CSV/XLSX 희망 신청표 → 원본 DataFrame (정규화는 PreferenceIndex.add에서)."""
+    if uploaded_file.name.lower().endswith(".csv"):
+        return pd.read_csv(uploaded_file)
+    return pd.read_excel(uploaded_file)
+
+
+# =========================================================
+# 희망 신청 인덱스 ((nurse_id, 날짜) 해시 키 → 신청 1건)
+# =========================================================
+class PreferenceIndex:
+    """
+    근무 희망/휴무 신청을 (nurse_id, 날짜) 해시 키로 정렬해 보관한다.
+    같은 간호사·날짜에 신청이 여러 번 들어오면 마지막 신청만 남긴다.
+    근무표와는 키 컬럼 하나로 merge 한 번에 맞춰 보므로 신청 수만 건도 바로 계산된다.
+    """
+
+    def __init__(self, requests: Optional[pd.DataFrame] = None, codebook: Optional[Codebook] = None):
+        self.cb = codebook or get_codebook()
+        self.requests = pd.DataFrame({c: pd.Series(dtype=object) for c in _INDEX_COLUMNS}).astype({"key": np.uint64})
+        if requests is not None:
+            self.add(requests)
+
+    def __len__(self) -> int:
+        return len(self.requests)
+
+    def add(self, requests: pd.DataFrame) -> "PreferenceIndex":
+        """
+        신청을 추가한다 (기존 키와 겹치면 새 신청으로 교체).
+        새 신청만 정규화/해시하고, 기존 인덱스와는 정렬된 키끼리 합친다.
+        """
+        new = prepare_preferences(requests, self.cb)
+        new = new.drop_duplicates("key", keep="last").sort_values("key", kind="stable")
+        if new.empty:
+            return self
+        old = self.requests
+        if len(old):
+            # 새 신청과 키가 겹치는 기존 신청은 버린다 (둘 다 키 정렬이라 searchsorted로 확인)
+            keys = new["key"].to_numpy()
+            pos = np.minimum(np.searchsorted(keys, old["key"].to_numpy()), len(keys) - 1)
+            old = old[keys[pos] != old["key"].to_numpy()]
+        self.requests = pd.concat([old, new], ignore_index=True).sort_values("key", kind="stable").reset_index(drop=True)
+        return self
+
+    def match(self, rows: pd.DataFrame) -> pd.DataFrame:
+        """
+        근무표 행(shift_type 포함) ↔ 신청 merge.
+        반환: 근무표에 그 간호사·날짜 행이 있는 신청마다
+              nurse_id, nurse_name, date, requested_shift, priority, assigned_shift, matched
+        """
+        cols = ["nurse_id", "nurse_name", "date", "requested_shift", "priority", "assigned_shift", "matched"]
+        if self.requests.empty or rows.empty:
+            return pd.DataFrame(columns=cols)
+
+        roster = pd.DataFrame(
+            {
+                "key": _keys(rows["nurse_id"], rows["date"]),
+                "_nurse": rows["nurse_id"].astype(str).to_numpy(),
+                "_date": pd.to_datetime(rows["date"]).dt.date.to_numpy(),
+                "nurse_name": rows["nurse_name"].to_numpy(),
+                "assigned_shift": rows["shift_code"].to_numpy(),
+                "assigned_type": rows["shift_type"].to_numpy(),
+            }
+        ).drop_duplicates("key")
+        merged = self.requests.merge(roster, on="key", how="inner", sort=False)
+        # 해시 충돌 방지: 실제 간호사/날짜가 같은 행만
+        merged = merged[(merged["_nurse"] == merged["nurse_id"].astype(str)) & (merged["_date"] == merged["date"])]
+
+        by_type = merged["requested_type"].isin(MATCH_BY_TYPE).to_numpy()
+        same_type = (merged["requested_type"] == merged["assigned_type"]).to_numpy()
+        same_code = (merged["requested_shift"] == merged["assigned_shift"]).to_numpy()
+        merged["matched"] = np.where(by_type, same_type, same_code)
+        return merged[cols].reset_index(drop=True)
+
+
+# =========================================================
+# 반영률
+# =========================================================
+def _ratios(matched: pd.DataFrame, by) -> pd.DataFrame:
+    g = matched.groupby(by, sort=True)["matched"]
+    out = pd.DataFrame({"requests": g.size(), "matched": g.sum().astype(int)})
+    out["pref_match_ratio"] = (out["matched"] / out["requests"]).round(3)
+    return out.reset_index()
+
+
+def nurse_match_ratios(matched: pd.DataFrame) -> pd.DataFrame:
+    """PreferenceIndex.match 결과 → 간호사별 신청 수 / 반영 수 / 반영률."""
+    return _ratios(matched, ["nurse_id", "nurse_name"])
+
+
+def priority_match_ratios(matched: pd.DataFrame) -> pd.DataFrame:
+    """PreferenceIndex.match 결과 → 우선순위별 신청 수 / 반영 수 / 반영률."""
+    return _ratios(matched, "priority")
@@ -0,0 +1,126 @@
+# utils/profiling.py
+import time
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+import streamlit as st
+
+# ?profile=1 로 열거나 사이드바 토글을 켜면 이번 rerun을 cProfile로 감싼다
+QUERY_PARAM = "profile"
+TOGGLE_KEY = "_profile_page"
+
+# 결과 표에 보이는 함수 수
+TOP_N = 30
+
+# "이 앱 코드만" 필터 기준 (app.py, pages/, utils/가 있는 저장소 루트)
+PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+
+_SORT_KEYS = {"누적 시간 (cumtime)": "cumulative", "자체 시간 (tottime)": "tottime"}
+
+
+def profiling_requested() -> bool:
+    """쿼리 파라미터 또는 사이드바 토글로 프로파일링을 켰는지 (토글을 그린다)."""
+    from_query = str(st.query_params.get(QUERY_PARAM, "")).lower() in ("1", "true", "yes")
+    return st.sidebar.toggle(
+        "이 페이지 프로파일링 (cProfile)",
+        value=from_query,
+        key=TOGGLE_KEY,
+        help="켜져 있으면 화면을 다시 그릴 때마다 실행 시간을 함수별로 측정합니다. 평소에는 꺼 두세요.",
+    )
+
+
+def run_page(main: Callable[[], None]) -> None:
+    """
+    페이지 진입점. 프로파일링이 꺼져 있으면 main()을 그대로 실행한다 (추가 비용 없음).
+    켜져 있으면 main() 실행을 cProfile로 감싸고, 끝난 뒤(st.stop 포함) 페이지 아래에 결과를 붙인다.
+    """
+    if not profiling_requested():
+        main()
+        return
+
+    import cProfile
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # 같은 스레드에서 다른 프로파일러가 이미 돌고 있으면 측정 없이 실행
+        st.sidebar.warning("다른 프로파일러가 실행 중이라 이번 rerun은 측정하지 않습니다.")
+        main()
+        return
+
+    started = time.perf_counter()
+    try:
+        main()
+    finally:
+        profiler.disable()
+        render_profile(profiler, time.perf_counter() - started)
+
+
+# =========================================================
+# 결과 표시
+# =========================================================
+def profile_table(
+    profiler,
+    sort: str = "cumulative",
+    top: int = TOP_N,
+    only: str = "",
+    project_only: bool = False,
+) -> pd.DataFrame:
+    """
+    cProfile 결과 → 상위 함수 표 (function, location, ncalls, tottime, cumtime, percall).
+    only: 파일 경로에 이 문자열이 들어간 함수만 (예: "features")
+    project_only: 이 저장소(PROJECT_ROOT) 안의 함수만 (라이브러리 내부 호출 제외)
+    """
+    import pstats
+
+    stats = pstats.Stats(profiler).sort_stats(sort)
+    rows = []
+    for func in stats.fcn_list:
+        filename, line, name = func
+        if (only and only not in filename) or (project_only and not filename.startswith(PROJECT_ROOT)):
+            continue
+        cc, nc, tt, ct, _ = stats.stats[func]
+        rows.append(
+            {
+                "function": name,
+                "location": f"{filename}:{line}" if line else filename,
+                "ncalls": f"{nc}/{cc}" if nc != cc else str(nc),
+                "tottime": round(tt, 4),
+                "cumtime": round(ct, 4),
+                "percall": round(ct / cc, 6) if cc else 0.0,
+            }
+        )
+        if len(rows) >= top:
+            break
+    return pd.DataFrame(rows, columns=["function", "location", "ncalls", "tottime", "cumtime", "percall"])
+
+
+def profile_bytes(profiler) -> bytes:
+    """pstats/snakeviz에서 열 수 있는 .prof 파일 내용 (pstats.Stats.dump_stats와 같은 형식)."""
+    import marshal
+    import pstats
+
+    return marshal.dumps(pstats.Stats(profiler).stats)
+
+
+def render_profile(profiler, elapsed: float) -> None:
+    st.divider()
+    with st.expander(f"프로파일 결과 · 이번 rerun {elapsed * 1000:.0f}ms", expanded=True):
+        c1, c2, c3 = st.columns([2, 2, 1])
+        sort = _SORT_KEYS[c1.radio("정렬", list(_SORT_KEYS), horizontal=True, key="_profile_sort")]
+        only = c2.text_input("경로 필터 (예: features)", value="", key="_profile_filter")
+        project_only = c3.checkbox("이 앱 코드만", value=False, key="_profile_project")
+        st.dataframe(
+            profile_table(profiler, sort, TOP_N, only, project_only),
+            use_container_width=True,
+            hide_index=True,
+        )
+        st.download_button(
+            ".prof 파일 내려받기",
+            data=profile_bytes(profiler),
+            file_name=f"page_{time.strftime('%Y%m%d_%H%M%S')}.prof",
+            mime="application/octet-stream",
+            help="python -m pstats 파일명 또는 snakeviz로 열 수 있습니다.",
+        )
@@ -1,5 +1,12 @@
+from typing import Optional, Tuple
+
+import numpy as np
 import pandas as pd
 
+from utils.codebook import Codebook, get_codebook
+from utils.features import REQUIRED_COLS, WORKLOAD_WINDOWS, add_base_features, prepare_schedule
+from utils.patterns import detect_patterns
+
 # 총점 기준 위험도 구간 (예시값, 필요 시 조정 가능)
 RISK_LEVELS = {
     "LOW": (0, 3),
@@ -8,40 +15,28 @@ RISK_LEVELS = {
 }
 
 
+# 행 단위 점수 구간은 코드북(utils.codebook) thresholds 표를 따른다.
 def _score_consecutive_working_days(cw: int) -> int:
     # 엑셀 기준: 6=Critical, 5=Moderate, 4=Low, ≤3 No risk
-    if cw >= 6:
-        return 3
-    if cw == 5:
-        return 2
-    if cw == 4:
-        return 1
-    return 0
+    return int(get_codebook().points("consecutive_working_days", cw))
 
 
 def _score_consecutive_nights(cn: int) -> int:
     # 엑셀 기준: 5=Critical, 4=Moderate, 3=Low, ≤2 No risk
-    if cn >= 5:
-        return 3
-    if cn == 4:
-        return 2
-    if cn == 3:
-        return 1
-    return 0
+    return int(get_codebook().points("consecutive_night_shifts", cn))
 
 
 def _score_staffing(diff: int) -> int:
     # 기준 인원 - 실제 인원이 2 이상이면 Critical, 1이면 Moderate, 0 이하면 No risk
-    if diff >= 2:
-        return 3
-    if diff == 1:
-        return 2
-    return 0
+    return int(get_codebook().points("staffing_diff", diff))
 
 
-def _score_quick_return(flag: bool) -> int:
-    # ED/N quick return은 Critical 패턴으로 간주 → 3점
-    return 3 if bool(flag) else 0
+def _score_quick_return(row: pd.Series, group: str) -> int:
+    # 패턴 등급 점수({group}_severity)가 없으면 플래그를 Critical(3점)로 간주
+    severity = row.get(f"{group}_severity")
+    if severity is not None and not pd.isna(severity):
+        return int(severity)
+    return get_codebook().level_points["Critical"] if bool(row.get(group, False)) else 0
 
 
 def compute_patient_safety_risk(row: pd.Series) -> int:
@@ -55,28 +50,211 @@ def compute_patient_safety_risk(row: pd.Series) -> int:
       - staffing_diff
     """
     score = 0
-    score += _score_quick_return(row.get("ED_quick_return", False))
-    score += _score_quick_return(row.get("N_quick_return", False))
+    for group in get_codebook().quick_returns:
+        score += _score_quick_return(row, group)
     score += _score_consecutive_working_days(int(row.get("consecutive_working_days", 0)))
     score += _score_consecutive_nights(int(row.get("consecutive_night_shifts", 0)))
     score += _score_staffing(int(row.get("staffing_diff", 0)))
     return int(score)
 
 
-def add_risk_scores(df: pd.DataFrame) -> pd.DataFrame:
+def _column(df: pd.DataFrame, name: str, default) -> np.ndarray:
+    if name in df.columns:
+        return df[name].fillna(default).to_numpy()
+    return np.full(len(df), default)
+
+
+def add_risk_scores(df: pd.DataFrame, codebook: Optional[Codebook] = None) -> pd.DataFrame:
     """
     환자안전 기반 위험도 점수를 DataFrame에 추가.
     - patient_safety_risk
-    - overall_risk_score (현재는 동일 값으로 사용)
+    - fatigue_risk: 근무 중 최저 각성도(fatigue_alertness) 점수
+    - overall_risk_score = patient_safety_risk + fatigue_risk
+    - workload_risk: 최근 7/14/28일 업무량 점수 합 (overall_risk_score에는 넣지 않음)
+
+    compute_patient_safety_risk와 같은 규칙을 코드북 구간표로 한 번에 계산한다.
     """
+    cb = codebook or get_codebook()
     df = df.copy()
-    df["patient_safety_risk"] = df.apply(compute_patient_safety_risk, axis=1)
-    df["overall_risk_score"] = df["patient_safety_risk"].astype(int)
+    qr_points = cb.level_points["Critical"]
+
+    score = np.zeros(len(df), dtype=np.int64)
+    for group in cb.quick_returns:
+        if f"{group}_severity" in df.columns:
+            score += _column(df, f"{group}_severity", 0).astype(np.int64)
+        else:
+            score += qr_points * _column(df, group, False).astype(bool)
+    score = (
+        score
+        + cb.points("consecutive_working_days", _column(df, "consecutive_working_days", 0))
+        + cb.points("consecutive_night_shifts", _column(df, "consecutive_night_shifts", 0))
+        + cb.points("staffing_diff", _column(df, "staffing_diff", 0))
+    )
+    df["patient_safety_risk"] = score.astype(int)
+    df["fatigue_risk"] = fatigue_risk(df, cb)
+    df["overall_risk_score"] = (df["patient_safety_risk"] + df["fatigue_risk"]).astype(int)
+    df["workload_risk"] = workload_risk(df, cb)
     return df
 
 
+def fatigue_risk(df: pd.DataFrame, codebook: Optional[Codebook] = None) -> np.ndarray:
+    """fatigue_alertness(utils.fatigue) → 코드북 점수. 컬럼/구간표가 없거나 값이 NaN이면 0."""
+    cb = codebook or get_codebook()
+    if "fatigue_alertness" not in df.columns or "fatigue_alertness" not in cb.thresholds:
+        return np.zeros(len(df), dtype=int)
+    return cb.points("fatigue_alertness", df["fatigue_alertness"].to_numpy(dtype=float)).astype(int)
+
+
+def workload_risk(df: pd.DataFrame, codebook: Optional[Codebook] = None) -> np.ndarray:
+    """
+    최근 N일 업무량 컬럼(nights_7d, working_14d, hours_28d, weekend_shifts_28d)의 코드북 점수 합.
+    코드북에 구간표가 없거나 컬럼이 없는 지표는 건너뛴다.
+    """
+    cb = codebook or get_codebook()
+    score = np.zeros(len(df), dtype=np.int64)
+    for metric in WORKLOAD_WINDOWS:
+        if metric in cb.thresholds and metric in df.columns:
+            score += cb.points(metric, _column(df, metric, 0))
+    return score.astype(int)
+
+
 def risk_level(score: int) -> str:
     for level, (lo, hi) in RISK_LEVELS.items():
         if lo <= score <= hi:
             return level
     return "HIGH"
+
+
+def nurse_risk_summary(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    간호사별 평균 overall risk (높은 순 정렬).
+    """
+    return (
+        df.groupby("nurse_name")["overall_risk_score"]
+        .mean()
+        .sort_values(ascending=False)
+        .reset_index()
+        .rename(columns={"overall_risk_score": "mean_risk"})
+    )
+
+
+# =========================================================
+# 코드북 기반 간호사 단위 요약 (챗봇 분석표)
+# =========================================================
+def _sorted_rows(rows: pd.DataFrame) -> pd.DataFrame:
+    return rows.sort_values(["nurse_id", "date"], kind="stable").reset_index(drop=True)
+
+
+def _min_rest_hours(rows: pd.DataFrame, cb: Codebook) -> pd.Series:
+    """
+    간호사별 근무 종료 → 다음 근무 시작 사이 최소 휴식시간(시간).
+    근무시간이 정의된 근무가 2회 미만이면 NaN.
+    """
+    start_h, end_h = cb.shift_hours(rows["shift_code"])
+    has = ~np.isnan(start_h)
+    day = pd.to_datetime(rows["date"]).values.astype("datetime64[D]").astype(np.int64)
+
+    nurse = rows["nurse_id"].to_numpy()[has]
+    start = day[has] * 24.0 + start_h[has]
+    end = day[has] * 24.0 + end_h[has]
+
+    order = np.lexsort((start, nurse))
+    nurse, start, end = nurse[order], start[order], end[order]
+    same = nurse[1:] == nurse[:-1]
+    rest = pd.Series(start[1:][same] - end[:-1][same], index=nurse[1:][same])
+    return rest.groupby(level=0).min()
+
+
+def label_nurse_summary(per_nurse: pd.DataFrame, codebook: Optional[Codebook] = None) -> pd.DataFrame:
+    """
+    간호사별 집계 → 코드북 요약 (지표별 등급 라벨 + total_risk_score, 총점 내림차순).
+    per_nurse: index = nurse_id, 컬럼 = nurse_name, max_consecutive_working_days, max_consecutive_night_shifts,
+               total_off_days, total_night_days, min_rest_hours(없으면 NaN),
+               quick return 등급별 발생 일수 {group}_{level} (없는 컬럼은 0)
+    summarize_codebook(행 전체 집계)과 WindowIndex.summary(기간 누적합 집계)가 같이 쓴다.
+    """
+    cb = codebook or get_codebook()
+    n = len(per_nurse)
+    summary = pd.DataFrame({"nurse_id": per_nurse.index.to_numpy(), "nurse_name": per_nurse["nurse_name"].to_numpy()})
+
+    total = np.zeros(n, dtype=np.int64)
+    for group, by_level in cb.quick_returns.items():
+        labels = np.full(n, "No Risk", dtype=object)
+        # 등급 우선순위: 점수가 낮은 등급부터 덮어써서 가장 높은 등급이 남도록
+        for level in sorted(by_level, key=lambda lv: cb.level_points.get(lv, 0)):
+            key = f"{group}_{level}"
+            if key in per_nurse.columns:
+                labels[per_nurse[key].to_numpy() > 0] = level
+        summary[f"{group}_risk"] = labels
+        total += cb.level_to_points(labels)
+
+    metrics = [
+        ("max_consecutive_working_days", "consecutive_working_days"),
+        ("max_consecutive_night_shifts", "consecutive_night_shifts"),
+        ("total_off_days", "total_off_days"),
+        ("total_night_days", "total_night_days"),
+    ]
+    for col, metric in metrics:
+        values = per_nurse[col].to_numpy().astype(int)
+        labels = cb.level(metric, values)
+        summary[col] = values
+        summary[metric + "_risk"] = labels
+        total += cb.level_to_points(labels)
+
+    rest_values = per_nurse["min_rest_hours"].to_numpy().astype(float)
+    rest_labels = cb.level("min_off_interval", rest_values)
+    summary["min_off_interval_hours"] = [None if np.isnan(v) else round(float(v), 1) for v in rest_values]
+    summary["min_off_interval_risk"] = rest_labels
+    total += cb.level_to_points(rest_labels)
+
+    summary["total_risk_score"] = total
+    summary = summary.sort_values("total_risk_score", ascending=False, kind="stable")
+    return summary.reset_index(drop=True)
+
+
+def summarize_codebook(rows: pd.DataFrame, codebook: Optional[Codebook] = None) -> pd.DataFrame:
+    """
+    add_base_features 결과(행 단위)에서 간호사 단위 코드북 요약을 만든다.
+    행 단위 컬럼(연속 근무/야간, 토큰)을 그대로 집계하므로 행 단위 위험도와 결과가 일치한다.
+    """
+    cb = codebook or get_codebook()
+    rows = _sorted_rows(rows)
+
+    g = rows.groupby("nurse_id", sort=False)
+    base = pd.DataFrame(
+        {
+            "nurse_name": g["nurse_name"].first(),
+            "max_consecutive_working_days": g["consecutive_working_days"].max(),
+            "max_consecutive_night_shifts": g["consecutive_night_shifts"].max(),
+            "total_off_days": (rows["shift_type"] == "OFF").groupby(rows["nurse_id"], sort=False).sum(),
+            "total_night_days": (rows["shift_type"] == "NIGHT").groupby(rows["nurse_id"], sort=False).sum(),
+        }
+    )
+    base["min_rest_hours"] = _min_rest_hours(rows, cb).reindex(base.index)
+    qr = detect_patterns(rows, codebook=cb).counts_by_level().reindex(base.index, fill_value=0)
+    return label_nurse_summary(base.join(qr), cb)
+
+
+def analyze_roster(df: pd.DataFrame, codebook: Optional[Codebook] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    원본 근무표 → (행 단위 피처+위험도, 간호사 단위 코드북 요약).
+    근무코드 정규화와 피처 계산을 한 번만 수행해 두 결과를 함께 만든다.
+    """
+    cb = codebook or get_codebook()
+    rows = add_risk_scores(add_base_features(prepare_schedule(df, cb), cb), cb)
+    return rows, summarize_codebook(rows, cb)
+
+
+def analyze_schedule(df: pd.DataFrame, codebook: Optional[Codebook] = None) -> pd.DataFrame:
+    """
+    df: columns = [date, nurse_id, nurse_name, shift_code, (level)]
+    간호사별 코드북 기준 위험도 요약 (챗봇 분석표).
+    """
+    required = set(REQUIRED_COLS)
+    if not required.issubset(df.columns):
+        missing = required - set(df.columns)
+        raise ValueError(f"필수 컬럼 누락: {missing}")
+
+    cb = codebook or get_codebook()
+    rows = add_base_features(prepare_schedule(df, cb), cb)
+    return summarize_codebook(rows, cb)
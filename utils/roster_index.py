@@ -0,0 +1,258 @@
+# utils/roster_index.py
+import datetime as dt
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.codebook import get_codebook
+from utils.risk import label_nurse_summary
+
+
+def _to_day_numbers(dates: pd.Series) -> np.ndarray:
+    """date 컬럼 → 1970-01-01 기준 일수(int64). 이진 탐색용."""
+    return pd.to_datetime(dates).values.astype("datetime64[D]").astype(np.int64)
+
+
+def _day_number(d) -> int:
+    return int(np.datetime64(pd.Timestamp(d).date(), "D").astype(np.int64))
+
+
+class RosterIndex:
+    """
+    간호사별 날짜 조회용 인덱스 (업로드당 한 번 생성).
+
+    - 간호사 → (nurse_name, date) 정렬 프레임 안의 연속 구간 [start, stop)
+    - 날짜 → 그 구간 안의 위치 (간호사를 처음 조회할 때 dict로 생성, 이후 O(1))
+    - 전후 N일 컨텍스트 → 구간 안에서 이진 탐색 slice
+    - 일별 요약 텍스트 → 간호사를 처음 볼 때 전 일자를 한 번에 렌더링해 캐시
+
+    공유 저장소(utils.shared_store)를 통해 여러 세션이 같은 인덱스를 쓰므로
+    간호사별 캐시는 다 만든 dict만 lock 안에서 등록한다 (먼저 등록된 것을 모두가 쓴다).
+    """
+
+    def __init__(self, df: pd.DataFrame, key: str = "nurse_name"):
+        self.key = key
+        frame = df.sort_values([key, "date"], kind="stable").reset_index(drop=True)
+        self.frame = frame
+        self._days = _to_day_numbers(frame["date"])
+
+        names = frame[key].to_numpy()
+        if len(names):
+            starts = np.flatnonzero(np.r_[True, names[1:] != names[:-1]])
+            stops = np.r_[starts[1:], len(names)]
+        else:
+            starts = stops = np.array([], dtype=np.int64)
+        self._blocks: Dict[str, Tuple[int, int]] = {
+            names[s]: (int(s), int(e)) for s, e in zip(starts, stops)
+        }
+        self._positions: Dict[str, Dict[dt.date, int]] = {}
+        self._summaries: Dict[str, Dict[dt.date, str]] = {}
+        self._lock = threading.Lock()
+
+    # -------------------------------
+    # BASIC LOOKUPS
+    # -------------------------------
+    def nurses(self) -> list:
+        return list(self._blocks)
+
+    def nurse_frame(self, nurse) -> pd.DataFrame:
+        block = self._blocks.get(nurse)
+        if block is None:
+            return self.frame.iloc[0:0]
+        return self.frame.iloc[block[0]:block[1]]
+
+    def date_range(self, nurse) -> Tuple[Optional[dt.date], Optional[dt.date]]:
+        block = self._blocks.get(nurse)
+        if block is None:
+            return None, None
+        dates = self.frame["date"]
+        return dates.iat[block[0]], dates.iat[block[1] - 1]
+
+    def _positions_for(self, nurse) -> Dict[dt.date, int]:
+        pos = self._positions.get(nurse)
+        if pos is None:
+            start, stop = self._blocks[nurse]
+            pos = {}
+            # 같은 날짜가 중복되면 첫 행을 사용 (기존 iloc[0] 동작과 동일)
+            for i, d in enumerate(self.frame["date"].iloc[start:stop]):
+                pos.setdefault(d, start + i)
+            with self._lock:
+                pos = self._positions.setdefault(nurse, pos)
+        return pos
+
+    def day_row(self, nurse, date) -> Optional[pd.Series]:
+        if nurse not in self._blocks:
+            return None
+        i = self._positions_for(nurse).get(date)
+        if i is None:
+            return None
+        return self.frame.iloc[i]
+
+    def context(self, nurse, date, days: int = 7) -> pd.DataFrame:
+        """date 기준 전후 days일 구간 (양 끝 포함)."""
+        block = self._blocks.get(nurse)
+        if block is None:
+            return self.frame.iloc[0:0]
+        start, stop = block
+        center = _day_number(date)
+        lo = start + int(np.searchsorted(self._days[start:stop], center - days, side="left"))
+        hi = start + int(np.searchsorted(self._days[start:stop], center + days, side="right"))
+        return self.frame.iloc[lo:hi]
+
+    # -------------------------------
+    # PRE-RENDERED TEXT
+    # -------------------------------
+    def summary(self, nurse, date, render: Callable[[pd.Series], str]) -> Optional[str]:
+        """
+        일별 요약 텍스트. 간호사별로 처음 요청될 때 전 일자를 렌더링해 두고
+        이후 날짜 변경은 dict 조회만 한다.
+        """
+        cache = self._summaries.get(nurse)
+        if cache is None:
+            if nurse not in self._blocks:
+                return None
+            cache = {}
+            for d, i in self._positions_for(nurse).items():
+                cache[d] = render(self.frame.iloc[i])
+            with self._lock:
+                cache = self._summaries.setdefault(nurse, cache)
+        return cache.get(date)
+
+
+# =========================================================
+# 기간 누적합 인덱스 (임의 기간 집계 O(1) / 간호사)
+# =========================================================
+class WindowIndex:
+    """
+    간호사 × 날짜 격자 위의 누적합 인덱스 (업로드당 한 번 생성).
+
+    risk_scores(행 단위 피처+위험도)에서 간호사별로 근무/야간/휴무/주말근무 일수,
+    quick return 발생(등급별), overall_risk_score를 날짜 순 누적합으로 만들어 두고,
+    임의 기간 [start, end]의 합계를 간호사마다 두 번의 조회(cs[end] - cs[start-1])로 구한다.
+    연속 근무 최대값·최소 휴식시간처럼 누적합이 안 되는 값은 격자 구간에서 바로 줄인다.
+    """
+
+    def __init__(self, rows: pd.DataFrame, codebook=None):
+        cb = codebook or get_codebook()
+        self.codebook = cb
+        rows = rows.sort_values(["nurse_id", "date"], kind="stable")
+
+        days = _to_day_numbers(rows["date"])
+        self.day0 = int(days.min()) if len(days) else 0
+        n_days = int(days.max()) - self.day0 + 1 if len(days) else 0
+        codes, nurses = pd.factorize(rows["nurse_id"], sort=True)
+        self.nurse_ids = nurses.to_numpy()
+        self.nurse_names = rows.groupby("nurse_id", sort=True)["nurse_name"].first().reindex(nurses).to_numpy()
+        self._pos = {n: i for i, n in enumerate(self.nurse_ids)}
+        col = days - self.day0
+
+        stype = rows["shift_type"].to_numpy()
+        counts = {
+            "days": np.ones(len(rows)),
+            "work_days": stype != "OFF",
+            "night_days": stype == "NIGHT",
+            "off_days": stype == "OFF",
+            "weekend_work_days": (stype != "OFF") & rows["weekend_flag"].to_numpy(dtype=bool),
+            "risk_score": rows["overall_risk_score"].to_numpy(),
+        }
+        # quick return: 그룹별 발생 일수 + 등급별 (그날 가장 높은 등급 기준) 일수
+        for group, by_level in cb.quick_returns.items():
+            if group not in rows.columns:
+                continue
+            counts[group] = rows[group].to_numpy(dtype=bool)
+            sev = rows[f"{group}_severity"].to_numpy()
+            for level in by_level:
+                counts[f"{group}_{level}"] = sev == cb.level_points.get(level, 0)
+
+        self.metrics = list(counts)
+        grid = np.zeros((len(self.metrics), len(nurses), n_days), dtype=np.float64)
+        for m, values in enumerate(counts.values()):
+            np.add.at(grid[m], (codes, col), np.asarray(values, dtype=np.float64))
+        # 앞에 0을 붙인 누적합: 기간 [a, b] 합 = cs[..., b + 1] - cs[..., a]
+        self._cs = np.concatenate([np.zeros(grid.shape[:2] + (1,)), grid.cumsum(axis=2)], axis=2)
+
+        # 구간 최대/최소용 격자 (빈 날은 -1 / +inf)
+        self._max = {}
+        for name in ["consecutive_working_days", "consecutive_night_shifts"]:
+            g = np.full((len(nurses), n_days), -1, dtype=np.int32)
+            g[codes, col] = rows[name].to_numpy()
+            self._max[name] = g
+
+        # 직전 근무 종료 → 이 근무 시작 휴식시간 (근무시간이 정의된 근무끼리, 뒤 근무 날짜에 기록)
+        start_h, end_h = cb.shift_hours(rows["shift_code"])
+        has = ~np.isnan(start_h)
+        rest = np.full((len(nurses), n_days), np.inf)
+        if has.any():
+            c, d = codes[has], days[has]
+            s, e = d * 24.0 + start_h[has], d * 24.0 + end_h[has]
+            same = c[1:] == c[:-1]
+            gap = s[1:] - e[:-1]
+            np.minimum.at(rest, (c[1:][same], d[1:][same] - self.day0), gap[same])
+        self._rest = rest
+
+    # -------------------------------
+    # 기간 → 격자 열 범위
+    # -------------------------------
+    @property
+    def start(self) -> Optional[dt.date]:
+        return None if not self._cs.shape[2] - 1 else pd.Timestamp(np.datetime64(self.day0, "D")).date()
+
+    @property
+    def end(self) -> Optional[dt.date]:
+        n_days = self._cs.shape[2] - 1
+        return None if not n_days else pd.Timestamp(np.datetime64(self.day0 + n_days - 1, "D")).date()
+
+    def _bounds(self, start, end) -> Tuple[int, int]:
+        """[start, end] (양 끝 포함) → 격자 열 [lo, hi). 격자 밖은 잘라낸다."""
+        n_days = self._cs.shape[2] - 1
+        lo = _day_number(start) - self.day0 if start is not None else 0
+        hi = _day_number(end) - self.day0 + 1 if end is not None else n_days
+        return min(max(lo, 0), n_days), min(max(hi, 0), n_days)
+
+    def overlaps(self, start, end) -> bool:
+        lo, hi = self._bounds(start, end)
+        return hi > lo
+
+    # -------------------------------
+    # 기간 집계
+    # -------------------------------
+    def window(self, start=None, end=None) -> pd.DataFrame:
+        """
+        기간 [start, end]의 간호사별 집계 (index = nurse_id).
+        합계 컬럼은 누적합 차이, max_*/min_rest_hours는 격자 구간 축약.
+        기간에 근무표 행이 없는 간호사는 days = 0.
+        """
+        lo, hi = self._bounds(start, end)
+        sums = self._cs[:, :, hi] - self._cs[:, :, lo]
+        out = pd.DataFrame(sums.T.round().astype(np.int64), columns=self.metrics, index=pd.Index(self.nurse_ids, name="nurse_id"))
+        out.insert(0, "nurse_name", self.nurse_names)
+        for name, g in self._max.items():
+            out[f"max_{name}"] = g[:, lo:hi].max(axis=1, initial=-1).clip(min=0) if hi > lo else 0
+        rest = self._rest[:, lo:hi].min(axis=1, initial=np.inf) if hi > lo else np.full(len(out), np.inf)
+        out["min_rest_hours"] = np.where(np.isinf(rest), np.nan, rest)
+        return out
+
+    def nurse_window(self, nurse_id, start=None, end=None) -> Optional[dict]:
+        """간호사 한 명의 기간 집계 (누적합 조회 O(1))."""
+        i = self._pos.get(nurse_id)
+        if i is None:
+            return None
+        lo, hi = self._bounds(start, end)
+        sums = self._cs[:, i, hi] - self._cs[:, i, lo]
+        out = {"nurse_id": nurse_id, "nurse_name": self.nurse_names[i]}
+        out.update({m: int(round(v)) for m, v in zip(self.metrics, sums)})
+        return out
+
+    def summary(self, start=None, end=None) -> pd.DataFrame:
+        """
+        기간 [start, end]의 간호사별 코드북 요약 (utils.risk.summarize_codebook과 같은 컬럼).
+        연속 근무/야간은 기간 안 행의 값(기간 전부터 이어진 연속 포함), 휴식시간은 기간 안에서 시작하는 근무 기준.
+        """
+        win = self.window(start, end)
+        win = win[win["days"] > 0]
+        per_nurse = win.rename(
+            columns={"off_days": "total_off_days", "night_days": "total_night_days"}
+        )
+        return label_nurse_summary(per_nurse, self.codebook)
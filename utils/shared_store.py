@@ -0,0 +1,263 @@
+# utils/shared_store.py
+import hashlib
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import numpy as np
+import pandas as pd
+
+# 공유 저장소 전체 예산 (아무 세션도 참조하지 않는 항목만 이 한도를 넘으면 오래된 순으로 제거)
+DEFAULT_STORE_BUDGET_MB = float(os.getenv("ROSTER_STORE_BUDGET_MB", "1024"))
+
+
+# =========================================================
+# 1. 내용 해시 / 메모리 추정
+# =========================================================
+def fingerprint(value: Any) -> str:
+    """입력 값의 내용 기반 해시. DataFrame은 행 단위 해시를 사용한다."""
+    h = hashlib.sha1()
+    if isinstance(value, pd.DataFrame):
+        h.update(",".join(map(str, value.columns)).encode("utf-8"))
+        h.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+    elif isinstance(value, bytes):
+        h.update(value)
+    else:
+        h.update(repr(value).encode("utf-8"))
+    return h.hexdigest()
+
+
+def estimate_nbytes(value: Any, _seen: Optional[set] = None) -> int:
+    """
+    값이 차지하는 메모리 추정치 (bytes).
+    DataFrame/Series는 문자열까지 포함한 deep 사용량, numpy는 nbytes,
+    dict/list/일반 객체는 안쪽 값을 따라가며 더한다 (같은 객체는 한 번만 센다).
+    """
+    seen = _seen if _seen is not None else set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_nbytes(k, seen) + estimate_nbytes(v, seen) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(estimate_nbytes(v, seen) for v in value)
+    if hasattr(value, "__dict__") and not isinstance(value, type):
+        return sys.getsizeof(value) + estimate_nbytes(vars(value), seen)
+    return sys.getsizeof(value)
+
+
+def _enable_copy_on_write() -> bool:
+    """
+    pandas 3.0부터는 Copy-on-Write가 기본이다. 2.x에서는 옵션으로 켜고,
+    옵션이 없는 버전이면 False (read_only_view가 깊은 사본을 만든다).
+    """
+    if int(pd.__version__.split(".")[0]) >= 3:
+        return True
+    try:
+        pd.options.mode.copy_on_write = True
+    except (AttributeError, KeyError):
+        return False
+    return True
+
+
+_COPY_ON_WRITE = _enable_copy_on_write()
+
+
+def read_only_view(value: Any) -> Any:
+    """
+    공유 값을 세션에 건넬 때 쓰는 사본.
+    Copy-on-Write에서는 얕은 사본이라 세션이 컬럼을 추가/수정해도 공유 원본은 바뀌지 않는다.
+    dict/list는 안쪽 DataFrame/Series까지 같은 방식으로 감싼다.
+    그 밖의 객체(RosterIndex 등)는 그대로 건네므로 세션 코드에서 바꾸지 않는다.
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=not _COPY_ON_WRITE)
+    if isinstance(value, dict):
+        return {k: read_only_view(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [read_only_view(v) for v in value]
+    return value
+
+
+# =========================================================
+# 2. 프로세스 공유 저장소
+# =========================================================
+class _Entry:
+    __slots__ = ("value", "nbytes", "holders", "last_used", "hits")
+
+    def __init__(self, value: Any, nbytes: int):
+        self.value = value
+        self.nbytes = nbytes
+        self.holders: set = set()
+        self.last_used = time.monotonic()
+        self.hits = 0
+
+
+class SharedStore:
+    """
+    내용 해시(버전) → 변경 불가 값 저장소. 서버 프로세스 하나에 하나.
+
+    같은 근무표를 여러 세션이 올리면 값은 한 벌만 저장하고, 세션(holder)별 참조를 센다.
+    참조가 0인 항목은 budget을 넘을 때 오래 안 쓴 순서로 제거된다.
+    같은 키를 여러 세션이 동시에 요청하면 한 번만 계산하고 나머지는 결과를 기다린다.
+    """
+
+    def __init__(self, budget_bytes: Optional[int] = None):
+        self.budget_bytes = int(budget_bytes if budget_bytes is not None else DEFAULT_STORE_BUDGET_MB * 1e6)
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._building: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.RLock()
+        self._holder_ids = itertools.count(1)
+        self.evictions = 0
+
+    def new_holder(self) -> int:
+        return next(self._holder_ids)
+
+    # -------------------------------
+    # 조회 / 등록
+    # -------------------------------
+    def _touch(self, key: Hashable, holder: Optional[int]) -> _Entry:
+        entry = self._entries[key]
+        self._entries.move_to_end(key)
+        entry.last_used = time.monotonic()
+        entry.hits += 1
+        if holder is not None:
+            entry.holders.add(holder)
+        return entry
+
+    def intern(self, key: Hashable, value: Any, holder: Optional[int] = None) -> Any:
+        """value를 key로 등록한다. 이미 있으면 기존 값을 돌려준다 (새 value는 버려진다)."""
+        with self._lock:
+            if key in self._entries:
+                return self._touch(key, holder).value
+        return self.get_or_create(key, lambda: value, holder)
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any], holder: Optional[int] = None) -> Any:
+        """key가 있으면 그 값을, 없으면 factory()로 만들어 등록한 값을 돌려준다."""
+        with self._lock:
+            if key in self._entries:
+                return self._touch(key, holder).value
+            building = self._building.setdefault(key, threading.Lock())
+
+        with building:
+            with self._lock:
+                if key in self._entries:
+                    # 다른 세션이 먼저 계산을 끝냈다
+                    return self._touch(key, holder).value
+            try:
+                value = factory()
+                nbytes = estimate_nbytes(value)
+            finally:
+                with self._lock:
+                    self._building.pop(key, None)
+            with self._lock:
+                self._entries[key] = _Entry(value, nbytes)
+                entry = self._touch(key, holder)
+                self._evict()
+                return entry.value
+
+    def contains(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    # -------------------------------
+    # 참조 해제 / 제거
+    # -------------------------------
+    def release(self, key: Hashable, holder: int) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.holders.discard(holder)
+                self._evict()
+
+    def release_all(self, holder: int) -> None:
+        """세션이 끝났을 때 그 세션의 모든 참조를 해제한다."""
+        with self._lock:
+            for entry in self._entries.values():
+                entry.holders.discard(holder)
+            self._evict()
+
+    def _evict(self) -> None:
+        total = sum(e.nbytes for e in self._entries.values())
+        if total <= self.budget_bytes:
+            return
+        # OrderedDict 앞쪽이 가장 오래 안 쓴 항목
+        for key in [k for k, e in self._entries.items() if not e.holders]:
+            total -= self._entries.pop(key).nbytes
+            self.evictions += 1
+            if total <= self.budget_bytes:
+                break
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    # -------------------------------
+    # 메모리 현황
+    # -------------------------------
+    def held_bytes(self, holder: int) -> Dict[str, int]:
+        """holder가 참조하는 항목 크기: shared(다른 세션과 함께 참조) / private(혼자 참조)."""
+        with self._lock:
+            shared = private = 0
+            for entry in self._entries.values():
+                if holder in entry.holders:
+                    if len(entry.holders) > 1:
+                        shared += entry.nbytes
+                    else:
+                        private += entry.nbytes
+            return {"shared_bytes": shared, "private_bytes": private}
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = list(self._entries.values())
+            holders = set().union(*(e.holders for e in entries)) if entries else set()
+            return {
+                "entries": len(entries),
+                "total_bytes": sum(e.nbytes for e in entries),
+                "unreferenced_bytes": sum(e.nbytes for e in entries if not e.holders),
+                "budget_bytes": self.budget_bytes,
+                "sessions": len(holders),
+                "references": sum(len(e.holders) for e in entries),
+                "evictions": self.evictions,
+            }
+
+    def table(self) -> pd.DataFrame:
+        """항목별 현황 (최근 사용 순)."""
+        with self._lock:
+            rows = [
+                {
+                    "key": str(key)[:12],
+                    "type": type(e.value).__name__,
+                    "mb": round(e.nbytes / 1e6, 3),
+                    "sessions": len(e.holders),
+                    "hits": e.hits,
+                }
+                for key, e in reversed(self._entries.items())
+            ]
+        return pd.DataFrame(rows, columns=["key", "type", "mb", "sessions", "hits"])
+
+
+_STORE: Optional[SharedStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_store() -> SharedStore:
+    """프로세스 전체에서 하나인 공유 저장소 (모든 Streamlit 세션이 같이 쓴다)."""
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = SharedStore()
+        return _STORE
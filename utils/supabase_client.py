@@ -1,9 +1,17 @@
 # utils/supabase_client.py
+from typing import TYPE_CHECKING
+
 import streamlit as st
-from supabase import create_client, Client
+
+if TYPE_CHECKING:
+    from supabase import Client
+
 
 @st.cache_resource
-def get_supabase_client() -> Client:
+def get_supabase_client() -> "Client":
+    # supabase SDK는 무거우므로 처음 클라이언트를 만들 때 import 한다
+    from supabase import create_client
+
     url = st.secrets["SUPABASE_URL"]
     key = st.secrets["SUPABASE_KEY"]
     return create_client(url, key)
@@ -0,0 +1,149 @@
+# utils/synthetic.py
+import datetime as dt
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# 기본 근무 비율 (병동 3교대 평균치에 가까운 예시값)
+DEFAULT_SHIFT_MIX = {"D": 0.30, "E": 0.25, "N": 0.20, "OFF": 0.25}
+
+# 실제 근무표에서 자주 보이는 표기 변형 (코드북 정규화 대상)
+CODE_NOISE = {
+    "D": ["DL", "8D", "9D", "교외", "검진", "d", " D "],
+    "E": ["EL", "e", "E "],
+    "N": ["NL", "n", " N"],
+    "OFF": ["유급", "O", "휴무", "off"],
+}
+
+# 같은 근무가 이어질 확률 (야간은 묶음으로 배치되는 경향을 반영)
+_STICKINESS = {"D": 0.45, "E": 0.45, "N": 0.65, "OFF": 0.35}
+
+
+def _next_codes(prev, n: int, codes: list, probs: np.ndarray, rng) -> np.ndarray:
+    """
+    간호사 전원에 대해 하루치 근무를 한 번에 뽑는다.
+    - 전날 근무를 유지할 확률(_STICKINESS) 반영
+    - N 다음 D/E 같은 quick return은 일부러 조금 섞어 둔다 (분석 대상 패턴)
+    """
+    fresh = rng.choice(len(codes), size=n, p=probs)
+    if prev is None:
+        return fresh
+
+    stick = np.array([_STICKINESS.get(c, 0.4) for c in codes])[prev]
+    keep = rng.random(n) < stick
+    out = np.where(keep, prev, fresh)
+
+    # 야간 묶음이 끝나면 대부분 OFF로 회복
+    if "OFF" not in codes or "N" not in codes:
+        return out
+    off_idx = codes.index("OFF")
+    n_idx = codes.index("N")
+    after_night = (prev == n_idx) & (out != n_idx)
+    recover = after_night & (rng.random(n) < 0.8)
+    out[recover] = off_idx
+    return out
+
+
+def generate_roster(
+    n_nurses: int = 30,
+    n_days: int = 31,
+    n_wards: int = 1,
+    start_date: Optional[dt.date] = None,
+    shift_mix: Optional[Dict[str, float]] = None,
+    novice_ratio: float = 0.2,
+    code_noise: float = 0.05,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    벤치마크/데모용 가상 근무표를 생성한다.
+
+    반환 컬럼: date, nurse_id, nurse_name, shift_code, is_novice, ward
+    (load_schedule_file / analyze_schedule 입력 형식과 동일)
+
+    - shift_mix: 근무코드별 비율 (D/E/N/OFF)
+    - novice_ratio: 신규 간호사 비율
+    - code_noise: "8D", "DL", "유급" 같은 표기 변형이 섞이는 비율
+    """
+    rng = np.random.default_rng(seed)
+    start_date = start_date or dt.date(2025, 1, 1)
+    mix = shift_mix or DEFAULT_SHIFT_MIX
+
+    codes = list(mix.keys())
+    probs = np.array([mix[c] for c in codes], dtype=float)
+    probs = probs / probs.sum()
+
+    grid = np.empty((n_days, n_nurses), dtype=np.int64)
+    prev = None
+    for d in range(n_days):
+        grid[d] = _next_codes(prev, n_nurses, codes, probs, rng)
+        prev = grid[d]
+
+    shift_code = np.array(codes, dtype=object)[grid.ravel()]
+
+    # 표기 변형 주입
+    if code_noise > 0:
+        noisy = np.flatnonzero(rng.random(shift_code.size) < code_noise)
+        for i in noisy:
+            variants = CODE_NOISE.get(shift_code[i])
+            if variants:
+                shift_code[i] = variants[rng.integers(len(variants))]
+
+    nurse_idx = np.tile(np.arange(n_nurses), n_days)
+    day_idx = np.repeat(np.arange(n_days), n_nurses)
+    dates = pd.to_datetime(start_date) + pd.to_timedelta(day_idx, unit="D")
+
+    is_novice = rng.random(n_nurses) < novice_ratio
+    ward = np.arange(n_nurses) % max(n_wards, 1)
+
+    df = pd.DataFrame(
+        {
+            "date": dates.strftime("%Y-%m-%d"),
+            "nurse_id": [f"RN{i + 1:05d}" for i in nurse_idx],
+            "nurse_name": [f"간호사{i + 1:05d}" for i in nurse_idx],
+            "shift_code": shift_code,
+            "is_novice": is_novice[nurse_idx],
+            "ward": [f"W{w + 1:02d}" for w in ward[nurse_idx]],
+        }
+    )
+    return df
+
+
+def generate_preferences(
+    roster: pd.DataFrame,
+    request_ratio: float = 0.15,
+    match_ratio: float = 0.7,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    근무표에 맞춘 가상 희망 근무/휴무 신청표 (utils.preferences 입력 형식).
+
+    반환 컬럼: nurse_id, date, requested_shift, priority (1 = 가장 높음)
+
+    - request_ratio: 근무표 행 중 신청이 있는 비율
+    - match_ratio: 신청이 실제 근무와 같을 확률 (나머지는 D/E/N/OFF 중 무작위)
+    """
+    rng = np.random.default_rng(seed)
+    picked = roster.iloc[np.flatnonzero(rng.random(len(roster)) < request_ratio)]
+    codes = np.array(list(DEFAULT_SHIFT_MIX), dtype=object)
+    keep = rng.random(len(picked)) < match_ratio
+    requested = np.where(keep, picked["shift_code"].to_numpy(dtype=object), codes[rng.integers(len(codes), size=len(picked))])
+    return pd.DataFrame(
+        {
+            "nurse_id": picked["nurse_id"].to_numpy(),
+            "date": picked["date"].to_numpy(),
+            "requested_shift": requested,
+            "priority": rng.choice([1, 2, 3], size=len(picked), p=[0.2, 0.5, 0.3]),
+        }
+    )
+
+
+def write_roster(df: pd.DataFrame, path: str) -> str:
+    """
+    생성한 근무표를 CSV/XLSX로 저장한다 (확장자로 형식 결정).
+    """
+    if str(path).lower().endswith(".xlsx"):
+        df.to_excel(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+    return path
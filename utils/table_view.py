@@ -0,0 +1,131 @@
+# utils/table_view.py
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import pandas as pd
+import streamlit as st
+
+
+# -------------------------------
+# SERVER-SIDE SLICING
+# -------------------------------
+def filter_frame(
+    df: pd.DataFrame,
+    search: str = "",
+    columns: Optional[Sequence[str]] = None,
+    filters: Optional[Dict[str, Iterable]] = None,
+) -> pd.DataFrame:
+    """
+    filters({컬럼: 허용 값 목록})와 검색어를 적용한 행만 남긴다.
+    검색은 columns(없으면 전체)의 문자열 표현에서 대소문자 무시 부분 일치.
+    """
+    view_cols = [c for c in (columns or df.columns) if c in df.columns]
+    mask = pd.Series(True, index=df.index)
+
+    for col, allowed in (filters or {}).items():
+        allowed = list(allowed)
+        if col in df.columns and allowed:
+            mask &= df[col].isin(allowed)
+
+    if search and search.strip():
+        needle = search.strip().lower()
+        hit = pd.Series(False, index=df.index)
+        for col in view_cols:
+            hit |= df[col].astype(str).str.lower().str.contains(needle, regex=False, na=False)
+        mask &= hit
+
+    return df if mask.all() else df[mask]
+
+
+def _sort_and_slice(
+    df: pd.DataFrame,
+    sort_by: Optional[str],
+    ascending: bool,
+    offset: int,
+    limit: int,
+) -> pd.DataFrame:
+    end = offset + limit
+    if not sort_by or sort_by not in df.columns:
+        return df.iloc[offset:end]
+
+    # 앞쪽 페이지는 전체 정렬 대신 상위 k개만 뽑는다 (숫자 컬럼).
+    # nsmallest/nlargest는 NaN 행을 버리므로, NaN이 있으면 sort_values(NaN 맨 뒤)와 순서가 같도록 전체 정렬한다.
+    col = df[sort_by]
+    if (
+        end < len(df) // 4
+        and pd.api.types.is_numeric_dtype(col)
+        and not pd.api.types.is_bool_dtype(col)
+        and not col.hasnans
+    ):
+        top = df.nsmallest(end, sort_by) if ascending else df.nlargest(end, sort_by)
+        return top.iloc[offset:end]
+    return df.sort_values(sort_by, ascending=ascending, kind="stable").iloc[offset:end]
+
+
+# -------------------------------
+# STREAMLIT COMPONENT
+# -------------------------------
+def paged_table(
+    df: pd.DataFrame,
+    key: str,
+    page_size: int = 50,
+    columns: Optional[Sequence[str]] = None,
+    searchable: bool = True,
+    sortable: bool = True,
+    filter_columns: Optional[List[str]] = None,
+    **dataframe_kwargs,
+) -> pd.DataFrame:
+    """
+    큰 DataFrame을 서버에서 잘라 현재 페이지만 브라우저로 보내는 표.
+    행 수와 관계없이 전송량은 page_size 행 × 선택 컬럼으로 일정하다.
+
+    반환값: 현재 화면에 표시된 구간 (상세 보기 등 후속 렌더링용)
+    """
+    if df is None or df.empty:
+        st.info("표시할 데이터가 없습니다.")
+        return pd.DataFrame(columns=list(columns or []))
+
+    view_cols = [c for c in (columns or df.columns) if c in df.columns]
+
+    filters: Dict[str, list] = {}
+    if filter_columns:
+        fcols = st.columns(len(filter_columns))
+        for fc, col in zip(fcols, filter_columns):
+            options = sorted(df[col].dropna().unique().tolist())
+            filters[col] = fc.multiselect(col, options, key=f"{key}_filter_{col}")
+
+    search = ""
+    sort_by = None
+    ascending = True
+    c1, c2, c3 = st.columns([3, 2, 1])
+    if searchable:
+        search = c1.text_input("검색", key=f"{key}_search", placeholder="포함 문자열")
+    if sortable:
+        choice = c2.selectbox("정렬 기준", ["(원래 순서)"] + view_cols, key=f"{key}_sort")
+        sort_by = None if choice == "(원래 순서)" else choice
+        ascending = c3.toggle("오름차순", value=True, key=f"{key}_asc")
+
+    # 필터/검색이 바뀌면 첫 페이지로
+    signature = (search, sort_by, ascending, tuple((k, tuple(v)) for k, v in filters.items()))
+    sig_key = f"{key}_signature"
+    page_key = f"{key}_page"
+    if st.session_state.get(sig_key) != signature:
+        st.session_state[sig_key] = signature
+        st.session_state[page_key] = 1
+
+    matched = filter_frame(df, search=search, columns=view_cols, filters=filters)
+    total = len(matched)
+    n_pages = max(1, -(-total // page_size))
+    if st.session_state.get(page_key, 1) > n_pages:
+        st.session_state[page_key] = n_pages
+
+    page = st.number_input("페이지", min_value=1, max_value=n_pages, step=1, key=page_key)
+    offset = (int(page) - 1) * page_size
+
+    window = _sort_and_slice(matched, sort_by, ascending, offset, page_size)[view_cols]
+
+    st.dataframe(window, **dataframe_kwargs)
+    if total:
+        st.caption(f"총 {total:,}행 중 {offset + 1:,}–{offset + len(window):,}행 ({int(page)}/{n_pages} 페이지)")
+    else:
+        st.caption("조건에 맞는 행이 없습니다.")
+    return window
@@ -0,0 +1,97 @@
+# utils/trend.py
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+# 화면 단위 → pandas period 규칙
+ROLLUP_FREQS = {
+    "daily": "D",
+    "weekly": "W-SUN",  # 월~일 주 단위
+    "monthly": "M",
+}
+
+METRICS = ["mean", "max", "p90"]
+
+
+# -------------------------------
+# ROLLUPS
+# -------------------------------
+def _rollup(dates: pd.Series, scores: pd.Series, freq: str) -> pd.DataFrame:
+    period = dates.dt.to_period(freq)
+    g = scores.groupby(period.values)
+    out = pd.DataFrame(
+        {
+            "mean": g.mean(),
+            "max": g.max(),
+            "p90": g.quantile(0.9),
+            "n_rows": g.size(),
+        }
+    )
+    out.index = out.index.to_timestamp(how="start")
+    out.index.name = "date"
+    return out.sort_index()
+
+
+def compute_risk_rollups(df: pd.DataFrame, score_col: str = "overall_risk_score") -> Dict[str, pd.DataFrame]:
+    """
+    overall_risk_score의 일/주/월 단위 집계 (mean, max, p90).
+    행 단위 값에서 바로 집계하므로 주/월 p90도 정확한 분위수이다.
+    업로드당 한 번 계산해 캐시해 두고 대시보드는 결과만 읽는다.
+    """
+    if df is None or df.empty:
+        empty = pd.DataFrame(columns=METRICS + ["n_rows"])
+        return {name: empty for name in ROLLUP_FREQS}
+
+    dates = pd.to_datetime(df["date"])
+    scores = df[score_col].astype(float)
+    return {name: _rollup(dates, scores, freq) for name, freq in ROLLUP_FREQS.items()}
+
+
+# -------------------------------
+# DOWNSAMPLING (LTTB)
+# -------------------------------
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets 다운샘플링.
+    첫/마지막 점은 유지하고, 나머지 구간을 n_out-2개 bucket으로 나눠
+    이전 선택점·다음 bucket 평균점과 이루는 삼각형 넓이가 가장 큰 점을 고른다.
+    피크/골짜기 모양을 유지하면서 점 개수를 n_out으로 고정한다.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # 다음 bucket 평균점 (마지막 bucket이면 끝점)
+        nlo, nhi = hi, (edges[i + 2] if i + 2 < len(edges) else n)
+        cx = x[nlo:nhi].mean()
+        cy = y[nlo:nhi].mean()
+
+        bx = x[lo:hi]
+        by = y[lo:hi]
+        area = np.abs((x[a] - cx) * (by - y[a]) - (x[a] - bx) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample(frame: pd.DataFrame, column: str, max_points: int) -> pd.DataFrame:
+    """
+    날짜 index 프레임을 column 기준 LTTB로 max_points개 행만 남긴다.
+    (같은 행을 쓰므로 다른 지표 컬럼도 함께 유지된다)
+    """
+    if len(frame) <= max_points:
+        return frame
+    x = frame.index.values.astype("datetime64[D]").astype(np.int64)
+    idx = lttb_indices(x, frame[column].to_numpy(), max_points)
+    return frame.iloc[idx]